@@ -1,14 +1,45 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pathlib import Path
+import json
+import asyncio
+import math
+import os
+from typing import Optional
+import numpy as np
 import uvicorn
 
 from models.db_models import PropertyCard
-from models.request_models import ChatRequest, ChatResponse
+from models.request_models import BatchSearchRequest, ChatRequest, ChatResponse
 from services.data_manager import DataManager
+from services.batch_search import run_batch
+from services.conversation import Session, SessionStore, merge_filters, parse_follow_up, reference_price
+from services.data_refresher import DataRefresher
+from services.embeddings import EmbeddingStore, SentenceEncoder, load_encoder
+from services.gazetteer import Gazetteer
 from services.llm_nlu_agent import LLMNLUAgent
+from services.llm_queue import LLMQueue, LLMQueueFull
+from services.llm_slots import SharedSlots
+from services.metrics import ERRORS, REGISTRY, Timings
+from services.nlu_cache import NLUCache
+from services.pagination import CursorStore, RankedResults
+from services.ranking import Ranker, RankingWeights
+from services.rule_parser import RuleBasedParser
+from services.summary_engine import SummaryEngine
+from services.summary_cache import SummaryCache, SQLiteCacheBackend
+from services.lru_cache import LRUCache
 
-app = FastAPI(title="AI Property Search Backend", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if data_refresher:
+        data_refresher.start()
+    yield
+    if data_refresher:
+        await data_refresher.stop()
+
+app = FastAPI(title="AI Property Search Backend", version="1.0.0", lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -21,60 +52,451 @@ app.add_middleware(
 
 # Initialize Data Manager
 data_path = Path(__file__).resolve().parent / "data"
+# One sentence encoder, shared by semantic search and the semantic NLU cache
+encoder = load_encoder(os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")) if (
+    os.getenv("SEMANTIC_SEARCH", "1") == "1" or os.getenv("NLU_SEMANTIC_CACHE", "1") == "1"
+) else None
 try:
-    data_manager = DataManager(data_dir=str(data_path))
+    # Prejoined memory-mapped snapshot shared by all workers; DATA_SNAPSHOT_DIR="" disables it
+    snapshot_dir = os.getenv("DATA_SNAPSHOT_DIR", str(Path(__file__).resolve().parent / "snapshot"))
+    # Optional JSON gazetteer ({"cities": ..., "pincode_regions": ...}) replacing the built-in city mapping
+    gazetteer_path = os.getenv("GAZETTEER_PATH")
+    # Semantic search over listing text; embeddings are cached in EMBEDDING_DIR ("" keeps them in memory only)
+    embeddings = EmbeddingStore(
+        os.getenv("EMBEDDING_DIR", str(Path(__file__).resolve().parent / "embeddings")) or None,
+        encoder,
+        batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "64")),
+    ) if os.getenv("SEMANTIC_SEARCH", "1") == "1" else None
+    data_manager = DataManager(
+        data_dir=str(data_path),
+        snapshot_dir=snapshot_dir or None,
+        gazetteer=Gazetteer.from_file(gazetteer_path) if gazetteer_path else None,
+        embeddings=embeddings,
+        compact=os.getenv("DATA_COMPACT", "1") == "1",
+    )
+    # Relevance weights, e.g. RANKING_WEIGHTS="price_fit=0.5,value=0.2,readiness=0.2,bhk=0.1"
+    data_manager.ranker = Ranker(RankingWeights.from_string(os.getenv("RANKING_WEIGHTS", "")))
     print(f"Data Manager initialized from: {data_path}")
 except Exception as e:
     print(f"Error loading data: {e}")
     data_manager = None
 
+# LLM admission: LLM_MAX_CONCURRENCY calls in flight, LLM_QUEUE_SIZE more waiting ("" for no limit),
+# beyond which /search answers 503 with Retry-After. With LLM_SLOTS_DIR (set by serve.py) both
+# limits hold across all worker processes sharing that directory.
+llm_queue_size = os.getenv("LLM_QUEUE_SIZE", "64")
+llm_max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+llm_queue = LLMQueue(
+    max_concurrency=llm_max_concurrency,
+    max_queue=int(llm_queue_size) if llm_queue_size else None,
+    shared=SharedSlots(os.getenv("LLM_SLOTS_DIR"), llm_max_concurrency) if os.getenv("LLM_SLOTS_DIR") else None,
+)
+# Liveness fails when LLM calls are pending but none has finished or started for this long
+LIVENESS_STALL_SECONDS = float(os.getenv("LIVENESS_STALL_SECONDS", "300"))
+
 # Initialize LLM Agent
 try:
-    llm_agent = LLMNLUAgent(model_name="gemma3")
-    print("LLM NLU Agent initialized (using Gemma3).")
+    llm_agent = LLMNLUAgent(
+        model_name=os.getenv("LLM_MODEL", "gemma3"),
+        max_concurrency=llm_queue.max_concurrency,
+        timeout=float(os.getenv("LLM_TIMEOUT", "60")),
+        host=os.getenv("OLLAMA_HOST"),
+        cache=NLUCache(
+            max_size=int(os.getenv("NLU_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("NLU_CACHE_TTL", "3600")),
+            similarity_threshold=float(os.getenv("NLU_SIMILARITY_THRESHOLD", "0.92")),
+            # Hashed text features only measure word overlap, too coarse to reuse another query's filters
+            encoder=encoder if os.getenv("NLU_SEMANTIC_CACHE", "1") == "1" and isinstance(encoder, SentenceEncoder) else None,
+        ),
+        parser=RuleBasedParser.from_data_manager(data_manager) if data_manager else None,
+        parser_threshold=float(os.getenv("NLU_FAST_PATH_THRESHOLD", "0.8")),
+        queue=llm_queue,
+    )
+    print(f"LLM NLU Agent initialized (using {llm_agent.model_name}).")
 except Exception as e:
     print(f"Error initializing LLM Agent: {e}")
     llm_agent = None
 
+# Summary cache: in-process LRU by default, SQLite file when shared across workers/restarts
+summary_cache_size = int(os.getenv("SUMMARY_CACHE_SIZE", "1024"))
+summary_cache_ttl = float(os.getenv("SUMMARY_CACHE_TTL", "3600"))
+if os.getenv("SUMMARY_CACHE_BACKEND", "memory") == "sqlite":
+    summary_cache_backend = SQLiteCacheBackend(
+        os.getenv("SUMMARY_CACHE_PATH", "summary_cache.sqlite3"),
+        max_size=summary_cache_size,
+        ttl=summary_cache_ttl,
+    )
+else:
+    summary_cache_backend = LRUCache(max_size=summary_cache_size, ttl=summary_cache_ttl)
+
+# Keep the fast-path vocabulary (projects, localities) in step with reloaded data
+if data_manager and llm_agent:
+    data_manager.add_reload_listener(lambda dm: setattr(llm_agent, "parser", RuleBasedParser.from_data_manager(dm)))
+
+# Watch the CSVs and hot-reload them; DATA_REFRESH_INTERVAL=0 disables polling
+data_refresher = DataRefresher(
+    data_manager, interval=float(os.getenv("DATA_REFRESH_INTERVAL", "30"))
+) if data_manager else None
+
+# Ranked result sets behind /search cursors
+cursor_store = CursorStore(
+    max_size=int(os.getenv("CURSOR_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("CURSOR_TTL", "900")),
+)
+# Deepest position a search can be paged to
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "1000"))
+
+# Conversation state for follow-up queries; each session keeps at most SESSION_MAX_MATCHES row positions
+session_store = SessionStore(
+    max_size=int(os.getenv("SESSION_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("SESSION_TTL", "1800")),
+    max_matches=int(os.getenv("SESSION_MAX_MATCHES", "10000")),
+)
+
+summary_engine = SummaryEngine(
+    llm_agent,
+    default_mode=os.getenv("SUMMARY_MODE", "llm"),
+    hybrid_budget=float(os.getenv("SUMMARY_HYBRID_BUDGET", "2.0")),
+    cache=SummaryCache(summary_cache_backend),
+    data_manager=data_manager,
+)
+
+# Bulk searches: queries per request, queries processed together, and NLU extractions in flight
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "10000"))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "256"))
+BATCH_NLU_CONCURRENCY = int(os.getenv("BATCH_NLU_CONCURRENCY", "16"))
+
+# Per-stage durations in a Server-Timing response header (stage histograms are always on /metrics)
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+
+def _cache_stats():
+    """Stats of every cache, keyed by the 'cache' label used on /metrics."""
+    caches = {
+        "summary": summary_engine.cache.stats() if summary_engine.cache else None,
+        "cursors": cursor_store.stats(),
+        "sessions": session_store.stats(),
+    }
+    if llm_agent and llm_agent.cache:
+        nlu = llm_agent.cache.stats()
+        caches["nlu_exact"] = nlu["exact"]
+        caches["nlu_semantic"] = nlu["semantic"] if nlu["semantic"].get("enabled") else None
+    if llm_agent:
+        fast = llm_agent.fast_path_stats()
+        caches["nlu_fast_path"] = {"hits": fast["hits"], "misses": fast["fallbacks"], "hit_ratio": fast["hit_ratio"]}
+    return {name: stats for name, stats in caches.items() if stats}
+
+def _per_cache(field):
+    return lambda: {(name,): stats[field] for name, stats in _cache_stats().items() if field in stats}
+
+REGISTRY.callback("cache_hits_total", "Cache lookups answered from the cache.", _per_cache("hits"), ["cache"], kind="counter")
+REGISTRY.callback("cache_misses_total", "Cache lookups that missed.", _per_cache("misses"), ["cache"], kind="counter")
+REGISTRY.callback("cache_hit_ratio", "Hits over lookups since start.", _per_cache("hit_ratio"), ["cache"])
+REGISTRY.callback("cache_entries", "Entries currently held.", _per_cache("size"), ["cache"])
+REGISTRY.callback("data_rows", "Rows in the master DataFrame.",
+                  lambda: len(data_manager.master_df) if data_manager and data_manager.master_df is not None else None)
+REGISTRY.callback("llm_queue_waiting", "LLM calls waiting for a slot.",
+                  lambda: {(name,): count for name, count in llm_queue.stats()["waiting_by_priority"].items()}, ["priority"])
+REGISTRY.callback("llm_queue_in_flight", "LLM calls holding a slot.", lambda: llm_queue.in_flight)
+REGISTRY.callback("data_semantic_documents", "Distinct listing texts in the semantic index.",
+                  lambda: data_manager.index.semantic.size if data_manager and data_manager.index and data_manager.index.semantic else None)
+
 @app.get("/")
 def health_check():
     return {
         "status": "running",
         "data_loaded": data_manager is not None,
-        "llm_ready": llm_agent is not None
+        "llm_ready": llm_agent is not None,
+        "nlu_cache": llm_agent.cache.stats() if llm_agent and llm_agent.cache else None,
+        "nlu_fast_path": llm_agent.fast_path_stats() if llm_agent else None,
+        "summary_cache": summary_engine.cache.stats() if summary_engine.cache else None,
+        "cursors": cursor_store.stats(),
+        "sessions": session_store.stats(),
+        "llm_queue": llm_queue.stats(),
     }
 
-@app.post("/search", response_model=ChatResponse)
-async def chat_search(request: ChatRequest):
+@app.get("/health/live")
+def liveness():
+    """200 while this worker makes progress; 503 when LLM calls are pending but stuck."""
+    stalled = llm_queue.stalled(LIVENESS_STALL_SECONDS)
+    return JSONResponse(
+        {"status": "stalled" if stalled else "alive", "pid": os.getpid(), "llm_queue": llm_queue.stats()},
+        status_code=503 if stalled else 200,
+    )
+
+@app.get("/health/ready")
+def readiness():
+    """200 when data and LLM agent are loaded and the LLM queue has room; 503 otherwise, so traffic goes elsewhere."""
+    checks = {
+        "data_loaded": data_manager is not None and data_manager.index is not None,
+        "llm_ready": llm_agent is not None,
+        "llm_queue_has_room": not llm_queue.full(),
+    }
+    ready = all(checks.values())
+    headers = None if ready or checks["llm_queue_has_room"] else {"Retry-After": str(math.ceil(llm_queue.retry_after()))}
+    return JSONResponse(
+        {"status": "ready" if ready else "not_ready", "pid": os.getpid(), **checks,
+         "rows": len(data_manager.master_df) if checks["data_loaded"] else 0, "llm_queue": llm_queue.stats()},
+        status_code=200 if ready else 503,
+        headers=headers,
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of stage latencies, LLM calls and tokens, errors, caches and data size."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/admin/refresh")
+async def refresh_data(force: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """Reload changed CSVs now (all of them with force=true) and report timing."""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if admin_token and x_admin_token != admin_token:
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+    if not data_refresher:
+        raise HTTPException(status_code=503, detail="Data not loaded.")
+
+    try:
+        return await asyncio.to_thread(data_refresher.refresh, force)
+    except Exception as e:
+        print(f"Data refresh error: {e}")
+        raise HTTPException(status_code=500, detail=f"Refresh failed: {e}")
+
+def _require_services():
     if not data_manager or not llm_agent:
         raise HTTPException(
             status_code=503,
             detail="Service not fully initialized."
         )
 
-    try:
-        filters_data = llm_agent.extract_filters(request.user_query)
-    except Exception as e:
-        print(f"Filter extraction error: {e}")
-        filters_data = {}
+def _overloaded(e: LLMQueueFull) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="The language model is busy; retry later.",
+        headers={"Retry-After": str(math.ceil(e.retry_after))},
+    )
+
+async def _resolve_filters(query: str, session: Optional[Session]) -> dict:
+    """Filters for a fresh query, or the previous turn's filters updated by a follow-up."""
+    follow_up = parse_follow_up(query, llm_agent.parser) if session else None
+    if follow_up is None or follow_up.reset:
+        return await llm_agent.aextract_filters(query)
+    if follow_up.confidence < llm_agent.parser_threshold:
+        follow_up = follow_up._replace(filters=await llm_agent.aextract_filters(query))
+    return merge_filters(session.filters, follow_up, reference_price(session.results))
+
+async def _extract_and_search(query: str, page_size: int, timings: Timings, session_id: str):
+    """
+    NLU, filtering and ranking for a new search or a follow-up in session_id;
+    returns the filters, the ranked results and the first page, and records
+    the turn in the session.
+    """
+    session = session_store.get(session_id)
+    with timings.span("nlu"):
+        try:
+            filters_data = await _resolve_filters(query, session)
+        except LLMQueueFull:
+            ERRORS.inc(stage="nlu_overload")
+            raise
+        except Exception as e:
+            ERRORS.inc(stage="nlu")
+            print(f"Filter extraction error: {e}")
+            filters_data = dict(session.filters) if session else {}
 
+    results, matching_properties = RankedResults(None, np.empty(0, dtype=np.int64), 0, filters_data), []
     try:
-        matching_properties = data_manager.filter_data(filters_data)
+        with timings.span("filter"):
+            # Snap misspelt project/locality names to real ones so the echo and caches use them
+            filters_data = data_manager.snap_filters(filters_data)
+            results = data_manager.search(
+                filters_data,
+                max_results=max(SEARCH_MAX_RESULTS, page_size),
+                within=session.results if session else None,
+                keep_matches=session_store.max_matches,
+            )
+        with timings.span("materialize"):
+            matching_properties = results.page(0, page_size)
     except Exception as e:
+        ERRORS.inc(stage="filter")
         print(f"Data filtering error: {e}")
-        matching_properties = []
 
+    session_store.save(session_id, filters_data, results, session)
+    return filters_data, results, matching_properties
+
+def _json_response(response: ChatResponse, timings: Timings) -> Response:
+    """Serialize once (timed) and attach Server-Timing when enabled."""
+    with timings.span("serialization"):
+        body = response.model_dump_json()
+    timings.finish()
+    headers = {"Server-Timing": timings.server_timing()} if SERVER_TIMING else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _next_page(cursor: str, page_size: int, timings: Timings) -> ChatResponse:
+    """Serve a later page straight from the cached ranked results."""
     try:
-        summary_text = llm_agent.generate_summary(filters_data, matching_properties)
-    except Exception as e:
-        print(f"Summary generation error: {e}")
-        summary_text = "Could not generate a summary due to an internal error."
+        token, results, offset = cursor_store.resolve(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=410, detail="Cursor expired; run the search again.")
 
+    with timings.span("materialize"):
+        properties = results.page(offset, page_size)
     return ChatResponse(
+        summary=results.summary or "",
+        filters_applied=results.filters,
+        properties=properties,
+        best_match_reason=results.best_match_reason,
+        total_results=results.total,
+        next_cursor=cursor_store.next_cursor(results, offset + page_size, token),
+    )
+
+@app.post("/search", response_model=ChatResponse)
+async def chat_search(request: ChatRequest):
+    _require_services()
+    timings = Timings("search")
+    if request.cursor:
+        return _json_response(_next_page(request.cursor, request.page_size, timings), timings)
+
+    session_id = request.session_id or session_store.new_id()
+    try:
+        filters_data, results, matching_properties = await _extract_and_search(request.user_query, request.page_size, timings, session_id)
+    except LLMQueueFull as e:
+        raise _overloaded(e)
+    best_match = matching_properties[0] if matching_properties else None
+
+    with timings.span("summary"):
+        summary_text, reason = await asyncio.gather(
+            summary_engine.summarize(filters_data, matching_properties, request.summary_mode),
+            summary_engine.best_match_reason(filters_data, best_match, request.summary_mode),
+            return_exceptions=True,
+        )
+    if isinstance(summary_text, Exception):
+        ERRORS.inc(stage="summary")
+        print(f"Summary generation error: {summary_text}")
+        summary_text = "Could not generate a summary due to an internal error."
+    if isinstance(reason, Exception):
+        ERRORS.inc(stage="best_match")
+        print(f"Best match reason error: {reason}")
+        reason = None
+    results.summary, results.best_match_reason = summary_text, reason
+
+    return _json_response(ChatResponse(
         summary=summary_text,
         filters_applied=filters_data,
-        properties=matching_properties
-    )
+        properties=matching_properties,
+        best_match_reason=reason,
+        total_results=results.total,
+        next_cursor=cursor_store.next_cursor(results, request.page_size),
+        session_id=session_id,
+    ), timings)
+
+@app.post("/search/stream")
+async def chat_search_stream(request: ChatRequest):
+    """
+    NDJSON variant of /search. Emits a 'filters' event (with the session_id to
+    send with follow-up queries) and a 'properties' event
+    (with total_results and next_cursor for paging through /search) as soon as
+    filtering is done, then 'summary' events carrying summary text
+    as it is produced ('summary_replace' in hybrid mode when the LLM text
+    supersedes the template draft), a 'best_match' event with the reason the
+    first property ranks first, and a final 'done' event.
+
+    NLU and filtering finish before the response starts, so a full LLM queue
+    is still a 503. Stage timings go to /metrics only.
+    """
+    _require_services()
+    timings = Timings("search_stream")
+
+    if request.cursor:
+        # Later pages carry no new summary, so they are a single plain response
+        page = _next_page(request.cursor, request.page_size, timings)
+        timings.finish()
+
+        async def page_events():
+            yield json.dumps({"type": "filters", "filters_applied": page.filters_applied}) + "\n"
+            yield json.dumps({
+                "type": "properties",
+                "properties": [p.model_dump() for p in page.properties],
+                "total_results": page.total_results,
+                "next_cursor": page.next_cursor,
+            }) + "\n"
+            yield json.dumps({"type": "done"}) + "\n"
+
+        return StreamingResponse(page_events(), media_type="application/x-ndjson")
+
+    session_id = request.session_id or session_store.new_id()
+    # Searched before the response starts, so an overloaded LLM can still be answered with 503
+    try:
+        filters_data, results, matching_properties = await _extract_and_search(request.user_query, request.page_size, timings, session_id)
+    except LLMQueueFull as e:
+        raise _overloaded(e)
+
+    async def events():
+        yield json.dumps({"type": "filters", "filters_applied": filters_data, "session_id": session_id}) + "\n"
+        with timings.span("serialization"):
+            properties_event = json.dumps({
+                "type": "properties",
+                "properties": [p.model_dump() for p in matching_properties],
+                "total_results": results.total,
+                "next_cursor": cursor_store.next_cursor(results, request.page_size),
+            }) + "\n"
+        yield properties_event
+
+        # The reason is produced alongside the summary and sent once the summary is done
+        best_match = matching_properties[0] if matching_properties else None
+        reason_task = asyncio.create_task(
+            summary_engine.best_match_reason(filters_data, best_match, request.summary_mode)
+        ) if best_match else None
+
+        summary = ""
+        with timings.span("summary"):
+            try:
+                async for event in summary_engine.stream(filters_data, matching_properties, request.summary_mode):
+                    summary = summary + event["delta"] if event["type"] == "summary" else event["summary"]
+                    yield json.dumps(event) + "\n"
+            except Exception as e:
+                ERRORS.inc(stage="summary")
+                print(f"Summary generation error: {e}")
+                yield json.dumps({"type": "summary", "delta": "Could not generate a summary due to an internal error."}) + "\n"
+        results.summary = summary.strip()
+
+        if reason_task:
+            try:
+                with timings.span("best_match"):
+                    results.best_match_reason = await reason_task
+                yield json.dumps({"type": "best_match", "reason": results.best_match_reason}) + "\n"
+            except Exception as e:
+                ERRORS.inc(stage="best_match")
+                print(f"Best match reason error: {e}")
+
+        timings.finish()
+        yield json.dumps({"type": "done"}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.post("/search/batch")
+async def chat_search_batch(request: BatchSearchRequest):
+    """
+    Bulk variant of /search for offline jobs. Streams one NDJSON 'result' event
+    per query (index, query, filters_applied, total_results, properties and,
+    with summaries=true, summary) in input order, then a 'done' event.
+    Identical queries and filter sets are only evaluated once.
+    """
+    _require_services()
+    if len(request.queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_QUERIES} queries per batch.")
+
+    async def events():
+        async for event in run_batch(
+            request.queries, data_manager, llm_agent, summary_engine,
+            page_size=request.page_size,
+            summaries=request.summaries,
+            summary_mode=request.summary_mode,
+            chunk_size=BATCH_CHUNK_SIZE,
+            concurrency=BATCH_NLU_CONCURRENCY,
+        ):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from models.db_models import PropertyCard 
 
 # 2. Schema for structured filters extracted by the LLM (NLU)
@@ -13,6 +13,7 @@ class FilterSchema(BaseModel):
     max_budget: Optional[int] = Field(None, description="Maximum budget in major currency unit.")
     project_name: Optional[str] = Field(None, description="Specific project name if mentioned.")
     locality: Optional[str] = Field(None, description="Specific locality or sub-locality name.")
+    preferences: Optional[str] = Field(None, description="Other wishes no field above covers, as short free text (e.g., 'sea-facing, near good schools').")
 
 # 3. Request/Response models for the API endpoint
 class ChatRequest(BaseModel):
@@ -20,6 +21,27 @@ class ChatRequest(BaseModel):
     Model for the incoming user chat query.
     """
     user_query: str = Field(..., description="The natural language query from the user.")
+    page_size: int = Field(50, ge=1, le=200, description="Number of property cards per page.")
+    cursor: Optional[str] = Field(
+        None, description="Opaque cursor from a previous response's next_cursor. When given, the next page of that search is returned and user_query is not re-parsed."
+    )
+    summary_mode: Optional[Literal["template", "llm", "hybrid"]] = Field(
+        None, description="How to build the summary: 'template' (no LLM), 'llm', or 'hybrid' (LLM within a latency budget, template otherwise). Defaults to the server setting."
+    )
+    session_id: Optional[str] = Field(
+        None, description="session_id from a previous response. The query is then read as a follow-up ('only 3BHK', 'cheaper ones') that refines that conversation's filters and results."
+    )
+
+class BatchSearchRequest(BaseModel):
+    """
+    Model for a bulk search over many natural language queries.
+    """
+    queries: List[str] = Field(..., min_length=1, description="Natural language queries, answered in this order.")
+    page_size: int = Field(10, ge=1, le=200, description="Number of property cards returned per query.")
+    summaries: bool = Field(False, description="Also generate a summary per distinct filter set.")
+    summary_mode: Optional[Literal["template", "llm", "hybrid"]] = Field(
+        None, description="Summary mode when summaries is true. Defaults to the server setting."
+    )
 
 class ChatResponse(BaseModel):
     """
@@ -27,4 +49,8 @@ class ChatResponse(BaseModel):
     """
     summary: str = Field(..., description="4-5 sentence natural language summary generated by the LLM.")
     filters_applied: Dict[str, Any] = Field(..., description="The structured filters extracted by the NLU agent.")
-    properties: List[PropertyCard] = Field(..., description="List of matching property cards.")
+    properties: List[PropertyCard] = Field(..., description="List of matching property cards, best match first.")
+    best_match_reason: Optional[str] = Field(None, description="Why the first property is the best match.")
+    total_results: int = Field(0, description="Number of properties matching the filters.")
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to get the next page; null on the last page.")
+    session_id: Optional[str] = Field(None, description="Conversation id; send it back with the next query to refine this search.")
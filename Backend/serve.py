@@ -0,0 +1,78 @@
+"""
+Production entry point: several uvicorn worker processes sharing one dataset.
+
+    python serve.py --workers 4 --host 0.0.0.0 --port 8000
+
+Before any worker starts, a one-off process loads the data the way main.py
+does, which writes the memory-mapped snapshot, the embedding cache and the
+trained IVF index of the semantic search once. Every worker then maps those
+files, so the joined data, the embeddings and the index are in the page cache
+once rather than once per worker, and startup skips the CSV join, the
+encoding and the k-means training.
+
+The workers admit LLM calls through one queue: LLM_MAX_CONCURRENCY slots held
+with file locks in a directory they share (LLM_SLOTS_DIR), and LLM_QUEUE_SIZE
+calls waiting across all of them. The model server sees at most
+LLM_MAX_CONCURRENCY calls whatever the number of workers, and a worker only
+answers 503 when the whole server is out of room. The worker count is
+independent of the LLM limits, so requests that never call the LLM scale
+with --workers. Point the load balancer's probes at /health/ready (503 while
+the LLM queue is full) and /health/live.
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+from pathlib import Path
+import uvicorn
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+
+def _prebuild():
+    os.chdir(BACKEND_DIR)
+    import main
+    if main.data_manager is None:
+        raise SystemExit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WORKERS", str(os.cpu_count() or 1))))
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--skip-prebuild", action="store_true", help="Start workers without building the snapshot first.")
+    args = parser.parse_args()
+
+    if not os.getenv("DATA_SNAPSHOT_DIR", "x"):
+        print("DATA_SNAPSHOT_DIR is empty: every worker will join the CSVs and hold its own copy of the data.")
+
+    if not args.skip_prebuild:
+        build = multiprocessing.get_context("spawn").Process(target=_prebuild)
+        build.start()
+        build.join()
+        if build.exitcode != 0:
+            print("Data prebuild failed; workers will try to load the data themselves.")
+
+    # Workers inherit the environment, so they all take LLM slots from the same directory
+    slots_dir = tempfile.mkdtemp(prefix="llm-slots-")
+    os.environ["LLM_SLOTS_DIR"] = slots_dir
+    print(f"Starting {args.workers} workers sharing {os.getenv('LLM_MAX_CONCURRENCY', '4')} LLM slots "
+          f"and {os.getenv('LLM_QUEUE_SIZE', '64') or 'unlimited'} queued calls.")
+    try:
+        uvicorn.run(
+            "main:app",
+            app_dir=str(BACKEND_DIR),
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level=args.log_level,
+        )
+    finally:
+        shutil.rmtree(slots_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import json
+import os
+import shutil
+from typing import Optional, Tuple
+import numpy as np
+
+# Rows scored per matrix product when assigning vectors to lists
+_CHUNK = 16384
+# Arrays an IVFIndex is saved as, one .npy file each
+_ARRAYS = ("centroids", "ids", "vectors", "offsets", "slots")
+
+
+def top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, best first."""
+    if len(scores) > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+        return part[np.argsort(-scores[part], kind='stable')]
+    return np.argsort(-scores, kind='stable')
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _CHUNK):
+        labels[start:start + _CHUNK] = np.argmax(vectors[start:start + _CHUNK] @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """k unit-length centroids for unit-length vectors (cosine k-means); empty clusters are reseeded."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(vectors, centroids)
+        order = np.argsort(labels, kind='stable')
+        counts = np.bincount(labels, minlength=k)
+        present = np.flatnonzero(counts)
+        sums = np.add.reduceat(vectors[order], np.cumsum(counts)[present] - counts[present], axis=0)
+        centroids[present] = sums
+        empty = np.flatnonzero(counts == 0)
+        centroids[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file (IVF-flat) index for inner-product search over unit vectors.
+
+    Vectors are clustered with spherical k-means (trained on a sample) and
+    stored contiguously list by list. A query scores the centroids, then only
+    the vectors of the nprobe closest lists; with an `allowed` mask it keeps
+    probing further lists until k allowed vectors have been seen, so selective
+    structured filters do not starve the result. Cost is roughly
+    nprobe / nlist of an exact scan.
+
+    A trained index can be saved and loaded memory-mapped, so worker
+    processes share one copy of it instead of each training their own.
+    """
+
+    def __init__(self, vectors: np.ndarray, nlist: Optional[int] = None, nprobe: Optional[int] = None,
+                 train_size: int = 50_000, seed: int = 0):
+        n = len(vectors)
+        rng = np.random.default_rng(seed)
+        sample = vectors if n <= train_size else vectors[np.sort(rng.choice(n, train_size, replace=False))]
+        self.nlist = max(1, min(nlist or int(4 * np.sqrt(n)), len(sample)))
+        self.nprobe = min(nprobe or max(1, self.nlist // 8), self.nlist)
+        self.centroids = spherical_kmeans(sample, self.nlist, seed=seed)
+
+        labels = _assign(vectors, self.centroids)
+        self.ids = np.argsort(labels, kind='stable')
+        self.vectors = vectors[self.ids]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=self.nlist))])
+        # Where each original vector sits in self.vectors, for exact scans of a subset
+        self.slots = np.empty(n, dtype=np.int64)
+        self.slots[self.ids] = np.arange(n)
+
+    def save(self, path: str) -> None:
+        """Write the index to the directory path; a directory already there is left as it is."""
+        tmp = f"{path}.tmp-{os.getpid()}"
+        os.makedirs(tmp, exist_ok=True)
+        try:
+            for name in _ARRAYS:
+                np.save(os.path.join(tmp, f"{name}.npy"), getattr(self, name))
+            with open(os.path.join(tmp, "params.json"), "w") as f:
+                json.dump({"nlist": self.nlist, "nprobe": self.nprobe}, f)
+            os.rename(tmp, path)
+        except OSError:
+            # Another process saved the same index first, or the directory is not writable
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        """An index written by save(), its arrays memory-mapped read-only."""
+        index = cls.__new__(cls)
+        with open(os.path.join(path, "params.json")) as f:
+            params = json.load(f)
+        index.nlist, index.nprobe = params["nlist"], params["nprobe"]
+        for name in _ARRAYS:
+            setattr(index, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def probe_size(self) -> int:
+        """Vectors an average unfiltered search scores."""
+        return len(self) * self.nprobe // self.nlist
+
+    def exact(self, query: np.ndarray, k: int, candidates: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force top-k over all vectors, or over the given original ids."""
+        query = np.asarray(query, dtype=self.vectors.dtype)
+        if candidates is None:
+            scores = self.vectors @ query
+            best = top_indices(scores, k)
+            return self.ids[best], scores[best]
+        scores = self.vectors[self.slots[candidates]] @ query
+        best = top_indices(scores, k)
+        return candidates[best], scores[best]
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None,
+               allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, scores) of the approximate top-k, best first; allowed is a boolean mask over ids."""
+        query = np.asarray(query, dtype=self.vectors.dtype)
+        nprobe = nprobe or self.nprobe
+        lists = np.argsort(-(self.centroids @ query), kind='stable')
+
+        found_ids, found_scores, seen = [], [], 0
+        for probed, lst in enumerate(lists):
+            if probed >= nprobe and seen >= k:
+                break
+            start, end = self.offsets[lst], self.offsets[lst + 1]
+            if start == end:
+                continue
+            ids = self.ids[start:end]
+            if allowed is None:
+                scores = self.vectors[start:end] @ query
+            else:
+                keep = allowed[ids]
+                if not keep.any():
+                    continue
+                ids = ids[keep]
+                scores = self.vectors[start:end][keep] @ query
+            found_ids.append(ids)
+            found_scores.append(scores)
+            seen += len(ids)
+
+        if not found_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        ids, scores = np.concatenate(found_ids), np.concatenate(found_scores)
+        best = top_indices(scores, k)
+        return ids[best], scores[best]
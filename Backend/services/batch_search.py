@@ -0,0 +1,83 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+from services.llm_queue import llm_priority, wait_for_room
+from services.metrics import ERRORS, Timings
+
+
+async def run_batch(queries: List[str], data_manager, llm_agent, summary_engine=None,
+                    page_size: int = 10, summaries: bool = False, summary_mode: Optional[str] = None,
+                    chunk_size: int = 256, concurrency: Optional[int] = None,
+                    timings: Optional[Timings] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Search many queries (e.g. saved buyer queries in a nightly job), yielding
+    one 'result' event per query in input order and a final 'done' event.
+
+    Queries are processed chunk_size at a time, so memory depends on the chunk,
+    not the batch: per chunk, NLU runs for the distinct queries with at most
+    `concurrency` extractions in flight, DataManager.search_batch evaluates the
+    distinct filter sets together (off the event loop), and cards and optional
+    summaries are built once per distinct filter set.
+
+    Extractions and summaries share one `concurrency` limit and queue for the
+    LLM at batch priority; when the queue is full they wait and retry rather
+    than fall back, so summary_mode='llm' yields LLM summaries.
+    """
+    timings = timings or Timings("search_batch")
+    limit = asyncio.Semaphore(concurrency) if concurrency else None
+    evaluated = 0
+    for start in range(0, len(queries), chunk_size):
+        chunk = queries[start:start + chunk_size]
+        with timings.span("nlu"):
+            filters_list = await llm_agent.aextract_filters_batch(chunk, concurrency, limit)
+
+        try:
+            with timings.span("filter"):
+                filters_list = [data_manager.snap_filters(filters) for filters in filters_list]
+                results = await asyncio.to_thread(data_manager.search_batch, filters_list, page_size)
+        except Exception as e:
+            ERRORS.inc(stage="filter")
+            print(f"Batch filtering error: {e}")
+            for offset, query in enumerate(chunk):
+                yield {"type": "error", "index": start + offset, "query": query, "detail": "Search failed."}
+            continue
+
+        # Identical filter sets share one RankedResults; build their output once
+        distinct = list({id(r): r for r in results}.values())
+        evaluated += len(distinct)
+        with timings.span("materialize"):
+            pages = {id(r): r.page(0, page_size) for r in distinct}
+            cards = {key: [p.model_dump() for p in page] for key, page in pages.items()}
+
+        texts = {}
+        if summaries and summary_engine is not None:
+            summary_limit = limit or asyncio.Semaphore(len(distinct) or 1)
+
+            async def summarize(result):
+                async with summary_limit:
+                    return await wait_for_room(lambda: summary_engine.summarize(
+                        result.filters, pages[id(result)], summary_mode, fallback_when_busy=False))
+
+            with timings.span("summary"), llm_priority("batch"):
+                generated = await asyncio.gather(*(summarize(r) for r in distinct), return_exceptions=True)
+            for r, text in zip(distinct, generated):
+                if isinstance(text, Exception):
+                    ERRORS.inc(stage="summary")
+                    print(f"Batch summary error: {text!r}")
+                    text = None
+                texts[id(r)] = text
+
+        for offset, (query, filters, result) in enumerate(zip(chunk, filters_list, results)):
+            event = {
+                "type": "result",
+                "index": start + offset,
+                "query": query,
+                "filters_applied": filters,
+                "total_results": result.total,
+                "properties": cards[id(result)],
+            }
+            if summaries:
+                event["summary"] = texts.get(id(result))
+            yield event
+
+    timings.finish()
+    yield {"type": "done", "queries": len(queries), "filter_sets_evaluated": evaluated}
@@ -0,0 +1,72 @@
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from models.db_models import PropertyCard
+from services.compact import TextStore
+from services.formatting import format_prices
+
+# PropertyCard field -> master DataFrame column
+CARD_COLUMNS = {
+    "id": "id",
+    "project_name": "project_name",
+    "city": "city",
+    "locality": "locality",
+    "status": "status",
+    "possession_date": "possession_date",
+    "bhk_type": "bhk_type",
+    "min_price": "min_price",
+    "carpet_area": "carpet_area",
+    "bathrooms": "bathrooms",
+    "summary": "summary",
+    "image_url": "image_url",
+    "full_address": "fullAddress",
+}
+
+
+def _column(df: pd.DataFrame, column: str, positions: np.ndarray) -> np.ndarray:
+    """Pull one column at the given rows as an object array with NaN/NaT replaced by None."""
+    if column not in df.columns:
+        return np.full(len(positions), None, dtype=object)
+    array = df[column].array
+    if isinstance(array, pd.Categorical):
+        # Look up just these rows' codes instead of converting the categorical
+        codes = array.codes[positions]
+        values = np.full(len(codes), None, dtype=object)
+        present = codes >= 0
+        values[present] = np.asarray(array.categories.take(codes[present]), dtype=object)
+        return values
+    # Taking from the column's own array skips copying the other columns of the rows
+    values = np.asarray(array.take(positions), dtype=object)
+    values[pd.isnull(values)] = None
+    return values
+
+
+def build_cards(df: pd.DataFrame, positions: np.ndarray, limit: int = 50, validate: bool = False,
+                text: Optional[TextStore] = None) -> List[PropertyCard]:
+    """
+    Materialize PropertyCards for the given row positions of the master DataFrame.
+
+    The limit is applied before any conversion, columns are pulled in bulk, and
+    rows coming from the trusted master frame skip per-field validation unless
+    validate=True. Columns kept in the text store are decoded for these rows only.
+    """
+    positions = np.asarray(positions[:limit], dtype=np.int64)
+    if not len(positions):
+        return []
+
+    columns = {
+        field: text.take(column, positions) if text is not None and column in text else _column(df, column, positions)
+        for field, column in CARD_COLUMNS.items()
+    }
+    names = columns["project_name"]
+    names[pd.isnull(names)] = "N/A"
+    # Plain Python numbers, matching what PropertyCard validation would produce
+    columns["min_price"] = np.array([None if p is None else float(p) for p in columns["min_price"]], dtype=object)
+    columns["carpet_area"] = np.array([None if a is None else float(a) for a in columns["carpet_area"]], dtype=object)
+    columns["bathrooms"] = np.array([None if b is None else int(b) for b in columns["bathrooms"]], dtype=object)
+    columns["formatted_price"] = np.array(format_prices(df["min_price"].to_numpy()[positions].astype(np.float64)), dtype=object)
+
+    fields = list(columns)
+    records = [dict(zip(fields, values)) for values in zip(*columns.values())]
+    make = PropertyCard.model_validate if validate else lambda r: PropertyCard.model_construct(**r)
+    return [make(record) for record in records]
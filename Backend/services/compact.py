@@ -0,0 +1,134 @@
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Long free text kept out of the master frame and decoded only for returned rows
+TEXT_COLUMNS = ("summary", "about", "image_url", "fullAddress")
+# Repeated labels and ids stored as categoricals (integer codes into one copy of each value)
+CATEGORY_COLUMNS = ("id", "project_name", "status", "possession_date", "bhk_type", "city", "locality", "region")
+
+
+class TextStore:
+    """
+    Text columns held outside the master DataFrame. Per column, rows keep an
+    int32 code (-1 for missing) into the column's distinct values, which are
+    packed back to back in one UTF-8 byte array with an offsets array. That
+    costs a few bytes per distinct character instead of a Python string per
+    row, and when loaded from a snapshot all three arrays are memory-mapped,
+    so text is only paged in for the rows actually returned.
+    """
+
+    def __init__(self, columns: Optional[Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]] = None):
+        # name -> (codes, offsets, blob)
+        self.columns = columns or {}
+
+    @staticmethod
+    def encode(values: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        codes, uniques = pd.factorize(values)
+        # Distinct values may still collide once stringified (e.g. 1.0 and '1.0'); keep the first
+        strings, remap = {}, np.empty(len(uniques) + 1, dtype=np.int32)
+        for i, value in enumerate(uniques):
+            remap[i] = strings.setdefault(str(value), len(strings))
+        remap[-1] = -1
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return remap[codes], offsets, blob
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, names: Iterable[str] = TEXT_COLUMNS) -> "TextStore":
+        return cls({name: cls.encode(df[name]) for name in names if name in df.columns})
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for arrays in self.columns.values() for a in arrays)
+
+    def _decode(self, name: str, codes: np.ndarray) -> List[Optional[str]]:
+        _, offsets, blob = self.columns[name]
+        return [None if c < 0 else blob[offsets[c]:offsets[c + 1]].tobytes().decode("utf-8") for c in codes]
+
+    def distinct(self, name: str) -> List[str]:
+        """The column's distinct values, indexed by code."""
+        _, offsets, _ = self.columns[name]
+        return self._decode(name, np.arange(len(offsets) - 1))
+
+    def take(self, name: str, positions: np.ndarray) -> np.ndarray:
+        """Values of a column at the given row positions (None where missing)."""
+        codes, offsets, _ = self.columns[name]
+        codes = codes[positions]
+        if len(codes) <= len(offsets):
+            return np.array(self._decode(name, codes), dtype=object)
+        # Many rows: decode each distinct value once and broadcast
+        values = np.array(self.distinct(name) + [None], dtype=object)
+        return values[codes]
+
+    def series(self, name: str) -> pd.Series:
+        """The whole column as a categorical Series, for index builds that need every value."""
+        codes = self.columns[name][0]
+        return pd.Series(pd.Categorical.from_codes(np.asarray(codes), categories=self.distinct(name), validate=False))
+
+    def subset(self, positions: np.ndarray) -> "TextStore":
+        """A store for just these rows (values are shared, codes are copied)."""
+        return TextStore({name: (codes[positions], offsets, blob) for name, (codes, offsets, blob) in self.columns.items()})
+
+    def save(self, directory: str) -> None:
+        for name, arrays in self.columns.items():
+            for part, array in zip(("codes", "offsets", "blob"), arrays):
+                np.save(os.path.join(directory, f"{name}.text-{part}.npy"), array)
+
+    @classmethod
+    def load(cls, directory: str, names: Iterable[str]) -> "TextStore":
+        return cls({
+            name: tuple(np.load(os.path.join(directory, f"{name}.text-{part}.npy"), mmap_mode="r")
+                        for part in ("codes", "offsets", "blob"))
+            for name in names
+        })
+
+
+def downcast(series: pd.Series) -> pd.Series:
+    """The smallest numeric dtype holding exactly the same values (integers when all are whole)."""
+    values = series.to_numpy()
+    if values.dtype.kind not in "fiu" or not len(values):
+        return series
+    finite = values[~np.isnan(values)] if values.dtype.kind == "f" else values
+    if len(finite) == len(values) and np.array_equal(finite, np.round(finite)):
+        for dtype in (np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32):
+            info = np.iinfo(dtype)
+            if finite.min() >= info.min and finite.max() <= info.max:
+                return series if series.dtype == dtype else series.astype(dtype)
+    if values.dtype.itemsize > 4:
+        narrowed = values.astype(np.float32)
+        if np.array_equal(narrowed.astype(values.dtype), values, equal_nan=values.dtype.kind == "f"):
+            return pd.Series(narrowed, index=series.index, name=series.name)
+    return series
+
+
+def compact_frame(df: pd.DataFrame, text: Optional[TextStore] = None) -> Tuple[pd.DataFrame, TextStore]:
+    """
+    Memory-lean layout of the master frame: TEXT_COLUMNS moved into a
+    TextStore (kept as given when the frame no longer has them), repeated
+    labels and ids as categoricals, and numbers in the smallest exact dtype.
+    Already compact columns are left as they are.
+    """
+    moved = [name for name in TEXT_COLUMNS if name in df.columns]
+    if moved or text is None:
+        text = TextStore.from_frame(df, moved)
+    columns = {}
+    for name in df.columns:
+        if name in moved:
+            continue
+        series = df[name]
+        if name in CATEGORY_COLUMNS and not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype("category")
+        elif pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+            series = downcast(series)
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index, copy=False), text
@@ -0,0 +1,152 @@
+import re
+import secrets
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional
+import numpy as np
+from services.filter_index import canonical_filters
+from services.lru_cache import LRUCache
+from services.pagination import RankedResults
+from services.rule_parser import RuleBasedParser
+
+# Words that only say "change the last search"; they carry no filter themselves
+FOLLOW_UP_WORDS = {
+    "only", "just", "also", "too", "plus", "instead", "now", "then", "but", "same", "again",
+    "what", "about", "how", "ones", "one", "those", "these", "them", "that", "there", "here",
+    "can", "you", "do", "have", "has", "something", "anything", "else", "more", "lower", "higher",
+    "make", "it", "ok", "okay", "filter", "narrow", "down", "refine", "results", "result",
+}
+# Words asking to add to a multi-valued filter rather than replace it
+EXTEND_WORDS = {"also", "too", "plus", "add"}
+
+_CHEAPER_RE = re.compile(r"\b(?:cheaper|less expensive|lower (?:price|budget)|more affordable|affordable|budget friendly|low budget)\b")
+_PRICIER_RE = re.compile(r"\b(?:pricier|costlier|more expensive|higher (?:price|budget)|premium|luxury|luxurious|high end)\b")
+_ANY_RE = re.compile(r"\b(?:any|all|no|without|remove|drop|ignore)\s+(bhk|size|configuration|budget|price|city|location|locality|area|project)s?\b|\banywhere\b")
+_RESET_RE = re.compile(r"\b(?:new search|start over|start again|from scratch|reset)\b")
+
+# Filters each removal keyword clears
+_REMOVABLE = {
+    "bhk": ("bhk",), "size": ("bhk",), "configuration": ("bhk",),
+    "budget": ("min_budget", "max_budget"), "price": ("min_budget", "max_budget"),
+    "city": ("city", "locality", "project_name"), "location": ("city", "locality", "project_name"),
+    "locality": ("locality",), "area": ("locality",), "project": ("project_name",),
+}
+
+
+class FollowUp(NamedTuple):
+    """What a follow-up query changes: new filter values, cleared filters and a relative price move."""
+    filters: Dict[str, Any]
+    removed: FrozenSet[str]
+    price_shift: int  # -1 cheaper, +1 pricier, 0 unchanged
+    extend: bool
+    reset: bool
+    confidence: float
+
+
+def _blank(text: str, pattern: re.Pattern) -> str:
+    return pattern.sub(" ", text)
+
+
+def parse_follow_up(query: str, parser: Optional[RuleBasedParser]) -> FollowUp:
+    """
+    Read a query as a change to the previous turn ('only 3BHK', 'cheaper ones',
+    'in Mumbai instead', 'any budget'). Relative and removal phrases are taken
+    out first, the rest goes through the rule-based parser; confidence is its
+    confidence on that rest (1.0 when nothing is left), so callers fall back to
+    the LLM for wishes the rules cannot read.
+    """
+    text = query.lower()
+    reset = bool(_RESET_RE.search(text))
+    text = _blank(text, _RESET_RE)
+
+    removed = set()
+    for match in _ANY_RE.finditer(text):
+        removed.update(_REMOVABLE.get(match.group(1) or "city"))
+    text = _blank(text, _ANY_RE)
+
+    price_shift = -1 if _CHEAPER_RE.search(text) else 1 if _PRICIER_RE.search(text) else 0
+    text = _blank(_blank(text, _CHEAPER_RE), _PRICIER_RE)
+
+    words = re.findall(r"\w+", text)
+    extend = any(w in EXTEND_WORDS for w in words)
+    rest = " ".join(w for w in words if w not in FOLLOW_UP_WORDS)
+
+    if not rest:
+        return FollowUp({}, frozenset(removed), price_shift, extend, reset, 1.0)
+    if parser is None:
+        return FollowUp({}, frozenset(removed), price_shift, extend, reset, 0.0)
+    parsed = parser.parse(rest)
+    return FollowUp(parsed.filters, frozenset(removed), price_shift, extend, reset, parsed.confidence)
+
+
+def reference_price(results: Optional[RankedResults], sample: int = 50) -> Optional[float]:
+    """Median price of the best results of a turn, the anchor for 'cheaper' / 'pricier'."""
+    if results is None or results.index is None or not len(results.positions):
+        return None
+    prices = results.index.price[results.positions[:sample]]
+    prices = prices[~np.isnan(prices)]
+    return float(np.median(prices)) if len(prices) else None
+
+
+def merge_filters(previous: Dict[str, Any], follow_up: FollowUp, price: Optional[float] = None) -> Dict[str, Any]:
+    """Apply a follow-up to the filters of the previous turn."""
+    merged = {k: v for k, v in previous.items() if v not in (None, "", [])}
+    for field in follow_up.removed:
+        merged.pop(field, None)
+
+    delta = {k: v for k, v in follow_up.filters.items() if v not in (None, "", [])}
+    # A different city makes the old locality and project meaningless
+    if "city" in delta and canonical_filters({"city": delta["city"]}) != canonical_filters({"city": merged.get("city")}):
+        for field in ("locality", "project_name"):
+            if field not in delta:
+                merged.pop(field, None)
+    if follow_up.extend and delta.get("bhk") and merged.get("bhk"):
+        delta["bhk"] = list(dict.fromkeys(list(merged["bhk"]) + list(delta["bhk"])))
+    merged.update(delta)
+
+    if follow_up.price_shift and price and not ({"min_budget", "max_budget"} & delta.keys()):
+        if follow_up.price_shift < 0:
+            merged["max_budget"] = int(min(price, merged.get("max_budget") or price))
+            if merged.get("min_budget") and merged["min_budget"] >= merged["max_budget"]:
+                merged.pop("min_budget")
+        else:
+            merged["min_budget"] = int(max(price, merged.get("min_budget") or price))
+            if merged.get("max_budget") and merged["max_budget"] <= merged["min_budget"]:
+                merged.pop("max_budget")
+    return merged
+
+
+class Session(NamedTuple):
+    """One conversation: the filters now in force and the results of the last turn."""
+    filters: Dict[str, Any]
+    results: RankedResults
+    turns: int
+
+
+class SessionStore:
+    """
+    Conversation state by session id in an LRUCache (max_size sessions, idle
+    ones dropped after ttl seconds). Each session pins the RankedResults of its
+    last turn; a turn keeps its structured matches only when there are at most
+    max_matches of them, so memory stays bounded by roughly
+    max_size * max_matches row positions. Larger match sets are cheap to look
+    up again from the index anyway.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = 1800.0, max_matches: int = 10_000):
+        self.cache = LRUCache(max_size=max_size, ttl=ttl)
+        self.max_matches = max_matches
+
+    @staticmethod
+    def new_id() -> str:
+        return secrets.token_urlsafe(12)
+
+    def get(self, session_id: Optional[str]) -> Optional[Session]:
+        return self.cache.get(session_id) if session_id else None
+
+    def save(self, session_id: str, filters: Dict[str, Any], results: RankedResults,
+             previous: Optional[Session] = None) -> Session:
+        session = Session(filters, results, previous.turns + 1 if previous else 1)
+        self.cache.put(session_id, session)
+        return session
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
@@ -1,7 +1,35 @@
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
+import hashlib
+import json
 import os
+import numpy as np
 import pandas as pd
 from models.db_models import PropertyCard
+from services.compact import TextStore, compact_frame
+from services.filter_index import FilterIndex, narrowed_filters
+from services.fuzzy_index import FuzzyMatch
+from services.ranking import Ranker, RankFeatures
+from services.embeddings import EmbeddingStore
+from services.semantic_index import SemanticIndex
+from services.gazetteer import Gazetteer
+from services.pagination import RankedResults
+from services.snapshot import load_snapshot, source_fingerprint, write_snapshot
+
+
+def content_version(master_df: pd.DataFrame, text: Optional[TextStore] = None) -> str:
+    """
+    Hash of every column of every row, text held outside the frame included,
+    stable across processes. Any field can reach an LLM prompt (the best-match
+    prompt carries the whole card), so shared summary caches key on it.
+    """
+    digest = hashlib.sha1(pd.util.hash_pandas_object(master_df, index=False).to_numpy().tobytes())
+    for name in sorted(text.columns) if text is not None else ():
+        # Hash each distinct value once, then look it up per row (code -1, missing, takes the last)
+        values = np.array(text.distinct(name) + [None], dtype=object)
+        digest.update(name.encode())
+        digest.update(pd.util.hash_array(values)[np.asarray(text.columns[name][0])].tobytes())
+    return digest.hexdigest()[:16]
+
 
 class DataManager:
     """
@@ -15,7 +43,15 @@ class DataManager:
         "config": "ProjectConfiguration.csv",
         "variant": "ProjectConfigurationVariant.csv",
     }
+    # Columns of the joined master frame
+    MASTER_COLUMNS = [
+        'id', 'project_name', 'status', 'possession_date', 'summary', 'about',
+        'bhk_type', 'min_price', 'carpet_area', 'bathrooms', 'image_url',
+        'fullAddress'
+    ]
     master_df: Optional[pd.DataFrame] = None
+    index: Optional[FilterIndex] = None
+    data_version: str = ""
 
     # City mapping for strict filtering
     CITY_MAPPING = {
@@ -24,35 +60,134 @@ class DataManager:
         "Dombivli": ["Dombivli"]
     }
 
-    def __init__(self, data_dir: str):
+    # Pincode prefix -> region, longest prefix wins
+    PINCODE_REGIONS = {
+        "400": "Mumbai",
+        "401": "Thane District",
+        "411": "Pune City",
+        "412": "Pune District",
+        "421": "Thane District",
+    }
+
+    def __init__(self, data_dir: str, snapshot_dir: Optional[str] = None, gazetteer: Optional[Gazetteer] = None,
+                 embeddings: Optional[EmbeddingStore] = None, compact: bool = True):
         print(f"Attempting to load data from: {data_dir}")
         self.data_dir = data_dir
+        self.snapshot_dir = snapshot_dir
+        self.compact = compact
+        self.gazetteer = gazetteer or Gazetteer(self.CITY_MAPPING, self.PINCODE_REGIONS)
+        self.embeddings = embeddings
+        self.ranker = Ranker()
+        self._reload_listeners: List[Callable[["DataManager"], None]] = []
+        self._sources: Dict[str, pd.DataFrame] = {}
         self._load_and_join_data()
 
+    @classmethod
+    def from_frame(cls, master_df: pd.DataFrame, embeddings: Optional[EmbeddingStore] = None,
+                   compact: bool = True) -> "DataManager":
+        """Build a DataManager around an already-joined master DataFrame (benchmarks, tests)."""
+        manager = cls.__new__(cls)
+        manager.data_dir = None
+        manager.snapshot_dir = None
+        manager.compact = compact
+        manager.gazetteer = Gazetteer(cls.CITY_MAPPING, cls.PINCODE_REGIONS)
+        manager.embeddings = embeddings
+        manager.ranker = Ranker()
+        manager._reload_listeners = []
+        manager._sources = {}
+        manager._publish(master_df)
+        return manager
+
+    def add_reload_listener(self, callback: Callable[["DataManager"], None]) -> None:
+        """Register a callback run after every (re)load, e.g. to invalidate caches."""
+        self._reload_listeners.append(callback)
+
+    def _publish(self, master_df: pd.DataFrame, text: Optional[TextStore] = None):
+        """
+        Index a freshly joined master frame and swap it in. Readers go through
+        self.index (which holds its own frame), so the swap is a single attribute
+        assignment and in-flight requests keep a consistent view.
+
+        With compact=True the frame is stored lean (see compact_frame): long
+        text goes to a TextStore on the index and is decoded per returned page.
+        """
+        if not master_df.index.equals(pd.RangeIndex(len(master_df))):
+            master_df = master_df.reset_index(drop=True)
+        if self.compact:
+            master_df, text = compact_frame(master_df, text)
+        elif text is not None and len(text):
+            master_df = master_df.assign(**{name: text.series(name) for name in text.columns})
+            text = None
+        index = FilterIndex(master_df, text)
+        # Ranking features ride on the index so both are swapped in together
+        index.rank_features = RankFeatures(master_df)
+        index.semantic = SemanticIndex(master_df, self.embeddings, text=text) if self.embeddings else None
+
+        self.data_version = content_version(master_df, text)
+        self.master_df = master_df
+        self.index = index
+        # Same city/region rules, plus the localities now present, for query parsing
+        self.gazetteer = self.gazetteer.with_localities(master_df['locality'].dropna().unique())
+
+        for callback in self._reload_listeners:
+            callback(self)
+
+    def _source_path(self, key: str) -> str:
+        filepath = os.path.join(self.data_dir, self.COLUMNS[key])
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(f"Missing required CSV file: {filepath}")
+        return filepath
+
+    def _read_source(self, key: str) -> pd.DataFrame:
+        filepath = self._source_path(key)
+
+        if key == "variant":
+            try:
+                df = pd.read_csv(filepath, quoting=1, escapechar='\\')
+            except pd.errors.ParserError:
+                df = pd.read_csv(filepath)
+        else:
+            df = pd.read_csv(filepath)
+
+        print(f"Loaded {key} with {len(df)} rows.")
+        return df
+
+    def _snapshot_fingerprint(self) -> str:
+        return source_fingerprint((self._source_path(key) for key in self.COLUMNS),
+                                  salt=f"{self.gazetteer.signature()}|{','.join(self.MASTER_COLUMNS)}|compact={self.compact}")
+
     def _load_and_join_data(self):
-        dataframes = {}
+        # Prefer the prejoined snapshot when the CSVs have not changed since it was written
+        if self.snapshot_dir:
+            fingerprint = self._snapshot_fingerprint()
+            snapshot = load_snapshot(self.snapshot_dir, fingerprint)
+            if snapshot is not None:
+                self._sources = {}
+                self._publish(*snapshot)
+                print(f"Master DataFrame ready with {len(self.master_df)} final rows (snapshot {fingerprint}).")
+                return
 
         # Load all CSVs
-        for key, filename in self.COLUMNS.items():
-            filepath = os.path.join(self.data_dir, filename)
-            if not os.path.exists(filepath):
-                raise FileNotFoundError(f"Missing required CSV file: {filepath}")
-
-            if key == "variant":
-                try:
-                    df = pd.read_csv(filepath, quoting=1, escapechar='\\')
-                except pd.errors.ParserError:
-                    df = pd.read_csv(filepath)
-            else:
-                df = pd.read_csv(filepath)
+        dataframes = {key: self._read_source(key) for key in self.COLUMNS}
+        self._sources = dataframes
+        self._publish(self._join_frames(dataframes))
+        self._save_snapshot()
 
-            dataframes[key] = df
-            print(f"Loaded {key} with {len(df)} rows.")
+        print(f"Master DataFrame ready with {len(self.master_df)} final rows.")
+
+    def _save_snapshot(self):
+        if not self.snapshot_dir:
+            return
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            write_snapshot(self.master_df, self.snapshot_dir, self._snapshot_fingerprint(), self.index.text)
+        except OSError as e:
+            print(f"Could not write data snapshot: {e}")
 
+    def _join_frames(self, dataframes: Dict[str, pd.DataFrame]) -> pd.DataFrame:
         # --- Data Joining ---
         df_project = dataframes["project"].rename(columns={'id': 'projectId'})
         df_address = dataframes["address"]
-
         df_master = pd.merge(
             df_project,
             df_address[['projectId', 'fullAddress', 'pincode']],
@@ -74,11 +209,12 @@ class DataManager:
             'carpetArea': 'carpet_area',
             'price': 'min_price',
             'bathrooms': 'bathrooms_count',
-            'propertyImages': 'image_url'
+            'propertyImages': 'image_url',
+            'aboutProperty': 'about'
         })
         df_master = pd.merge(
             df_master,
-            df_variant[['configId', 'variantId', 'carpet_area', 'min_price', 'bathrooms_count', 'image_url']],
+            df_variant[['configId', 'variantId', 'carpet_area', 'min_price', 'bathrooms_count', 'image_url', 'about']],
             on='configId',
             how='inner'
         )
@@ -101,93 +237,200 @@ class DataManager:
         }, inplace=True)
 
         # Select final columns
-        self.master_df = df_master.filter(items=[
-            'id', 'project_name', 'status', 'possession_date', 'summary',
-            'bhk_type', 'min_price', 'carpet_area', 'bathrooms', 'image_url',
-            'fullAddress'
-        ])
-
-        # Extract city using CITY_MAPPING
-        def map_city(address: str) -> str:
-            if not isinstance(address, str):
-                return "Unknown City"
-            address_lower = address.lower()
-            for city, keywords in self.CITY_MAPPING.items():
-                for kw in keywords:
-                    if kw.lower() in address_lower:
-                        return city
-            return "Unknown City"
-
-        self.master_df['city'] = self.master_df['fullAddress'].apply(map_city)
-
-        # Extract locality (first part of address)
-        self.master_df['locality'] = self.master_df['fullAddress'].apply(
-            lambda x: x.split(',')[0].strip() if isinstance(x, str) else 'Unknown Locality'
-        )
+        master_df = df_master.filter(items=self.MASTER_COLUMNS)
 
-        print(f"Master DataFrame ready with {len(self.master_df)} final rows.")
+        # City (CITY_MAPPING keywords), locality (first part of address) and pincode region
+        resolved = self.gazetteer.resolve_addresses(master_df['fullAddress'], df_master['pincode'])
+        master_df['city'] = resolved['city']
+        master_df['locality'] = resolved['locality']
+        master_df['region'] = resolved['region']
+
+        return master_df
+
+    # --- Refresh ---
+    @staticmethod
+    def _row_hashes(df: pd.DataFrame) -> set:
+        return set(zip(df['id'], pd.util.hash_pandas_object(df, index=False).to_numpy()))
+
+    def _changed_projects(self, old: Dict[str, pd.DataFrame], new: Dict[str, pd.DataFrame], keys: List[str]) -> set:
+        """Project IDs touched by any added, removed or modified row in the given sources."""
+        projects = set()
+        for key in keys:
+            changed_ids = {row_id for row_id, _ in self._row_hashes(old[key]) ^ self._row_hashes(new[key])}
+            rows = pd.concat([old[key], new[key]])
+            rows = rows[rows['id'].isin(changed_ids)]
+            if key == "project":
+                projects.update(rows['id'])
+            elif key in ("address", "config"):
+                projects.update(rows['projectId'])
+            else:
+                configs = pd.concat([old["config"], new["config"]])
+                projects.update(configs.loc[configs['id'].isin(rows['configurationId']), 'projectId'])
+        return projects
+
+    @staticmethod
+    def _project_subset(sources: Dict[str, pd.DataFrame], projects: set) -> Dict[str, pd.DataFrame]:
+        config = sources["config"][sources["config"]['projectId'].isin(projects)]
+        return {
+            "project": sources["project"][sources["project"]['id'].isin(projects)],
+            "address": sources["address"][sources["address"]['projectId'].isin(projects)],
+            "config": config,
+            "variant": sources["variant"][sources["variant"]['configurationId'].isin(config['id'])],
+        }
 
-    def filter_data(self, filters: Dict[str, Any]) -> List[PropertyCard]:
-        if self.master_df is None or self.master_df.empty:
-            return []
-
-        df = self.master_df.copy()
-        conditions = []
-
-        # City (strict match)
-        if filters.get("city"):
-            city = filters["city"].strip().lower()
-            conditions.append(df['city'].str.lower() == city)
-
-        # BHK
-        if filters.get("bhk"):
-            bhk_list = [b.lower().replace('bhk', '').strip() for b in filters["bhk"]]
-            conditions.append(df['bhk_type'].str.lower().str.replace('bhk', '').isin(bhk_list))
-
-        # Budget
-        if filters.get("min_budget"):
-            conditions.append(df['min_price'] >= filters["min_budget"])
-        if filters.get("max_budget"):
-            conditions.append(df['min_price'] <= filters["max_budget"])
-
-        # Project name
-        if filters.get("project_name"):
-            pname = filters["project_name"].strip().lower()
-            conditions.append(df['project_name'].str.lower().str.contains(pname, na=False))
-
-        # Locality
-        if filters.get("locality"):
-            loc = filters["locality"].strip().lower()
-            conditions.append(df['locality'].str.lower().str.contains(loc, na=False))
-
-        # Apply filters
-        if conditions:
-            final_condition = conditions[0]
-            for cond in conditions[1:]:
-                final_condition &= cond
-            df_filtered = df[final_condition]
+    def reload(self, keys: Optional[List[str]] = None, full_rebuild_ratio: float = 0.5) -> Dict[str, Any]:
+        """
+        Re-read the given source CSVs (all by default) and swap in a new master frame.
+
+        When only a minority of projects changed, just those projects are re-joined
+        and spliced into the current frame; otherwise all sources are re-merged.
+        """
+        # Started from a snapshot: the raw sources were never read, so read them all
+        if keys is None or len(self._sources) < len(self.COLUMNS):
+            keys = list(self.COLUMNS)
+        sources = dict(self._sources)
+        for key in keys:
+            sources[key] = self._read_source(key)
+
+        if len(self._sources) == len(self.COLUMNS) and self.master_df is not None:
+            changed = self._changed_projects(self._sources, sources, keys)
+        else:
+            changed = None
+
+        if changed is None or len(changed) > full_rebuild_ratio * max(len(sources["project"]), 1):
+            mode = "full"
+            master_df = self._join_frames(sources)
+        elif not changed:
+            mode = "unchanged"
+            master_df = None
         else:
-            df_filtered = df.head(100)
-
-        df_filtered = df_filtered.where(pd.notnull(df_filtered), None)
-
-        properties_list = [
-            PropertyCard(
-                id=row.get('id'),
-                project_name=row.get('project_name', 'N/A'),
-                city=row.get('city'),
-                locality=row.get('locality'),
-                status=row.get('status'),
-                possession_date=row.get('possession_date'),
-                bhk_type=row.get('bhk_type'),
-                min_price=row.get('min_price'),
-                carpet_area=row.get('carpet_area'),
-                bathrooms=row.get('bathrooms'),
-                summary=row.get('summary'),
-                image_url=row.get('image_url'),
-                full_address=row.get('fullAddress')
-            )
-            for _, row in df_filtered.iterrows()
+            mode = "incremental"
+            rebuilt = self._join_frames(self._project_subset(sources, changed))
+            keep = np.flatnonzero(~self.master_df['id'].isin(changed).to_numpy())
+            kept = self.master_df.iloc[keep]
+            # Text held outside the frame comes back for the kept rows before splicing
+            text = self.index.text
+            kept = kept.assign(**{name: text.take(name, keep) for name in text.columns})
+            # Empty frames and all-NA columns would decide result dtypes differently in future pandas;
+            # leave them out and let the concat fill the gaps
+            columns = list(rebuilt.columns)
+            parts = [frame for frame in (kept, rebuilt.dropna(axis=1, how='all')) if len(frame) and len(frame.columns)]
+            master_df = pd.concat(parts or [rebuilt], ignore_index=True).reindex(columns=columns)
+
+        self._sources = sources
+        if master_df is not None:
+            self._publish(master_df)
+            self._save_snapshot()
+
+        print(f"Data reload ({mode}): {len(changed) if changed is not None else 'all'} projects, {len(self.master_df)} rows.")
+        return {
+            "mode": mode,
+            "sources": keys,
+            "changed_projects": len(changed) if changed is not None else None,
+            "rows": len(self.master_df),
+        }
+
+    def suggest(self, field: str, text: str, k: int = 5) -> List[FuzzyMatch]:
+        """Closest real project_name / locality / address values to free text."""
+        index = self.index
+        return index.fuzzy(field, text, k=k) if index is not None else []
+
+    def snap_filters(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace a project_name or locality that matches nothing with the closest real value."""
+        index = self.index
+        if index is None:
+            return filters
+        snapped = dict(filters)
+        for field, postings in (("project_name", index.project_postings), ("locality", index.locality_postings)):
+            text = filters.get(field)
+            if not isinstance(text, str) or not text.strip():
+                continue
+            needle = text.strip().lower()
+            if any(needle in key for key in postings):
+                continue
+            matches = index.fuzzy(field, needle, k=1)
+            if matches:
+                snapped[field] = matches[0].value
+        return snapped
+
+    def search(self, filters: Dict[str, Any], max_results: int = 50, within: Optional[RankedResults] = None,
+               keep_matches: int = 0) -> RankedResults:
+        """
+        Rank the rows matching filters and keep the best max_results positions,
+        best first. Only the kept rows are ever sorted, and nothing is
+        materialized until a page is requested.
+
+        A free-text 'preferences' filter (e.g. 'sea-facing near good schools')
+        orders the structured matches by semantic similarity instead, with the
+        relevance score breaking ties between rows of the same listing text.
+
+        within is an earlier search (a previous conversation turn): when filters
+        only narrow its filters and it kept its matches, just the changed
+        filters are checked against those rows. Up to keep_matches structured
+        matches are kept on the result for the next turn.
+        """
+        index = self.index
+        if index is None or index.size == 0:
+            return RankedResults(index, np.empty(0, dtype=np.int64), 0, filters)
+
+        changed = None
+        if within is not None and within.matches is not None and within.index is index:
+            changed = narrowed_filters(within.filters, filters)
+        positions = index.lookup(filters) if changed is None else index.refine(within.matches, changed)
+        return self._rank(index, filters, positions, max_results, keep_matches)
+
+    def search_batch(self, filters_list: List[Dict[str, Any]], max_results: int = 50) -> List[RankedResults]:
+        """
+        search() for many filter sets at once, e.g. saved queries in an offline
+        job. Identical filter sets are evaluated once and share their
+        RankedResults (BHK order counts, since it affects ranking); the rest are
+        matched with FilterIndex.lookup_batch, which computes the candidates of
+        each distinct non-budget filter combination once.
+        """
+        index = self.index
+        if index is None or index.size == 0:
+            return [RankedResults(index, np.empty(0, dtype=np.int64), 0, filters) for filters in filters_list]
+
+        distinct: Dict[str, int] = {}
+        unique: List[Dict[str, Any]] = []
+        slots = []
+        for filters in filters_list:
+            key = json.dumps(filters, sort_keys=True, default=str)
+            if key not in distinct:
+                distinct[key] = len(unique)
+                unique.append(filters)
+            slots.append(distinct[key])
+
+        ranked = [
+            self._rank(index, filters, positions, max_results)
+            for filters, positions in zip(unique, index.lookup_batch(unique))
         ]
+        return [ranked[slot] for slot in slots]
+
+    def _rank(self, index: FilterIndex, filters: Dict[str, Any], positions: Optional[np.ndarray],
+              max_results: int, keep_matches: int = 0) -> RankedResults:
+        """Order matched positions (None meaning every row) and keep the best max_results."""
+        # The unfiltered ranking depends only on the loaded data, so it is kept per load
+        features = index.rank_features
+        matches = positions if positions is not None and len(positions) <= keep_matches else None
+        preferences = filters.get("preferences")
+        if isinstance(preferences, str) and preferences.strip() and index.semantic is not None:
+            total = index.size if positions is None else len(positions)
+            rows, similarity = index.semantic.search(preferences.strip(), max_results, positions)
+            order = np.lexsort((-self.ranker.score(features, rows, filters), -similarity))
+            positions = rows[order[:max_results]]
+        elif positions is not None:
+            total = len(positions)
+            positions = self.ranker.top_k(features, positions, filters, max_results)
+        else:
+            total = index.size
+            positions = features.unfiltered.get(max_results)
+            if positions is None:
+                positions = self.ranker.top_k(features, np.arange(index.size), {}, max_results)
+                features.unfiltered[max_results] = positions
+
+        return RankedResults(index, positions, total, filters, matches)
 
-        return properties_list[:50]
+    def filter_data(self, filters: Dict[str, Any], limit: int = 50) -> List[PropertyCard]:
+        """The top `limit` matching properties, best match first."""
+        return self.search(filters, max_results=limit).page(0, limit)
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from services.snapshot import file_sha1
+
+
+class DataRefresher:
+    """
+    Watches the DataManager's source CSVs and reloads them without a restart.
+
+    A cheap (mtime, size) check runs every interval seconds; files that look
+    changed are content-hashed so touching a file does not trigger a reload.
+    Reloads run in a worker thread and DataManager swaps the new master frame
+    in atomically, so requests keep being served from the old one meanwhile.
+    """
+
+    def __init__(self, data_manager, interval: float = 30.0):
+        self.data_manager = data_manager
+        self.interval = interval
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self._hashes: Dict[str, str] = {}
+        for key in data_manager.COLUMNS:
+            self._stats[key], self._hashes[key] = self._stat(key), self._hash(key)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.data_manager.data_dir, self.data_manager.COLUMNS[key])
+
+    def _stat(self, key: str) -> Tuple[int, int]:
+        stat = os.stat(self._path(key))
+        return stat.st_mtime_ns, stat.st_size
+
+    def _hash(self, key: str) -> str:
+        return file_sha1(self._path(key))
+
+    def changed_sources(self) -> List[str]:
+        changed = []
+        for key in self.data_manager.COLUMNS:
+            stat = self._stat(key)
+            if stat == self._stats[key]:
+                continue
+            self._stats[key] = stat
+            digest = self._hash(key)
+            if digest != self._hashes[key]:
+                self._hashes[key] = digest
+                changed.append(key)
+        return changed
+
+    def refresh(self, force: bool = False) -> Dict[str, Any]:
+        """Reload changed sources (all of them when force=True) and report what happened."""
+        with self._lock:
+            start = time.perf_counter()
+            changed = self.changed_sources()
+            if force:
+                changed = list(self.data_manager.COLUMNS)
+
+            if changed:
+                try:
+                    report = self.data_manager.reload(changed)
+                except Exception:
+                    # Forget what we saw so the next check retries these files
+                    for key in changed:
+                        self._stats[key], self._hashes[key] = (0, 0), ""
+                    raise
+            else:
+                report = {"mode": "unchanged", "sources": [], "changed_projects": 0,
+                          "rows": len(self.data_manager.master_df)}
+
+            report["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            report["data_version"] = self.data_manager.data_version
+            self.last_report = report
+            return report
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                print(f"Data refresh error: {e}")
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,128 @@
+import os
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+
+class HashingEncoder:
+    """
+    Model-free fallback embedding: word and character-trigram counts hashed
+    into `dim` buckets and L2-normalized. It only captures lexical overlap
+    ('sea facing' ~ 'sea-facing views'), but keeps semantic search usable when
+    sentence-transformers or its model weights are unavailable.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+        self._buckets: Dict[str, int] = {}
+
+    def _bucket(self, feature: str) -> int:
+        bucket = self._buckets.get(feature)
+        if bucket is None:
+            bucket = self._buckets[feature] = zlib.crc32(feature.encode()) % self.dim
+        return bucket
+
+    def encode(self, texts: Sequence[str], batch_size: int = 256) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                vectors[i, self._bucket(word)] += 1.0
+                padded = f" {word} "
+                for j in range(len(padded) - 2):
+                    vectors[i, self._bucket(padded[j:j + 3])] += 0.5
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class SentenceEncoder:
+    """sentence-transformers model on CPU, producing normalized float32 vectors in batches."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = model_name
+
+    def encode(self, texts: Sequence[str], batch_size: int = 64) -> np.ndarray:
+        return self.model.encode(
+            list(texts), batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32, copy=False)
+
+
+def load_encoder(model_name: str, fallback_dim: int = 384):
+    """The named sentence-transformers model, or a HashingEncoder when it cannot be loaded."""
+    try:
+        return SentenceEncoder(model_name)
+    except Exception as e:
+        print(f"Embedding model '{model_name}' unavailable ({e}); using hashed text features.")
+        return HashingEncoder(fallback_dim)
+
+
+def text_keys(texts: Sequence[str]) -> np.ndarray:
+    """Stable 64-bit content hash per text (the same in every process)."""
+    return pd.util.hash_array(np.asarray(texts, dtype=object))
+
+
+class EmbeddingStore:
+    """
+    Embeddings of document texts persisted under directory/<encoder name>/ as
+    two .npy files: sorted 64-bit text hashes and the matching vectors. Only
+    texts not seen before are encoded, so restarts and reloads that change a
+    few listings re-encode just those. The files are memory-mapped on load.
+    """
+
+    def __init__(self, directory: Optional[str], encoder, batch_size: int = 64):
+        self.encoder = encoder
+        self.batch_size = batch_size
+        self.path = os.path.join(directory, re.sub(r"[^\w.-]+", "_", encoder.name)) if directory else None
+
+    def _load(self):
+        if self.path and os.path.exists(os.path.join(self.path, "vectors.npy")):
+            try:
+                keys = np.load(os.path.join(self.path, "keys.npy"), mmap_mode="r")
+                vectors = np.load(os.path.join(self.path, "vectors.npy"), mmap_mode="r")
+                if len(keys) == len(vectors) and vectors.shape[1] == self.encoder.dim:
+                    return keys, vectors
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable embedding store {self.path}: {e}")
+        return np.empty(0, dtype=np.uint64), np.empty((0, self.encoder.dim), dtype=np.float32)
+
+    def _save(self, keys: np.ndarray, vectors: np.ndarray) -> None:
+        if not self.path:
+            return
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            for name, array in (("keys", keys), ("vectors", vectors)):
+                tmp = os.path.join(self.path, f"{name}.tmp-{os.getpid()}.npy")
+                np.save(tmp, array)
+                os.replace(tmp, os.path.join(self.path, f"{name}.npy"))
+        except OSError as e:
+            print(f"Could not write embedding store: {e}")
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Vectors for texts, in order, encoding only the ones missing from the store."""
+        keys = text_keys(texts)
+        stored_keys, stored = self._load()
+        slot = np.searchsorted(stored_keys, keys)
+        slot[slot == len(stored_keys)] = 0
+        known = (stored_keys[slot] == keys) if len(stored_keys) else np.zeros(len(keys), dtype=bool)
+
+        vectors = np.empty((len(texts), self.encoder.dim), dtype=np.float32)
+        vectors[known] = stored[slot[known]]
+        missing = np.flatnonzero(~known)
+        if not len(missing):
+            return vectors
+
+        print(f"Encoding {len(missing)} of {len(texts)} texts with {self.encoder.name}...")
+        for start in range(0, len(missing), self.batch_size * 16):
+            batch = missing[start:start + self.batch_size * 16]
+            vectors[batch] = self.encoder.encode([texts[i] for i in batch], batch_size=self.batch_size)
+
+        # Keep exactly the current texts, so the store does not grow with stale listings
+        unique_keys, first = np.unique(keys, return_index=True)
+        self._save(unique_keys, vectors[first])
+        return vectors
@@ -0,0 +1,320 @@
+from functools import cached_property
+from typing import Callable, Dict, List, Any, Optional, Tuple
+import json
+import numpy as np
+import pandas as pd
+from services.compact import TextStore
+from services.fuzzy_index import FuzzyIndex, FuzzyMatch
+
+# Trigram coverage a value needs before a misspelt filter snaps to it
+FUZZY_MIN_SCORE = 0.6
+
+
+def normalize_bhk(value: Any) -> str:
+    """Normalize a BHK label ('2BHK', '2 bhk', '2') to its bare count ('2')."""
+    if not isinstance(value, str):
+        return ""
+    return value.lower().replace('bhk', '').strip()
+
+
+def canonical_filters(filters: Dict[str, Any]) -> str:
+    """
+    Stable string form of a filter dict: empty values dropped, text lowercased,
+    BHK normalized and sorted. Filter dicts that select the same rows map to
+    the same string.
+    """
+    canonical = {}
+    for key, value in filters.items():
+        if value in (None, "", [], 0):
+            continue
+        if key == "bhk":
+            value = sorted({normalize_bhk(b) for b in value})
+        elif isinstance(value, str):
+            value = value.strip().lower()
+        canonical[key] = value
+    return json.dumps(canonical, sort_keys=True, default=str)
+
+
+def narrowed_filters(previous: Dict[str, Any], filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    When filters select a subset of what previous selected (every earlier
+    constraint kept or tightened, possibly with new ones), the filters that
+    still have to be checked against the earlier matches; None otherwise.
+    'preferences' only reorders results, so it is ignored on both sides.
+    """
+    old, new = json.loads(canonical_filters(previous)), json.loads(canonical_filters(filters))
+    old.pop("preferences", None)
+    new.pop("preferences", None)
+    for key, value in old.items():
+        if key not in new:
+            return None
+        if key == "bhk":
+            if not set(new[key]) <= set(value):
+                return None
+        elif key == "min_budget":
+            if new[key] < value:
+                return None
+        elif key == "max_budget":
+            if new[key] > value:
+                return None
+        elif new[key] != value:
+            return None
+    return {key: filters[key] for key, value in new.items() if old.get(key) != value}
+
+
+def _postings(column: pd.Series, normalize: Callable[[str], str]) -> Dict[str, np.ndarray]:
+    """
+    Inverted map from each normalized value to the sorted row positions holding it.
+    Works on dictionary codes, so normalize runs once per distinct value, not per row.
+    """
+    values = column if isinstance(column.dtype, pd.CategoricalDtype) else column.astype('category')
+    categories = values.cat.categories
+    codes = values.cat.codes.to_numpy()
+
+    order = np.argsort(codes, kind='stable')
+    boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+
+    postings: Dict[str, np.ndarray] = {}
+    for positions in np.split(order, boundaries):
+        if not len(positions):
+            continue
+        code = codes[positions[0]]
+        raw = categories[code] if code >= 0 else None
+        key = normalize(raw) if isinstance(raw, str) else ""
+        if key in postings:
+            positions = np.sort(np.concatenate([postings[key], positions]))
+        postings[key] = positions.astype(np.int64, copy=False)
+    return postings
+
+
+class FilterIndex:
+    """
+    Columnar index over the master DataFrame, built once at load time so that
+    filter_data never copies the frame or re-runs string operations per request.
+
+    Categorical filters (city, BHK) are answered from inverted maps of row
+    positions, substring filters (project name, locality) scan only the distinct
+    lowercase values, and budget ranges use binary search over a sorted price array.
+    Columns may be plain object or categorical (e.g. memory-mapped snapshots);
+    long text columns may live in a TextStore beside the frame instead.
+
+    When a project name or locality matches no value as a substring, the
+    lookup falls back to the closest values in a trigram index (built on first
+    use), so 'ashwni' still finds 'Ashwini'.
+    """
+
+    def __init__(self, df: pd.DataFrame, text: Optional[TextStore] = None):
+        self.df = df
+        self.text = text or TextStore()
+        self.size = len(df)
+
+        self.city_postings = _postings(df['city'], lambda v: v.strip().lower())
+        self.bhk_postings = _postings(df['bhk_type'], normalize_bhk)
+        self.locality_postings = _postings(df['locality'], str.lower)
+        self.project_postings = _postings(df['project_name'], str.lower)
+
+        self.price = df['min_price'].to_numpy(dtype=np.float64)
+        self.price_order = np.argsort(self.price, kind='stable')
+        self.price_sorted = self.price[self.price_order]
+
+    def column(self, name: str) -> pd.Series:
+        """A whole column, from the frame or (decoded as a categorical) from the text store."""
+        return self.text.series(name) if name in self.text else self.df[name]
+
+    # --- Fuzzy indexes, built lazily: most requests never need them ---
+    def _fuzzy_index(self, column: str, postings: Dict[str, np.ndarray]) -> FuzzyIndex:
+        values = self.column(column)
+        categories = values.cat.categories if isinstance(values.dtype, pd.CategoricalDtype) else values.dropna().unique()
+        display = {v.lower(): v.strip() for v in categories if isinstance(v, str)}
+        return FuzzyIndex(postings, display)
+
+    @cached_property
+    def project_fuzzy(self) -> FuzzyIndex:
+        return self._fuzzy_index('project_name', self.project_postings)
+
+    @cached_property
+    def locality_fuzzy(self) -> FuzzyIndex:
+        return self._fuzzy_index('locality', self.locality_postings)
+
+    @cached_property
+    def address_fuzzy(self) -> FuzzyIndex:
+        return self._fuzzy_index('fullAddress', _postings(self.column('fullAddress'), str.lower))
+
+    def fuzzy(self, field: str, text: str, k: int = 5, min_score: float = FUZZY_MIN_SCORE) -> List[FuzzyMatch]:
+        """Closest project_name / locality / address values to free text, best first."""
+        index = {"project_name": self.project_fuzzy, "locality": self.locality_fuzzy, "address": self.address_fuzzy}[field]
+        return index.search(text, k=k, min_score=min_score)
+
+    # --- Per-row posting ids, built lazily for refining earlier matches ---
+    def _row_keys(self, postings: Dict[str, np.ndarray]) -> Tuple[np.ndarray, Dict[str, int]]:
+        codes = np.empty(self.size, dtype=np.int32)
+        ids = {}
+        for key_id, (key, positions) in enumerate(postings.items()):
+            codes[positions] = key_id
+            ids[key] = key_id
+        return codes, ids
+
+    @cached_property
+    def city_rows(self) -> Tuple[np.ndarray, Dict[str, int]]:
+        return self._row_keys(self.city_postings)
+
+    @cached_property
+    def bhk_rows(self) -> Tuple[np.ndarray, Dict[str, int]]:
+        return self._row_keys(self.bhk_postings)
+
+    @cached_property
+    def locality_rows(self) -> Tuple[np.ndarray, Dict[str, int]]:
+        return self._row_keys(self.locality_postings)
+
+    @cached_property
+    def project_rows(self) -> Tuple[np.ndarray, Dict[str, int]]:
+        return self._row_keys(self.project_postings)
+
+    # --- Individual lookups ---
+    def _exact(self, postings: Dict[str, np.ndarray], keys: List[str]) -> np.ndarray:
+        hits = [postings[k] for k in keys if k in postings]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        if len(hits) == 1:
+            return hits[0]
+        # Union through a dense bitmap: linear in rows, no sort of the concatenation
+        mask = np.zeros(self.size, dtype=bool)
+        for positions in hits:
+            mask[positions] = True
+        return np.flatnonzero(mask)
+
+    def _contains(self, postings: Dict[str, np.ndarray], needle: str, field: str) -> np.ndarray:
+        keys = [k for k in postings if needle in k]
+        if keys:
+            return self._exact(postings, keys)
+
+        # No substring hit: take the best fuzzy match (and anything tied with it)
+        matches = self.fuzzy(field, needle)
+        if not matches:
+            return np.empty(0, dtype=np.int64)
+        best = [m.positions for m in matches if m.score == matches[0].score]
+        return best[0] if len(best) == 1 else np.unique(np.concatenate(best))
+
+    def _price_range(self, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        lo = np.searchsorted(self.price_sorted, low, side='left') if low else 0
+        hi = np.searchsorted(self.price_sorted, high, side='right') if high else self.size
+        return np.sort(self.price_order[lo:hi])
+
+    def _price_mask(self, positions: np.ndarray, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        prices = self.price[positions]
+        keep = np.ones(len(positions), dtype=bool)
+        if low:
+            keep &= prices >= low
+        if high:
+            keep &= prices <= high
+        return positions[keep]
+
+    # --- Combined lookup ---
+    def lookup(self, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Return the sorted row positions matching all filters, or None when no
+        filter is set (callers decide what an unfiltered search returns).
+        """
+        candidates = []
+
+        if filters.get("city"):
+            candidates.append(self._exact(self.city_postings, [filters["city"].strip().lower()]))
+
+        if filters.get("bhk"):
+            candidates.append(self._exact(self.bhk_postings, [normalize_bhk(b) for b in filters["bhk"]]))
+
+        if filters.get("project_name"):
+            candidates.append(self._contains(self.project_postings, filters["project_name"].strip().lower(), "project_name"))
+
+        if filters.get("locality"):
+            candidates.append(self._contains(self.locality_postings, filters["locality"].strip().lower(), "locality"))
+
+        low, high = filters.get("min_budget"), filters.get("max_budget")
+
+        if not candidates:
+            if low or high:
+                return self._price_range(low, high)
+            return None
+
+        # Intersect smallest-first so every step works on the fewest positions
+        candidates.sort(key=len)
+        positions = candidates[0]
+        for other in candidates[1:]:
+            if not len(positions):
+                break
+            mask = np.zeros(self.size, dtype=bool)
+            mask[other] = True
+            positions = positions[mask[positions]]
+
+        # Once the candidate set is small, checking prices directly beats a range scan
+        if low or high:
+            positions = self._price_mask(positions, low, high)
+
+        return positions
+
+    def lookup_batch(self, filters_list: List[Dict[str, Any]]) -> List[Optional[np.ndarray]]:
+        """
+        lookup() for many filter sets. Filter sets that differ only in budget
+        share one candidate set per city/BHK/project/locality combination,
+        computed once and sorted by price; each budget is then a binary search
+        over those candidates.
+        """
+        groups: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        results: List[Optional[np.ndarray]] = []
+        for filters in filters_list:
+            structural = {k: filters.get(k) for k in ("city", "bhk", "project_name", "locality") if filters.get(k)}
+            if not structural:
+                results.append(self.lookup(filters))
+                continue
+
+            key = canonical_filters(structural)
+            group = groups.get(key)
+            if group is None:
+                base = self.lookup(structural)
+                prices = self.price[base]
+                order = np.argsort(prices, kind='stable')
+                # NaN prices sort last and never satisfy a budget
+                group = groups[key] = (base, order, prices[order][:np.count_nonzero(~np.isnan(prices))])
+            base, order, sorted_prices = group
+
+            low, high = filters.get("min_budget"), filters.get("max_budget")
+            if not (low or high):
+                results.append(base)
+                continue
+            lo = np.searchsorted(sorted_prices, low, side='left') if low else 0
+            hi = np.searchsorted(sorted_prices, high, side='right') if high else len(sorted_prices)
+            results.append(np.sort(base[order[lo:hi]]))
+        return results
+
+    def _keep_keys(self, positions: np.ndarray, rows: Tuple[np.ndarray, Dict[str, int]], keys: List[str]) -> np.ndarray:
+        codes, ids = rows
+        wanted = [ids[k] for k in keys if k in ids]
+        return positions[np.isin(codes[positions], wanted)]
+
+    def refine(self, positions: np.ndarray, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        The subset of positions (sorted, e.g. an earlier lookup) that also
+        matches filters. Each filter is checked on the given rows only, so the
+        cost grows with len(positions), not with the size of the frame.
+        """
+        if filters.get("city"):
+            positions = self._keep_keys(positions, self.city_rows, [filters["city"].strip().lower()])
+
+        if filters.get("bhk"):
+            positions = self._keep_keys(positions, self.bhk_rows, [normalize_bhk(b) for b in filters["bhk"]])
+
+        for field, postings, rows in (("project_name", self.project_postings, self.project_rows),
+                                      ("locality", self.locality_postings, self.locality_rows)):
+            if not filters.get(field):
+                continue
+            needle = filters[field].strip().lower()
+            keys = [k for k in postings if needle in k]
+            if keys:
+                positions = self._keep_keys(positions, rows, keys)
+            else:
+                positions = positions[np.isin(positions, self._contains(postings, needle, field), assume_unique=True)]
+
+        low, high = filters.get("min_budget"), filters.get("max_budget")
+        if low or high:
+            positions = self._price_mask(positions, low, high)
+        return positions
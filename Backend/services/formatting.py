@@ -0,0 +1,52 @@
+from collections import Counter
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+
+def format_price(value: float) -> str:
+    """Format price in Cr/Lac with rupee symbol."""
+    if value is None:
+        return "N/A"
+    if value >= 1e7:
+        return f"₹{value/1e7:.2f} Cr"
+    if value >= 1e5:
+        return f"₹{value/1e5:.2f} Lacs"
+    return f"₹{value:,.0f}"
+
+
+def format_prices(values: np.ndarray) -> List[Optional[str]]:
+    """Vectorized format_price over a price column; missing prices stay None."""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), None, dtype=object)
+
+    crore = values >= 1e7
+    lac = (values >= 1e5) & ~crore
+    rest = (values < 1e5)
+
+    out[crore] = np.char.add(np.char.add("₹", np.char.mod("%.2f", values[crore] / 1e7)), " Cr")
+    out[lac] = np.char.add(np.char.add("₹", np.char.mod("%.2f", values[lac] / 1e5)), " Lacs")
+    out[rest] = [f"₹{v:,.0f}" for v in values[rest]]
+    return out.tolist()
+
+
+def to_dicts(results: List[Any]) -> List[Dict[str, Any]]:
+    return [r.dict() if hasattr(r, "dict") else r for r in results]
+
+
+def summary_stats(props: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregates shared by the template bullets and the LLM summary prompt."""
+    prices = [p.get("min_price") for p in props if p.get("min_price") is not None]
+    min_price, max_price = (format_price(min(prices)), format_price(max(prices))) if prices else ("N/A", "N/A")
+    return {
+        "count": len(props),
+        "min_price": min_price,
+        "max_price": max_price,
+        "bhks": sorted(set(p.get("bhk_type") or "N/A" for p in props)),
+        "cities": sorted(set(p.get("city") or "Unknown" for p in props)),
+        "statuses": Counter((p.get("status") or "UNKNOWN").replace("_", " ").title() for p in props),
+        "sample": [
+            {"project": p.get("project_name"), "bhk": p.get("bhk_type"),
+             "price": format_price(p.get("min_price", 0)), "city": p.get("city") or "Unknown"}
+            for p in props[:3]
+        ],
+    }
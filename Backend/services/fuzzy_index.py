@@ -0,0 +1,70 @@
+import re
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+
+
+def trigrams(text: str) -> List[str]:
+    """Distinct trigrams of each word, padded like pg_trgm ('  a', ' ab', 'abc', 'bc ')."""
+    grams = set()
+    for word in re.findall(r"\w+", text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return sorted(grams)
+
+
+class FuzzyMatch(NamedTuple):
+    value: str
+    score: float
+    positions: np.ndarray
+
+
+class FuzzyIndex:
+    """
+    Trigram inverted index over the distinct values of one text column.
+
+    A lookup gathers the posting lists of the query's trigrams and counts, per
+    value, how many it shares. The score is the Dice coefficient over both
+    trigram sets, so a long value does not match a short query just by
+    containing most of its trigrams ('kharadi' is not a Sewri address, and
+    'mulund west' is not 'Mulund East'); ties go to the value covering more
+    of the query. Substrings are matched before fuzzy lookup, so this only
+    decides misspellings. Cost depends on how many values share a trigram
+    with the query, not on the number of rows.
+    """
+
+    def __init__(self, postings: Dict[str, np.ndarray], display: Optional[Dict[str, str]] = None):
+        self.keys = [k for k in postings if k]
+        self.postings = postings
+        self.display = display or {}
+
+        grams: Dict[str, List[int]] = {}
+        counts = np.zeros(len(self.keys), dtype=np.int32)
+        for value_id, key in enumerate(self.keys):
+            value_grams = trigrams(key)
+            counts[value_id] = len(value_grams)
+            for gram in value_grams:
+                grams.setdefault(gram, []).append(value_id)
+        self.gram_counts = counts
+        self.grams = {gram: np.array(ids, dtype=np.int32) for gram, ids in grams.items()}
+
+    def search(self, text: str, k: int = 5, min_score: float = 0.5) -> List[FuzzyMatch]:
+        """Top-k values scoring at least min_score, best first."""
+        query = trigrams(text)
+        hits = [self.grams[g] for g in query if g in self.grams]
+        if not hits:
+            return []
+
+        counts = np.bincount(np.concatenate(hits), minlength=len(self.keys))
+        ids = np.flatnonzero(counts)
+        shared = counts[ids]
+        dice = 2 * shared / (len(query) + self.gram_counts[ids])
+        keep = dice >= min_score
+        ids, shared, dice = ids[keep], shared[keep], dice[keep]
+        if not len(ids):
+            return []
+
+        order = np.lexsort((-shared, -dice))[:k]
+        return [
+            FuzzyMatch(self.display.get(self.keys[i], self.keys[i]), round(float(dice[j]), 3), self.postings[self.keys[i]])
+            for j, i in zip(order, ids[order])
+        ]
@@ -0,0 +1,203 @@
+import json
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+_PINCODE_RE = re.compile(r"(?<!\d)(\d{6})(?!\d)")
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of lowercase keywords.
+
+    One left-to-right pass over a text reports every keyword occurrence, so
+    the cost no longer grows with the number of keywords the way looping
+    `kw in text` over the whole gazetteer does.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[str]] = [[]]
+        for keyword in keywords:
+            self._add(keyword)
+        self._link()
+
+    def _add(self, keyword: str):
+        state = 0
+        for char in keyword:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        if keyword not in self.output[state]:
+            self.output[state].append(keyword)
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def iter_matches(self, text: str):
+        """Yield (start, end, keyword) for every occurrence, overlaps included."""
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for keyword in self.output[state]:
+                yield i + 1 - len(keyword), i + 1, keyword
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """Leftmost-longest, non-overlapping whole-word matches."""
+        matches = [
+            (start, end, keyword) for start, end, keyword in self.iter_matches(text)
+            if (start == 0 or not _is_word(text[start - 1])) and (end == len(text) or not _is_word(text[end]))
+        ]
+        matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+        chosen, last_end = [], 0
+        for start, end, keyword in matches:
+            if start >= last_end:
+                chosen.append((start, end, keyword))
+                last_end = end
+        return chosen
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _entity_names(names: Iterable[str]) -> Dict[str, str]:
+    """Lowercase -> original for names long and wordy enough to match on (skips '104', 'A')."""
+    canonical = {}
+    for name in names:
+        if not isinstance(name, str):
+            continue
+        name = name.strip()
+        if len(name) >= 3 and re.search(r"[a-zA-Z]{3}", name):
+            canonical.setdefault(name.lower(), name)
+    return canonical
+
+
+class Gazetteer:
+    """
+    City keywords, known localities and pincode regions compiled into
+    automata once, and shared by data loading (resolve_addresses) and query
+    parsing (find_cities / find_locality).
+
+    city_mapping keeps DataManager.CITY_MAPPING semantics: an address belongs
+    to the first city, in mapping order, with a keyword occurring anywhere in
+    it. pincode_regions maps pincode prefixes to a region name; the longest
+    matching prefix wins.
+    """
+
+    def __init__(self, city_mapping: Dict[str, List[str]], pincode_regions: Optional[Dict[str, str]] = None,
+                 localities: Iterable[str] = ()):
+        self.city_mapping = city_mapping
+        self.pincode_regions = dict(pincode_regions or {})
+        # keyword -> (priority, city); the first city listing a keyword owns it
+        self.city_keywords: Dict[str, Tuple[int, str]] = {}
+        for city, keywords in city_mapping.items():
+            for kw in keywords:
+                self.city_keywords.setdefault(kw.lower(), (len(self.city_keywords), city))
+        self.city_matcher = KeywordAutomaton(self.city_keywords)
+        self.localities = _entity_names(localities)
+        self.locality_matcher = KeywordAutomaton(self.localities)
+        self._prefix_lengths = sorted({len(p) for p in self.pincode_regions}, reverse=True)
+
+    @classmethod
+    def from_file(cls, path: str, localities: Iterable[str] = ()) -> "Gazetteer":
+        """Load {"cities": {...}, "pincode_regions": {...}} from a JSON file."""
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        return cls(config["cities"], config.get("pincode_regions"), localities)
+
+    def signature(self) -> str:
+        """Stable text form of the city and region rules, for cache/snapshot keys."""
+        return json.dumps([self.city_mapping, self.pincode_regions], sort_keys=True)
+
+    def with_localities(self, localities: Iterable[str]) -> "Gazetteer":
+        return Gazetteer(self.city_mapping, self.pincode_regions, localities)
+
+    # --- Data loading ---
+    def resolve_city(self, address: str) -> str:
+        if not isinstance(address, str):
+            return "Unknown City"
+        best = None
+        for _, _, keyword in self.city_matcher.iter_matches(address.lower()):
+            candidate = self.city_keywords[keyword]
+            if best is None or candidate < best:
+                best = candidate
+        return best[1] if best else "Unknown City"
+
+    def resolve_region(self, pincode) -> Optional[str]:
+        if pincode is None or (isinstance(pincode, float) and np.isnan(pincode)):
+            return None
+        digits = str(int(pincode)) if isinstance(pincode, (int, float, np.integer, np.floating)) else str(pincode).strip()
+        for length in self._prefix_lengths:
+            region = self.pincode_regions.get(digits[:length])
+            if region:
+                return region
+        return None
+
+    @staticmethod
+    def _locality(address: str) -> str:
+        return address.split(',')[0].strip() if isinstance(address, str) else 'Unknown Locality'
+
+    def resolve_addresses(self, addresses: pd.Series, pincodes: Optional[pd.Series] = None) -> pd.DataFrame:
+        """
+        City, locality and region for every address. Each distinct
+        (address, pincode) pair is resolved once and the result broadcast back,
+        since the joined frame repeats a project's address on every variant row.
+        A missing pincode falls back to the last six-digit number in the address.
+        """
+        pincodes = pincodes if pincodes is not None else pd.Series(None, index=addresses.index, dtype=object)
+        address_codes, address_values = pd.factorize(addresses, use_na_sentinel=False)
+        pincode_codes, pincode_values = pd.factorize(pincodes, use_na_sentinel=False)
+        pairs, codes = np.unique(address_codes.astype(np.int64) * len(pincode_values) + pincode_codes, return_inverse=True)
+
+        cities, localities, regions = [], [], []
+        for pair in pairs:
+            address, pincode = address_values[pair // len(pincode_values)], pincode_values[pair % len(pincode_values)]
+            cities.append(self.resolve_city(address))
+            localities.append(self._locality(address))
+            if pd.isnull(pincode) and isinstance(address, str):
+                found = _PINCODE_RE.findall(address)
+                pincode = found[-1] if found else None
+            regions.append(self.resolve_region(pincode))
+
+        def broadcast(values):
+            return np.asarray(values, dtype=object)[codes] if len(values) else np.empty(len(codes), dtype=object)
+
+        return pd.DataFrame(
+            {"city": broadcast(cities), "locality": broadcast(localities), "region": broadcast(regions)},
+            index=addresses.index,
+        )
+
+    # --- Query parsing ---
+    def find_cities(self, text: str) -> List[Tuple[int, int, str]]:
+        """Whole-word city keyword mentions in lowercase text as (start, end, city)."""
+        return [(start, end, self.city_keywords[kw][1]) for start, end, kw in self.city_matcher.find(text)]
+
+    def find_localities(self, text: str) -> List[Tuple[int, int, str]]:
+        """Whole-word locality mentions in lowercase text as (start, end, locality)."""
+        return [(start, end, self.localities[kw]) for start, end, kw in self.locality_matcher.find(text)]
+
+    def find_locality(self, text: str) -> Optional[Tuple[int, int, str]]:
+        """The first whole-word locality mention in lowercase text as (start, end, locality)."""
+        matches = self.locality_matcher.find(text)
+        if not matches:
+            return None
+        start, end, kw = matches[0]
+        return start, end, self.localities[kw]
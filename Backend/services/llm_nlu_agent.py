@@ -1,89 +1,320 @@
+import asyncio
 import json
 import re
-from typing import Dict, Any, List
-from ollama import chat
+import time
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from ollama import Client, AsyncClient
 from models.request_models import FilterSchema
+from services.llm_queue import CALL_PRIORITIES, LLMQueue, LLMQueueFull, llm_priority, wait_for_room
+from services.nlu_cache import NLUCache
+from services.rule_parser import RuleBasedParser
+from services.formatting import summary_stats, to_dicts
+from services.metrics import ERRORS, record_llm_response
 
+# Serialized once; the schema is static for the life of the process
+FILTER_SCHEMA_JSON = json.dumps(FilterSchema.model_json_schema(), indent=2)
 
-def format_price(value: float) -> str:
-    """Format price in Cr/Lac with rupee symbol."""
-    if value is None:
-        return "N/A"
-    if value >= 1e7:
-        return f"₹{value/1e7:.2f} Cr"
-    if value >= 1e5:
-        return f"₹{value/1e5:.2f} Lacs"
-    return f"₹{value:,.0f}"
+SUMMARY_ERROR = "Summary could not be generated."
+REASON_ERROR = "Could not generate reason."
 
 
 class LLMNLUAgent:
-    def __init__(self, model_name: str = "gemma3"):
+    """
+    Wraps the Ollama model used for filter extraction and summaries.
+
+    Every LLM call has a blocking variant (extract_filters, generate_summary,
+    generate_best_match_reason) and an async variant prefixed with 'a'. The async
+    variants share one AsyncClient, wait for a slot in an LLMQueue (by default
+    max_concurrency slots and no queue limit) and are cancelled after timeout
+    seconds. A bounded queue raises LLMQueueFull instead of waiting; it is
+    passed through, not degraded, so callers can shed load.
+
+    Filter extraction first tries the rule-based parser (when given) and returns
+    its answer if confidence reaches parser_threshold, then consults the cache
+    (when given, keyed also on the places and projects the parser recognizes),
+    and only then calls the LLM.
+    """
+
+    def __init__(self, model_name: str = "gemma3", max_concurrency: int = 4,
+                 timeout: float = 60.0, host: Optional[str] = None,
+                 cache: Optional[NLUCache] = None,
+                 parser: Optional[RuleBasedParser] = None, parser_threshold: float = 0.8,
+                 queue: Optional[LLMQueue] = None):
         self.model_name = model_name
+        self.timeout = timeout
+        self.cache = cache
+        self.parser = parser
+        self.parser_threshold = parser_threshold
+        self.fast_path_hits = 0
+        self.fast_path_fallbacks = 0
+        self.client = Client(host=host, timeout=timeout)
+        self.async_client = AsyncClient(host=host, timeout=timeout)
+        self.queue = queue or LLMQueue(max_concurrency)
+
+    # Every call is timed (including the wait for a concurrency slot) and its token counts recorded
+    def _chat(self, messages: List[Dict[str, str]], call: str = "chat") -> str:
+        start, resp, outcome = time.perf_counter(), None, "error"
+        try:
+            resp = self.client.chat(model=self.model_name, messages=messages)
+            outcome = "ok"
+        finally:
+            record_llm_response(call, resp, time.perf_counter() - start, outcome)
+        return resp["message"]["content"]
+
+    async def _achat(self, messages: List[Dict[str, str]], call: str = "chat") -> str:
+        start, resp, outcome = time.perf_counter(), None, "error"
+        try:
+            async with self.queue.slot(CALL_PRIORITIES.get(call, 0)):
+                resp = await asyncio.wait_for(
+                    self.async_client.chat(model=self.model_name, messages=messages),
+                    timeout=self.timeout
+                )
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            record_llm_response(call, resp, time.perf_counter() - start, outcome)
+        return resp["message"]["content"]
+
+    async def _astream(self, messages: List[Dict[str, str]], call: str = "chat") -> AsyncIterator[str]:
+        """Yield content chunks as the model produces them; timeout applies per chunk."""
+        start, chunk, outcome = time.perf_counter(), None, "error"
+        try:
+            async with self.queue.slot(CALL_PRIORITIES.get(call, 0)):
+                stream = await asyncio.wait_for(
+                    self.async_client.chat(model=self.model_name, messages=messages, stream=True),
+                    timeout=self.timeout
+                )
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(stream.__anext__(), timeout=self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    if chunk["message"]["content"]:
+                        yield chunk["message"]["content"]
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            outcome = "cancelled"
+            raise
+        finally:
+            # Token counts arrive on the final chunk
+            record_llm_response(call, chunk, time.perf_counter() - start, outcome)
 
     # --- FILTER EXTRACTION ---
-    def extract_filters(self, query: str) -> Dict[str, Any]:
-        schema = json.dumps(FilterSchema.model_json_schema(), indent=2)
+    def _filter_messages(self, query: str) -> List[Dict[str, str]]:
         system_prompt = (
             "You are an NLU agent for property search. "
             "Extract all filters from user query as JSON following the provided schema. "
             "Only return JSON. Convert vague budgets to integers (e.g., '1 Crore' → 10000000)."
         )
-        user_prompt = f"Query: '{query}'\nSchema:\n{schema}"
+        user_prompt = f"Query: '{query}'\nSchema:\n{FILTER_SCHEMA_JSON}"
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    @staticmethod
+    def _parse_filters(content: str) -> Dict[str, Any]:
+        content = re.sub(r"```json|```", "", content, flags=re.IGNORECASE).strip()
+        return json.loads(content)
+
+    def _fast_path(self, query: str) -> Optional[Dict[str, Any]]:
+        if self.parser is None:
+            return None
+        parsed = self.parser.parse(query)
+        if parsed.confidence >= self.parser_threshold:
+            self.fast_path_hits += 1
+            return parsed.filters
+        self.fast_path_fallbacks += 1
+        return None
+
+    def _entities(self, query: str) -> Tuple[str, ...]:
+        """Places and projects named in the query; a semantic cache hit must name the same ones."""
+        return self.parser.entities(query) if self.parser is not None else ()
+
+    def fast_path_stats(self) -> Dict[str, Any]:
+        total = self.fast_path_hits + self.fast_path_fallbacks
+        return {
+            "enabled": self.parser is not None,
+            "threshold": self.parser_threshold,
+            "hits": self.fast_path_hits,
+            "fallbacks": self.fast_path_fallbacks,
+            "hit_ratio": round(self.fast_path_hits / total, 4) if total else 0.0,
+        }
+
+    def extract_filters(self, query: str) -> Dict[str, Any]:
+        fast = self._fast_path(query)
+        if fast is not None:
+            return fast
+
+        entities = self._entities(query)
+        key, embedding, cached = self.cache.get(query, entities) if self.cache else (None, None, None)
+        if cached is not None:
+            return cached
 
         try:
-            resp = chat(model=self.model_name, messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ])
-            content = re.sub(r"```json|```", "", resp["message"]["content"], flags=re.IGNORECASE).strip()
-            return json.loads(content)
+            filters = self._parse_filters(self._chat(self._filter_messages(query), call="nlu"))
         except Exception as e:
+            ERRORS.inc(stage="nlu")
             print(f"NLU extraction error: {e}")
             return {}
 
-    # --- SUMMARY GENERATION ---
-    def generate_summary(self, filters: Dict[str, Any], results: List[Any]) -> str:
-        props = [r.dict() if hasattr(r, "dict") else r for r in results]
-        if not props:
-            return f"No properties found for filters: {filters}"
+        if self.cache:
+            self.cache.put(key, embedding, filters, entities)
+        return filters
 
-        prices = [p.get("min_price") for p in props if p.get("min_price") is not None]
-        min_price, max_price = format_price(min(prices)), format_price(max(prices)) if prices else ("N/A", "N/A")
-        bhks = sorted(set(p.get("bhk_type", "N/A") for p in props))
-        cities = sorted(set(p.get("city") or "Unknown" for p in props))
-        sample = [{"project": p.get("project_name"), "bhk": p.get("bhk_type"), "price": format_price(p.get("min_price", 0)), "city": p.get("city") or "Unknown"} for p in props[:3]]
+    async def aextract_filters(self, query: str) -> Dict[str, Any]:
+        fast = self._fast_path(query)
+        if fast is not None:
+            return fast
+
+        entities = self._entities(query)
+        key, embedding, cached = (
+            await asyncio.to_thread(self.cache.get, query, entities) if self.cache else (None, None, None)
+        )
+        if cached is not None:
+            return cached
+
+        try:
+            filters = self._parse_filters(await self._achat(self._filter_messages(query), call="nlu"))
+        except LLMQueueFull:
+            raise
+        except Exception as e:
+            ERRORS.inc(stage="nlu")
+            print(f"NLU extraction error: {e!r}")
+            return {}
+
+        if self.cache:
+            self.cache.put(key, embedding, filters, entities)
+        return filters
+
+    async def aextract_filters_batch(self, queries: List[str], concurrency: Optional[int] = None,
+                                     limit: Optional[asyncio.Semaphore] = None) -> List[Dict[str, Any]]:
+        """
+        Filters for many queries, in input order. Queries identical up to case
+        and spacing are extracted once, and at most `concurrency` extractions
+        run at a time (or as many as `limit` allows, when a caller shares one
+        semaphore across its LLM work). LLM calls queue at batch priority,
+        behind interactive traffic, and back off for retry_after when the
+        queue is full.
+        """
+        distinct: Dict[str, int] = {}
+        slots = []
+        for query in queries:
+            key = " ".join(query.lower().split())
+            slots.append(distinct.setdefault(key, len(distinct)))
+
+        limit = limit or asyncio.Semaphore(concurrency or len(distinct) or 1)
+        originals = {slot: query for query, slot in zip(queries, slots)}
+
+        async def extract(slot: int) -> Dict[str, Any]:
+            async with limit:
+                return await wait_for_room(lambda: self.aextract_filters(originals[slot]))
+
+        with llm_priority("batch"):
+            extracted = await asyncio.gather(*(extract(slot) for slot in range(len(distinct))))
+        return [extracted[slot] for slot in slots]
+
+    # --- SUMMARY GENERATION ---
+    def _summary_messages(self, filters: Dict[str, Any], props: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        stats = summary_stats(props)
+        min_price, max_price, bhks, cities, sample = (
+            stats["min_price"], stats["max_price"], stats["bhks"], stats["cities"], stats["sample"]
+        )
 
         prompt = (
             f"Filters: {filters}\nReturned {len(props)} properties. Price range: {min_price}-{max_price}. "
             f"BHK types: {', '.join(bhks)}. Cities: {', '.join(cities)}. Sample: {sample}. "
             "Write a concise 5-point summary."
         )
+        return [
+            {"role": "system", "content": "Respond only with the summary text."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def generate_summary(self, filters: Dict[str, Any], results: List[Any]) -> str:
+        props = to_dicts(results)
+        if not props:
+            return f"No properties found for filters: {filters}"
+
         try:
-            resp = chat(model=self.model_name, messages=[
-                {"role": "system", "content": "Respond only with the summary text."},
-                {"role": "user", "content": prompt}
-            ])
-            return resp["message"]["content"].strip()
+            return self._chat(self._summary_messages(filters, props), call="summary").strip()
         except Exception as e:
+            ERRORS.inc(stage="summary")
             print(f"Summary error: {e}")
-            return "Summary could not be generated."
+            return SUMMARY_ERROR
+
+    async def agenerate_summary(self, filters: Dict[str, Any], results: List[Any], strict: bool = False) -> str:
+        """With strict=True LLM errors propagate instead of returning a fallback message."""
+        props = to_dicts(results)
+        if not props:
+            return f"No properties found for filters: {filters}"
+
+        try:
+            return (await self._achat(self._summary_messages(filters, props), call="summary")).strip()
+        except Exception as e:
+            if strict:
+                raise
+            ERRORS.inc(stage="summary")
+            print(f"Summary error: {e!r}")
+            return SUMMARY_ERROR
+
+    async def astream_summary(self, filters: Dict[str, Any], results: List[Any], strict: bool = False) -> AsyncIterator[str]:
+        props = to_dicts(results)
+        if not props:
+            yield f"No properties found for filters: {filters}"
+            return
+
+        try:
+            async for token in self._astream(self._summary_messages(filters, props), call="summary"):
+                yield token
+        except Exception as e:
+            if strict:
+                raise
+            ERRORS.inc(stage="summary")
+            print(f"Summary stream error: {e!r}")
+            yield SUMMARY_ERROR
 
     # --- BEST MATCH REASON ---
+    def _best_match_messages(self, filters: Dict[str, Any], best_dict: Dict[str, Any]) -> List[Dict[str, str]]:
+        prompt = (
+            f"Filters: {filters}\nBest match: {best_dict}\n"
+            "Explain in 2-3 sentences why this property fits the requirements (budget, BHK, location, readiness)."
+        )
+        return [
+            {"role": "system", "content": "Respond concisely with only explanation."},
+            {"role": "user", "content": prompt}
+        ]
+
     def generate_best_match_reason(self, filters: Dict[str, Any], best_match: Any) -> str:
         if not best_match:
             return "No best match found."
         best_dict = best_match.dict() if hasattr(best_match, "dict") else best_match
 
-        prompt = (
-            f"Filters: {filters}\nBest match: {best_dict}\n"
-            "Explain in 2-3 sentences why this property fits the requirements (budget, BHK, location, readiness)."
-        )
         try:
-            resp = chat(model=self.model_name, messages=[
-                {"role": "system", "content": "Respond concisely with only explanation."},
-                {"role": "user", "content": prompt}
-            ])
-            return resp["message"]["content"].strip()
+            return self._chat(self._best_match_messages(filters, best_dict), call="best_match").strip()
         except Exception as e:
+            ERRORS.inc(stage="best_match")
             print(f"Best match reason error: {e}")
-            return "Could not generate reason."
+            return REASON_ERROR
+
+    async def agenerate_best_match_reason(self, filters: Dict[str, Any], best_match: Any, strict: bool = False) -> str:
+        if not best_match:
+            return "No best match found."
+        best_dict = best_match.dict() if hasattr(best_match, "dict") else best_match
+
+        try:
+            return (await self._achat(self._best_match_messages(filters, best_dict), call="best_match")).strip()
+        except Exception as e:
+            if strict:
+                raise
+            ERRORS.inc(stage="best_match")
+            print(f"Best match reason error: {e!r}")
+            return REASON_ERROR
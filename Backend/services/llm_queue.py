@@ -0,0 +1,240 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from services.llm_slots import SharedSlots
+from services.metrics import REGISTRY
+
+# Lower is served first; a full queue sheds its lowest-priority waiter for a higher one
+PRIORITIES = {"interactive": 0, "summary": 1, "batch": 2}
+# Default priority of each LLM call kind
+CALL_PRIORITIES = {"nlu": 0, "summary": 1, "best_match": 1}
+
+WAIT_SECONDS = REGISTRY.histogram("llm_queue_wait_seconds", "Time LLM calls waited for a slot.", ["priority"])
+REJECTED = REGISTRY.counter("llm_queue_rejected_total", "LLM calls turned away by a full queue.", ["priority"])
+
+_NAMES = {level: name for name, level in PRIORITIES.items()}
+T = TypeVar("T")
+_priority_override: ContextVar[Optional[int]] = ContextVar("llm_priority", default=None)
+
+
+@contextmanager
+def llm_priority(name: str):
+    """Run every LLM call made in this context (including tasks it starts) at the given priority."""
+    token = _priority_override.set(PRIORITIES[name])
+    try:
+        yield
+    finally:
+        _priority_override.reset(token)
+
+
+class LLMQueueFull(Exception):
+    """The LLM queue is full; retry_after is the estimated wait in seconds."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM queue full, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+async def wait_for_room(call: Callable[[], Awaitable[T]]) -> T:
+    """Await call(), sleeping retry_after and trying again whenever the queue is full (offline work)."""
+    while True:
+        try:
+            return await call()
+        except LLMQueueFull as e:
+            await asyncio.sleep(e.retry_after)
+
+
+class LLMQueue:
+    """
+    Admission control in front of the model server: at most max_concurrency
+    calls in flight, and at most max_queue more waiting (unbounded when None),
+    served by priority and then arrival. A call arriving at a full queue takes
+    the place of the lowest-priority waiter if it outranks it; otherwise it is
+    rejected with LLMQueueFull, so callers can answer 503 with Retry-After
+    instead of piling requests onto Ollama.
+
+    With `shared` slots the limits cover every worker process: a call also
+    needs one of the shared slots, max_queue counts the calls waiting in all
+    workers, and waiters poll for a freed slot every poll_interval seconds.
+
+    Retry-After is estimated from the moving average of slot hold times and
+    the work ahead. Single event loop only (one per worker process).
+    """
+
+    def __init__(self, max_concurrency: int = 4, max_queue: Optional[int] = None, service_time: float = 5.0,
+                 shared: Optional[SharedSlots] = None, poll_interval: float = 0.02):
+        self.max_concurrency = max_concurrency if shared is None else shared.size
+        self.max_queue = max_queue
+        self.service_time = service_time
+        self.shared = shared
+        self.poll_interval = poll_interval
+        self._poller: Optional[asyncio.Task] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.last_progress = time.monotonic()
+        # (priority, arrival, enqueued wall time, future); entries whose future is done are skipped lazily
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+
+    def _queued(self) -> int:
+        """Calls waiting for a slot, in every worker when slots are shared."""
+        if self.shared is None:
+            return self.waiting
+        return self.waiting + sum(count for count, _ in self.shared.others_waiting().values())
+
+    def retry_after(self) -> float:
+        # Other workers' calls in flight are not tracked; a full shared queue means every slot is busy
+        in_flight = self.in_flight if self.shared is None else self.max_concurrency
+        ahead = (self._queued() + in_flight) / max(self.max_concurrency, 1)
+        return min(max(self.service_time * ahead, 1.0), 60.0)
+
+    def _reject(self, priority: int) -> LLMQueueFull:
+        self.rejected += 1
+        REJECTED.inc(priority=_NAMES.get(priority, str(priority)))
+        return LLMQueueFull(self.retry_after())
+
+    def _shed(self, priority: int) -> bool:
+        """Drop the lowest-priority waiter if it ranks below priority (latest arrival first)."""
+        live = [entry for entry in self._waiters if not entry[3].done()]
+        if not live:
+            return False
+        worst = max(live, key=lambda entry: (entry[0], entry[1]))
+        if worst[0] <= priority:
+            return False
+        worst[3].set_exception(self._reject(worst[0]))
+        self.waiting -= 1
+        self._publish()
+        return True
+
+    def _publish(self) -> None:
+        if self.shared is not None:
+            waiting: Dict[int, Tuple[int, float]] = {}
+            for priority, _, since, future in self._waiters:
+                if not future.done():
+                    count, oldest = waiting.get(priority, (0, since))
+                    waiting[priority] = (count + 1, min(oldest, since))
+            self.shared.publish(waiting)
+
+    def _take(self, priority: int, since: float) -> bool:
+        """Claim a slot for a call at priority waiting since `since`, unless another worker has one ahead of it."""
+        if self.shared is None:
+            return self.in_flight < self.max_concurrency
+        for level, (count, oldest) in self.shared.others_waiting().items():
+            if count and (level, oldest) < (priority, since):
+                return False
+        return self.shared.take()
+
+    def _grant(self) -> None:
+        """Hand freed shared slots to local waiters, best first."""
+        while self._waiters:
+            priority, _, since, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._take(priority, since):
+                break
+            heapq.heappop(self._waiters)
+            self.waiting -= 1
+            self.in_flight += 1
+            self.last_progress = time.monotonic()
+            future.set_result(None)
+        self._publish()
+
+    async def _poll(self) -> None:
+        # Slots freed by other workers are only noticed by looking
+        while self.waiting:
+            await asyncio.sleep(self.poll_interval)
+            self._grant()
+        self._poller = None
+
+    async def acquire(self, priority: int = 0) -> None:
+        if not self.waiting and self._take(priority, time.time()):
+            self.in_flight += 1
+            self.last_progress = time.monotonic()
+            return
+        if self.max_queue is not None and self._queued() >= self.max_queue and not self._shed(priority):
+            raise self._reject(priority)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._arrivals), time.time(), future))
+        self.waiting += 1
+        if self.shared is not None:
+            self._publish()
+            if self._poller is None or self._poller.done():
+                self._poller = asyncio.ensure_future(self._poll())
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self.waiting -= 1
+                self._publish()
+            elif future.exception() is None:
+                # The slot was handed over just before the cancellation landed
+                self.release()
+            raise
+
+    def release(self, held: Optional[float] = None) -> None:
+        if held is not None:
+            self.completed += 1
+            self.service_time += 0.2 * (held - self.service_time)
+        self.last_progress = time.monotonic()
+        if self.shared is not None:
+            # Give the slot back to the pool, so a more urgent call in another worker can have it
+            self.shared.give_back()
+            self.in_flight -= 1
+            self._grant()
+            return
+        while self._waiters:
+            _, _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot straight to the next waiter; in_flight is unchanged
+                self.waiting -= 1
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = 0):
+        """Hold one slot for the body; priority is overridden inside llm_priority()."""
+        override = _priority_override.get()
+        priority = priority if override is None else override
+        start = time.monotonic()
+        await self.acquire(priority)
+        acquired = time.monotonic()
+        WAIT_SECONDS.observe(acquired - start, priority=_NAMES.get(priority, str(priority)))
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - acquired)
+
+    def stalled(self, after: float) -> bool:
+        """True when calls are pending but no slot changed hands for `after` seconds."""
+        return bool(self.in_flight or self.waiting) and time.monotonic() - self.last_progress > after
+
+    def full(self) -> bool:
+        return self.max_queue is not None and self._queued() >= self.max_queue
+
+    def stats(self) -> Dict[str, Any]:
+        by_priority = {name: 0 for name in PRIORITIES}
+        for priority, _, _, future in self._waiters:
+            if not future.done():
+                name = _NAMES.get(priority, str(priority))
+                by_priority[name] = by_priority.get(name, 0) + 1
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "waiting_by_priority": by_priority,
+            "waiting_all_workers": self._queued(),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "service_time_s": round(self.service_time, 3),
+            "retry_after_s": round(self.retry_after(), 1),
+        }
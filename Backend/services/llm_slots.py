@@ -0,0 +1,99 @@
+import fcntl
+import json
+import os
+import re
+from typing import Dict, List, Tuple
+
+_WAITING_RE = re.compile(r"waiting-(\d+)\.json")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedSlots:
+    """
+    LLM slots shared by every worker process on the host, so LLM_MAX_CONCURRENCY
+    and LLM_QUEUE_SIZE hold for the whole server rather than per worker.
+
+    Each slot is a lock file in `directory`; a call holds one with flock while
+    it runs. Each process also publishes how many calls it has waiting per
+    priority and since when, so every worker sees the total queue and no
+    worker takes a slot ahead of a higher-priority or older call of the same
+    priority waiting in another one. Locks go away with the process that
+    held them, and waiting counts of dead processes are ignored, so a crashed
+    worker never leaks capacity.
+    """
+
+    def __init__(self, directory: str, size: int):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.size = size
+        self._fds = [os.open(os.path.join(directory, f"slot-{i}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+                     for i in range(size)]
+        self._held: List[int] = []
+        self._waiting_path = os.path.join(directory, f"waiting-{os.getpid()}.json")
+
+    @property
+    def held(self) -> int:
+        return len(self._held)
+
+    def take(self) -> bool:
+        """Lock a free slot for this process; False when every slot is held."""
+        for i, fd in enumerate(self._fds):
+            if i in self._held:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue
+            self._held.append(i)
+            return True
+        return False
+
+    def give_back(self) -> None:
+        fcntl.flock(self._fds[self._held.pop()], fcntl.LOCK_UN)
+
+    def publish(self, waiting: Dict[int, Tuple[int, float]]) -> None:
+        """Record this process's waiting calls per priority: (count, wall time the oldest was queued)."""
+        waiting = {priority: entry for priority, entry in waiting.items() if entry[0]}
+        if not waiting:
+            try:
+                os.remove(self._waiting_path)
+            except FileNotFoundError:
+                pass
+            return
+        tmp = f"{self._waiting_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(waiting, f)
+        os.replace(tmp, self._waiting_path)
+
+    def others_waiting(self) -> Dict[int, Tuple[int, float]]:
+        """(count, oldest queued wall time) of waiting calls per priority in the other live processes."""
+        totals: Dict[int, Tuple[int, float]] = {}
+        for name in os.listdir(self.directory):
+            match = _WAITING_RE.fullmatch(name)
+            if not match or int(match.group(1)) == os.getpid():
+                continue
+            path = os.path.join(self.directory, name)
+            if not _alive(int(match.group(1))):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            try:
+                with open(path) as f:
+                    counts = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for priority, (count, oldest) in counts.items():
+                total, first = totals.get(int(priority), (0, oldest))
+                totals[int(priority)] = (total + count, min(first, oldest))
+        return totals
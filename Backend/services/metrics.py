@@ -0,0 +1,205 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Latency buckets (seconds) from sub-millisecond filtering to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) or abs(value) >= 1e15 else str(int(value))
+
+
+class Counter:
+    """Monotonic counter per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram per label combination, as Prometheus expects.
+    observe() is a bisect plus a few additions under a lock, cheap enough for
+    every request.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][slot] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {count}"
+
+
+CallbackValue = Union[float, Dict[Tuple[str, ...], float]]
+
+
+class CallbackMetric:
+    """
+    Value read at scrape time from a callback (a number, or {label values:
+    number}), for state other components already track, like cache hit
+    counts or row counts. kind is 'gauge', or 'counter' for running totals.
+    """
+
+    def __init__(self, name: str, help: str, callback: Callable[[], CallbackValue],
+                 labelnames: Sequence[str] = (), kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self) -> Iterator[str]:
+        try:
+            value = self.callback()
+        except Exception as e:
+            print(f"Metric {self.name} unavailable: {e!r}")
+            return
+        if value is None:
+            return
+        values = value if isinstance(value, dict) else {(): value}
+        for key, number in values.items():
+            if number is not None:
+                yield f"{self.name}{_labels(self.labelnames, key)} {_number(number)}"
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Union[Counter, Histogram, CallbackMetric]] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name: str, help: str, callback: Callable[[], CallbackValue],
+                 labelnames: Sequence[str] = (), kind: str = "gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, help, callback, labelnames, kind))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry and the metrics recorded by the search pipeline
+REGISTRY = MetricsRegistry()
+STAGE_SECONDS = REGISTRY.histogram(
+    "search_stage_seconds", "Time spent in each search pipeline stage.", ["endpoint", "stage"]
+)
+ERRORS = REGISTRY.counter("search_errors_total", "Errors caught (and degraded around) per pipeline stage.", ["stage"])
+LLM_CALL_SECONDS = REGISTRY.histogram("llm_call_seconds", "Duration of LLM calls.", ["call", "outcome"])
+LLM_TOKENS = REGISTRY.counter("llm_tokens_total", "Tokens reported by the LLM server.", ["call", "kind"])
+
+
+class Timings:
+    """
+    Stage spans of one request. Every span is recorded in STAGE_SECONDS and
+    kept in order for the Server-Timing header.
+    """
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.spans: List[Tuple[str, float]] = []
+        self.start = time.perf_counter()
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.spans.append((stage, seconds))
+        STAGE_SECONDS.observe(seconds, endpoint=self.endpoint, stage=stage)
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def finish(self) -> float:
+        """Record the whole request as the 'total' stage."""
+        total = time.perf_counter() - self.start
+        self.record("total", total)
+        return total
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in self.spans)
+
+
+def record_llm_response(call: str, response, seconds: Optional[float] = None, outcome: str = "ok") -> None:
+    """Count prompt/completion tokens from an Ollama reply (when present) and time the call."""
+    if seconds is not None:
+        LLM_CALL_SECONDS.observe(seconds, call=call, outcome=outcome)
+    if response is None:
+        return
+    for field, kind in (("prompt_eval_count", "prompt"), ("eval_count", "completion")):
+        tokens = response.get(field) if hasattr(response, "get") else None
+        if tokens:
+            LLM_TOKENS.inc(tokens, call=call, kind=kind)
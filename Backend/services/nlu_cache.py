@@ -0,0 +1,180 @@
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from services.lru_cache import LRUCache
+
+# Synonyms collapsed before caching so that phrasing variants share one entry
+_REPLACEMENTS = [
+    (r"\.(?!\d)", " "),
+    (r"(\d+(?:\.\d+)?)\s*(crores?|cr|lakhs?|lacs?|l|k)\b", r"\1 \2"),
+    (r"\b(crores?|cr)\b", "cr"),
+    (r"\b(lakhs?|lacs?|l)\b", "lac"),
+    (r"\b(\d+)\s*-?\s*bhk\b", r"\1bhk"),
+    (r"\b(below|under|less than|upto|up to|within|max|maximum)\b", "under"),
+    (r"\b(above|over|more than|min|minimum|at least)\b", "over"),
+]
+_STOPWORDS = {"a", "an", "the", "in", "at", "for", "of", "with", "me", "show", "find", "i", "want", "need", "please", "flat", "flats", "apartment", "apartments"}
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, strip punctuation and stopwords and canonicalize unit/BHK spellings."""
+    text = query.lower()
+    text = re.sub(r"[^\w\s.]", " ", text)
+    for pattern, repl in _REPLACEMENTS:
+        text = re.sub(pattern, repl, text)
+    return " ".join(t for t in text.split() if t not in _STOPWORDS)
+
+
+def _numbers(normalized: str) -> Tuple[str, ...]:
+    return tuple(re.findall(r"\d+(?:\.\d+)?", normalized))
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache over normalized queries.
+
+    Embeddings come from `encoder` (anything with encode(texts) returning
+    normalized vectors, normally the app's shared sentence encoder) and live in
+    one preallocated matrix so a lookup is a single matrix-vector product. A hit
+    also requires the same numbers, in the same order, and the same named
+    entities in both queries, because embeddings barely separate
+    '2bhk under 1 cr' from '3bhk under 2 cr' or 'Kharadi' from 'Baner'.
+    """
+
+    def __init__(self, encoder, max_size: int = 1024, ttl: Optional[float] = None,
+                 threshold: float = 0.92):
+        self.encoder = encoder
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._matrix: Optional[np.ndarray] = None
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._entries: Dict[int, Tuple[str, float, Tuple[str, ...], Tuple[str, ...], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def embed(self, text: str) -> np.ndarray:
+        return np.asarray(self.encoder.encode([text])[0], dtype=np.float32)
+
+    def get(self, key: str, embedding: Optional[np.ndarray],
+            entities: Tuple[str, ...] = ()) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if embedding is None or not self._entries:
+                self.misses += 1
+                return None
+
+            scores = self._matrix @ embedding
+            numbers = _numbers(key)
+            now = time.monotonic()
+            for slot in np.argsort(scores)[::-1]:
+                if scores[slot] < self.threshold:
+                    break
+                entry = self._entries.get(int(slot))
+                if entry is None or entry[2] != numbers or entry[3] != entities:
+                    continue
+                if self.ttl is not None and now - entry[1] > self.ttl:
+                    continue
+                self._slots.move_to_end(entry[0])
+                self.hits += 1
+                return entry[4]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, embedding: Optional[np.ndarray], filters: Dict[str, Any],
+            entities: Tuple[str, ...] = ()) -> None:
+        if embedding is None:
+            return
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_size, len(embedding)), dtype=np.float32)
+
+            slot = self._slots.pop(key, None)
+            if slot is None:
+                if len(self._slots) >= self.max_size:
+                    _, slot = self._slots.popitem(last=False)
+                else:
+                    slot = len(self._slots)
+            self._slots[key] = slot
+            self._matrix[slot] = embedding
+            self._entries[slot] = (key, time.monotonic(), _numbers(key), entities, filters)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slots.clear()
+            self._entries.clear()
+            if self._matrix is not None:
+                self._matrix[:] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "encoder": getattr(self.encoder, "name", type(self.encoder).__name__),
+            "size": len(self._slots),
+            "max_size": self.max_size,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class NLUCache:
+    """
+    Two-tier cache in front of LLM filter extraction: an exact LRU/TTL tier on
+    normalized query text, then an embedding-similarity tier when an encoder
+    is given.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = 3600,
+                 similarity_threshold: float = 0.92, encoder=None):
+        self.exact = LRUCache(max_size=max_size, ttl=ttl)
+        self.semantic = SemanticCache(encoder, max_size=max_size, ttl=ttl,
+                                      threshold=similarity_threshold) if encoder is not None else None
+
+    def get(self, query: str, entities: Tuple[str, ...] = ()) -> Tuple[str, Optional[np.ndarray], Optional[Dict[str, Any]]]:
+        """
+        Look the query up in both tiers. Returns (normalized key, embedding, filters);
+        pass key and embedding back to put() on a miss to avoid re-encoding.
+        `entities` are the places and projects named in the query; a semantic
+        hit must name the same ones. Embedding is CPU-bound, so async callers
+        should run this in a thread.
+        """
+        key = normalize_query(query)
+        filters = self.exact.get(key)
+        if filters is not None:
+            return key, None, copy.deepcopy(filters)
+
+        embedding = None
+        if self.semantic is not None:
+            embedding = self.semantic.embed(key)
+            filters = self.semantic.get(key, embedding, entities)
+            if filters is not None:
+                self.exact.put(key, filters)
+                return key, embedding, copy.deepcopy(filters)
+
+        return key, embedding, None
+
+    def put(self, key: str, embedding: Optional[np.ndarray], filters: Dict[str, Any],
+            entities: Tuple[str, ...] = ()) -> None:
+        filters = copy.deepcopy(filters)
+        self.exact.put(key, filters)
+        if self.semantic is not None:
+            self.semantic.put(key, embedding, filters, entities)
+
+    def clear(self) -> None:
+        self.exact.clear()
+        if self.semantic is not None:
+            self.semantic.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "exact": self.exact.stats(),
+            "semantic": self.semantic.stats() if self.semantic is not None else {"enabled": False},
+        }
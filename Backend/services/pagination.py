@@ -0,0 +1,84 @@
+import base64
+import secrets
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from models.db_models import PropertyCard
+from services.card_builder import build_cards
+from services.lru_cache import LRUCache
+
+
+class RankedResults:
+    """
+    The ranked row positions of one search, pinned to the FilterIndex they
+    were computed on. Pages are slices of this array, so paging never re-runs
+    NLU, filtering or ranking, and a data reload does not shift a session's
+    pages. The summary and best-match reason of the first page are kept for
+    the later pages.
+
+    matches optionally holds every row matching the structured filters
+    (unranked, sorted), so a follow-up search can narrow them instead of the
+    whole frame.
+    """
+
+    def __init__(self, index, positions: np.ndarray, total: int, filters: Dict[str, Any],
+                 matches: Optional[np.ndarray] = None):
+        self.index = index
+        self.positions = positions
+        self.total = total
+        self.filters = filters
+        self.matches = matches
+        self.summary: Optional[str] = None
+        self.best_match_reason: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def page(self, offset: int, size: int) -> List[PropertyCard]:
+        return build_cards(self.index.df, self.positions[offset:offset + size], limit=size, text=self.index.text)
+
+
+class CursorStore:
+    """
+    Maps opaque cursors to RankedResults held in an LRUCache. A cursor
+    encodes a random token for the result set plus an offset; once the
+    entry is evicted (max_size) or older than ttl seconds it is gone and the
+    client has to search again.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: Optional[float] = 900.0):
+        self.cache = LRUCache(max_size=max_size, ttl=ttl)
+
+    @staticmethod
+    def _encode(token: str, offset: int) -> str:
+        return base64.urlsafe_b64encode(f"{token}:{offset}".encode()).decode().rstrip("=")
+
+    def next_cursor(self, results: RankedResults, offset: int, token: Optional[str] = None) -> Optional[str]:
+        """Cursor for the page starting at offset, registering results on first use; None when exhausted."""
+        if offset >= len(results):
+            return None
+        if token is None:
+            token = secrets.token_urlsafe(9)
+            self.cache.put(token, results)
+        return self._encode(token, offset)
+
+    def resolve(self, cursor: str) -> Tuple[str, RankedResults, int]:
+        """
+        (token, results, offset) for a cursor; ValueError if malformed or its
+        offset is outside the results, KeyError if expired.
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            token, offset = base64.urlsafe_b64decode(padded.encode()).decode().rsplit(":", 1)
+            offset = int(offset)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError(f"Malformed cursor: {cursor!r}") from e
+        results = self.cache.get(token)
+        if results is None:
+            raise KeyError(token)
+        # next_cursor only issues offsets inside the results; anything else was forged or edited
+        if not 0 <= offset < len(results):
+            raise ValueError(f"Cursor offset {offset} is outside the {len(results)} results")
+        return token, results, offset
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
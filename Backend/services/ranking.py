@@ -0,0 +1,153 @@
+from typing import Any, Dict, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+from services.filter_index import normalize_bhk
+
+# Readiness of an under-construction unit decays to 0 this far from possession
+READINESS_HORIZON_DAYS = 5 * 365
+
+
+class RankingWeights(NamedTuple):
+    price_fit: float = 0.35
+    value: float = 0.3
+    readiness: float = 0.2
+    bhk: float = 0.15
+
+    @classmethod
+    def from_string(cls, text: str) -> "RankingWeights":
+        """Parse 'price_fit=0.5,value=0.2'; weights not mentioned keep their defaults."""
+        weights = {}
+        for item in filter(None, (part.strip() for part in text.split(","))):
+            name, _, value = item.partition("=")
+            if name.strip() not in cls._fields:
+                raise ValueError(f"Unknown ranking weight '{name.strip()}', expected one of {cls._fields}")
+            weights[name.strip()] = float(value)
+        return cls(**weights)
+
+
+class RankFeatures:
+    """
+    Per-row features that do not depend on the query, computed once per load:
+    log price per sq.ft and a 0-1 readiness score (1 for ready to move, decaying
+    with the time to possession otherwise, 0.3 when the date is unknown).
+    """
+
+    def __init__(self, df: pd.DataFrame, today: Optional[pd.Timestamp] = None):
+        price = df['min_price'].to_numpy(dtype=np.float64)
+        area = df['carpet_area'].to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.log_ppsf = np.where(area > 0, np.log(price / area), np.nan)
+
+        # Dates and statuses repeat heavily, so parse each distinct value once
+        today = today or pd.Timestamp.now().normalize()
+        codes, dates = pd.factorize(df['possession_date'])
+        days = (pd.to_datetime(pd.Series(dates, dtype=object), errors='coerce') - today).dt.days.to_numpy(dtype=np.float64)
+        days = np.append(days, np.nan)[codes]
+        readiness = np.where(np.isnan(days), 0.3, 0.8 * (1 - np.clip(days, 0, READINESS_HORIZON_DAYS) / READINESS_HORIZON_DAYS))
+        codes, statuses = pd.factorize(df['status'])
+        ready = np.append(pd.Series(statuses, dtype=object).astype(str).str.upper().to_numpy() == "READY_TO_MOVE", False)[codes]
+        self.readiness = np.where(ready, 1.0, readiness)
+
+        self.price = price
+        # Normalized BHK as integer codes, so matching is an int comparison per row
+        codes, values = pd.factorize(df['bhk_type'])
+        normalized_codes, normalized = pd.factorize(np.array([normalize_bhk(v) for v in values], dtype=object))
+        self.bhk_codes = np.append(normalized_codes, -1).astype(np.int32)[codes]
+        self.bhk_lookup = {value: code for code, value in enumerate(normalized)}
+        # Unfiltered top-k per limit, filled in by DataManager.filter_data
+        self.unfiltered: Dict[int, np.ndarray] = {}
+
+
+class Ranker:
+    """
+    Orders filtered rows by a weighted 0-1 relevance score:
+
+    - price_fit: closeness to the middle of the budget window; with only a
+      ceiling, full marks from 60% of it upwards; with only a floor, full marks
+      up to 40% above it. Neutral when there is no budget.
+    - value: cheaper price per sq.ft than the other candidates scores higher.
+    - readiness: see RankFeatures.
+    - bhk: 1 for the first BHK the user asked for, less for later ones,
+      neutral when none was asked for.
+
+    Scoring is vectorized over the candidate positions and top-k uses
+    argpartition, so only the k winners are ever sorted.
+    """
+
+    def __init__(self, weights: RankingWeights = RankingWeights()):
+        self.weights = weights
+
+    @staticmethod
+    def _price_fit(price: np.ndarray, filters: Dict[str, Any]) -> np.ndarray:
+        low, high = filters.get("min_budget"), filters.get("max_budget")
+        if low and high:
+            fit = np.abs(price - (low + high) / 2)
+            fit *= -2 / max(high - low, 1)
+            fit += 1
+        elif high:
+            fit = price / (0.6 * high)
+        elif low:
+            fit = (2 * low - price) / (0.6 * low)
+        else:
+            return np.full(len(price), 0.5)
+        return np.clip(fit, 0, 1, out=fit)
+
+    @staticmethod
+    def _value(log_ppsf: np.ndarray) -> np.ndarray:
+        with np.errstate(all='ignore'):
+            lo, hi = np.fmin.reduce(log_ppsf), np.fmax.reduce(log_ppsf)
+        if np.isnan(lo):
+            return np.full(len(log_ppsf), 0.5)
+        value = hi - log_ppsf
+        if hi > lo:
+            value /= hi - lo
+        else:
+            value += 1
+        # Unknown area: no credit for value
+        return np.nan_to_num(value, copy=False, nan=0.0)
+
+    @staticmethod
+    def _bhk(codes: np.ndarray, lookup: Dict[str, int], filters: Dict[str, Any]) -> np.ndarray:
+        wanted = [normalize_bhk(b) for b in filters.get("bhk") or []]
+        if not wanted:
+            return np.full(len(codes), 0.5)
+        score = np.zeros(len(codes))
+        # Walk back to front so the earliest mention wins
+        for i, value in reversed(list(enumerate(wanted))):
+            if value in lookup:
+                score[codes == lookup[value]] = 1 - i / len(wanted)
+        return score
+
+    def components(self, features: RankFeatures, positions: np.ndarray, filters: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        return {
+            "price_fit": self._price_fit(features.price[positions], filters),
+            "value": self._value(features.log_ppsf[positions]),
+            "readiness": features.readiness[positions],
+            "bhk": self._bhk(features.bhk_codes[positions], features.bhk_lookup, filters),
+        }
+
+    def score(self, features: RankFeatures, positions: np.ndarray, filters: Dict[str, Any]) -> np.ndarray:
+        total = sum(self.weights) or 1.0
+        scores = np.zeros(len(positions))
+        for name, values in self.components(features, positions, filters).items():
+            weight = getattr(self.weights, name) / total
+            if weight:
+                scores += weight * values
+        return scores
+
+    def top_k(self, features: RankFeatures, positions: np.ndarray, filters: Dict[str, Any], k: int) -> np.ndarray:
+        """
+        The k best positions, best first; ties keep their original order, so the
+        result is always a prefix of the full stable ranking (pages never overlap).
+        """
+        if not len(positions) or k <= 0:
+            return positions[:0]
+        scores = self.score(features, positions, filters)
+        if len(positions) > k:
+            # argpartition finds the k-th best score; ties at it are taken in position order
+            threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            above = np.flatnonzero(scores > threshold)
+            tied = np.flatnonzero(scores == threshold)[:k - len(above)]
+            keep = np.sort(np.concatenate([above, tied]))
+            positions, scores = positions[keep], scores[keep]
+        return positions[np.argsort(-scores, kind='stable')]
@@ -0,0 +1,169 @@
+import re
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+from models.request_models import FilterSchema
+from services.gazetteer import Gazetteer
+
+UNIT_MULTIPLIERS = {
+    "cr": 1e7, "crs": 1e7, "crore": 1e7, "crores": 1e7,
+    "l": 1e5, "lac": 1e5, "lacs": 1e5, "lakh": 1e5, "lakhs": 1e5,
+    "k": 1e3, "thousand": 1e3,
+}
+MAX_WORDS = {"under", "below", "upto", "within", "max", "maximum", "less", "than", "budget", "cheaper", "till"}
+MIN_WORDS = {"above", "over", "min", "minimum", "more", "least", "from", "starting", "atleast"}
+APPROX_WORDS = {"around", "about", "approx", "approximately", "near", "nearly"}
+FILLER_WORDS = {
+    "a", "an", "the", "in", "at", "of", "for", "with", "and", "or", "to", "me", "i", "my",
+    "show", "find", "get", "give", "list", "want", "need", "looking", "search", "buy", "please",
+    "flat", "flats", "apartment", "apartments", "home", "homes", "property", "properties",
+    "project", "projects", "options", "available", "any", "some", "price", "rs", "inr",
+    "is", "are", "between", "up", "city", "area", "locality",
+}
+
+_UNIT = r"(?:crores?|crs?|lakhs?|lacs?|l|k|thousand)"
+_AMOUNT = rf"(\d+(?:\.\d+)?)\s*({_UNIT})?(?![\w.])"
+_RANGE_RE = re.compile(rf"(?:between\s+)?{_AMOUNT}\s*(?:to|-|and)\s*{_AMOUNT}")
+_AMOUNT_RE = re.compile(_AMOUNT)
+# Thousands separators in written-out amounts (50,00,000 or 5,000,000), not lists like "2,3 bhk"
+_GROUPED_RE = re.compile(r"\b\d{1,3}(?:,\d{2})*(?:,\d{3})+\b")
+_BHK_RE = re.compile(r"((?:\d+(?:\.\d+)?\s*(?:,|/|-|or|and|to|&)\s*)*\d+(?:\.\d+)?)\s*-?\s*(bhk|rk)\b")
+
+
+class ParsedQuery(NamedTuple):
+    filters: Dict
+    confidence: float
+
+
+def _entity_regex(names: Iterable[str]) -> Tuple[Optional[re.Pattern], Dict[str, str]]:
+    """Compile one alternation over the entity names (longest first) plus a lowercase -> original map."""
+    canonical = {}
+    for name in names:
+        if not isinstance(name, str):
+            continue
+        name = name.strip()
+        if len(name) >= 3 and re.search(r"[a-zA-Z]{3}", name):
+            canonical.setdefault(name.lower(), name)
+    if not canonical:
+        return None, canonical
+    alternation = "|".join(re.escape(n) for n in sorted(canonical, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)({alternation})(?!\w)"), canonical
+
+
+def _rupees(number: str, unit: Optional[str]) -> Optional[int]:
+    value = float(number)
+    if unit:
+        return int(value * UNIT_MULTIPLIERS[unit])
+    # A bare number is only a budget when it is plausibly in rupees
+    return int(value) if value >= 10000 else None
+
+
+class RuleBasedParser:
+    """
+    Deterministic filter extraction for the common 'city + BHK + budget' queries.
+
+    Project names are matched with a compiled alternation, localities and city
+    keywords through the shared Gazetteer automata, BHK and budget amounts with
+    regexes. The confidence score is
+    the share of query words that were understood; anything the rules cannot
+    account for ('sea-facing', 'near schools') lowers it so the caller can fall
+    back to the LLM.
+    """
+
+    def __init__(self, gazetteer: Gazetteer, project_names: Iterable[str] = ()):
+        self.gazetteer = gazetteer
+        self.project_re, self.projects = _entity_regex(project_names)
+
+    @classmethod
+    def from_data_manager(cls, data_manager) -> "RuleBasedParser":
+        return cls(
+            data_manager.gazetteer,
+            project_names=data_manager.master_df['project_name'].dropna().unique(),
+        )
+
+    @staticmethod
+    def _consume(text: str, match) -> str:
+        start, end = (match.start(), match.end()) if isinstance(match, re.Match) else match[:2]
+        return text[:start] + " " * (end - start) + text[end:]
+
+    @staticmethod
+    def _clean(query: str) -> str:
+        text = _GROUPED_RE.sub(lambda m: m.group().replace(",", ""), query.lower())
+        return re.sub(r"[^\w\s.,&/-]|\.(?!\d)|,(?!\s*\d)|(?<!\d),", " ", text)
+
+    def entities(self, query: str) -> Tuple[str, ...]:
+        """Every project, locality and city named in the query, as sorted 'kind:name' tags."""
+        text = self._clean(query)
+        found = {f"city:{city}" for _, _, city in self.gazetteer.find_cities(text)}
+        found.update(f"locality:{name}" for _, _, name in self.gazetteer.find_localities(text))
+        if self.project_re is not None:
+            found.update(f"project:{self.projects[m.group(1)]}" for m in self.project_re.finditer(text))
+        return tuple(sorted(found))
+
+    def parse(self, query: str) -> ParsedQuery:
+        text = self._clean(query)
+        total_words = len(re.findall(r"\w+", text))
+        if not total_words:
+            return ParsedQuery({}, 0.0)
+
+        filters = FilterSchema()
+        penalty = 0.0
+
+        # Named entities first, so digits inside names are never read as budgets
+        if self.project_re is not None:
+            match = self.project_re.search(text)
+            if match:
+                filters.project_name = self.projects[match.group(1)]
+                text = self._consume(text, match)
+
+        locality = self.gazetteer.find_locality(text)
+        if locality:
+            filters.locality = locality[2]
+            text = self._consume(text, locality)
+
+        cities = set()
+        for match in self.gazetteer.find_cities(text):
+            cities.add(match[2])
+            text = self._consume(text, match)
+        if len(cities) > 1:
+            return ParsedQuery({}, 0.0)
+        if cities:
+            filters.city = cities.pop()
+
+        bhk = []
+        for match in list(_BHK_RE.finditer(text)):
+            suffix = "BHK" if match.group(2) == "bhk" else "RK"
+            bhk.extend(f"{n}{suffix}" for n in re.findall(r"\d+(?:\.\d+)?", match.group(1)))
+            text = self._consume(text, match)
+        if bhk:
+            filters.bhk = list(dict.fromkeys(bhk))
+
+        match = _RANGE_RE.search(text)
+        if match:
+            unit = match.group(4) or match.group(2)
+            low, high = _rupees(match.group(1), match.group(2) or unit), _rupees(match.group(3), unit)
+            if low is not None and high is not None:
+                filters.min_budget, filters.max_budget = min(low, high), max(low, high)
+                text = self._consume(text, match)
+
+        for match in list(_AMOUNT_RE.finditer(text)):
+            amount = _rupees(match.group(1), match.group(2))
+            if amount is None:
+                continue
+            context = set(text[:match.start()].split()[-3:])
+            if context & MIN_WORDS:
+                filters.min_budget = amount
+            elif context & APPROX_WORDS:
+                filters.min_budget, filters.max_budget = int(amount * 0.9), int(amount * 1.1)
+            else:
+                if not context & MAX_WORDS:
+                    penalty += 0.1
+                filters.max_budget = amount
+            text = self._consume(text, match)
+
+        extracted = filters.model_dump(exclude_none=True)
+        if not extracted:
+            return ParsedQuery({}, 0.0)
+
+        known = FILLER_WORDS | MAX_WORDS | MIN_WORDS | APPROX_WORDS
+        unknown = [w for w in re.findall(r"[a-z]+|\d+(?:\.\d+)?", text) if w not in known]
+        confidence = max(0.0, 1.0 - len(unknown) / total_words - penalty)
+        return ParsedQuery(extracted, round(confidence, 3))
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import re
+import shutil
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from services.ann_index import IVFIndex, top_indices
+from services.compact import TextStore
+from services.embeddings import EmbeddingStore, text_keys
+
+# Text columns of the master frame that describe a listing
+TEXT_COLUMNS = ("summary", "about", "fullAddress")
+# Below this many documents every search is an exact scan and no ANN index is built
+EXACT_SEARCH_MAX = 20_000
+# IVF indexes saved next to the embeddings, one per set of documents
+_IVF_DIR_RE = re.compile(r"ivf-[0-9a-f]{16}")
+
+
+def shared_ivf(store: EmbeddingStore, texts: List[str]) -> IVFIndex:
+    """
+    The IVF index over the embeddings of texts. With a store directory it is
+    trained once and saved beside the embeddings under a hash of the texts;
+    other processes with the same documents memory-map it instead of
+    embedding and training again. Indexes for other documents are removed.
+    """
+    if not store.path:
+        return IVFIndex(store.embed(texts))
+    digest = hashlib.sha1(text_keys(texts).tobytes()).hexdigest()[:16]
+    path = os.path.join(store.path, f"ivf-{digest}")
+    if not os.path.isdir(path):
+        index = IVFIndex(store.embed(texts))
+        try:
+            index.save(path)
+        except OSError as e:
+            print(f"Could not write IVF index: {e}")
+            return index
+        for entry in os.listdir(store.path):
+            if entry != os.path.basename(path) and _IVF_DIR_RE.fullmatch(entry):
+                shutil.rmtree(os.path.join(store.path, entry), ignore_errors=True)
+    return IVFIndex.load(path)
+
+
+class SemanticIndex:
+    """
+    Embedding retrieval over the listing text (project summary, property
+    description and address) for preferences no structured filter covers,
+    such as 'sea-facing near good schools'.
+
+    Rows repeat the same text heavily (every variant of a project shares its
+    summary and address), so each distinct text combination is one document,
+    embedded once through the EmbeddingStore. Documents are searched with an
+    IVF index (shared between processes through the store directory); a
+    structured filter restricts the search to the documents of its rows,
+    scored exactly when there are fewer of them than an unfiltered probe
+    would visit anyway.
+    """
+
+    def __init__(self, df: pd.DataFrame, store: EmbeddingStore, exact_max: int = EXACT_SEARCH_MAX,
+                 text: Optional[TextStore] = None):
+        self.store = store
+        self.exact_max = exact_max
+
+        # Combine per-column codes so texts are only built for distinct combinations
+        parts = []
+        for column in TEXT_COLUMNS:
+            if text is not None and column in text:
+                values = text.series(column)
+            else:
+                values = df[column] if column in df else pd.Series("", index=df.index)
+            codes, uniques = pd.factorize(values)
+            parts.append((codes, np.append(np.asarray(uniques, dtype=object), "")))
+        combos, self.doc_codes = np.unique(np.column_stack([codes for codes, _ in parts]), axis=0, return_inverse=True)
+        self.doc_codes = self.doc_codes.reshape(-1)
+        texts = [
+            " ".join(t for t in (str(uniques[code]).strip() for (_, uniques), code in zip(parts, combo)) if t and t != "nan")
+            for combo in combos
+        ]
+
+        self.index = shared_ivf(store, texts) if len(texts) > exact_max else None
+        self.vectors = store.embed(texts) if self.index is None else None
+        # Rows of each document, for expanding document hits back to rows
+        self.doc_rows = np.argsort(self.doc_codes, kind='stable')
+        self.doc_offsets = np.concatenate([[0], np.cumsum(np.bincount(self.doc_codes, minlength=len(texts)))])
+        self.size = len(texts)
+
+    def _score(self, query: np.ndarray, k: int, docs: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        if self.index is None:
+            candidates = np.arange(self.size) if docs is None else docs
+            scores = self.vectors[candidates] @ query
+            best = top_indices(scores, k)
+            return candidates[best], scores[best]
+        if docs is None:
+            return self.index.search(query, k)
+        if len(docs) <= self.index.probe_size:
+            return self.index.exact(query, k, docs)
+        allowed = np.zeros(self.size, dtype=bool)
+        allowed[docs] = True
+        return self.index.search(query, k, allowed=allowed)
+
+    def search(self, text: str, k: int, positions: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rows (restricted to positions when given) whose text is closest to the
+        query, with their cosine similarity, best first. Rows sharing a
+        document share its score; at least k rows are returned when available.
+        """
+        query = self.store.encoder.encode([text])[0]
+        docs = None if positions is None else np.unique(self.doc_codes[positions])
+        # Every allowed document has at least one allowed row, so k documents always cover k rows
+        doc_ids, doc_scores = self._score(query, k, docs)
+
+        starts, ends = self.doc_offsets[doc_ids], self.doc_offsets[doc_ids + 1]
+        rows = np.concatenate([self.doc_rows[s:e] for s, e in zip(starts, ends)]) if len(doc_ids) else np.empty(0, dtype=np.int64)
+        scores = np.repeat(doc_scores, ends - starts)
+        if positions is not None:
+            allowed = np.zeros(len(self.doc_codes), dtype=bool)
+            allowed[positions] = True
+            keep = allowed[rows]
+            rows, scores = rows[keep], scores[keep]
+        return rows, scores
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+import pandas as pd
+from services.compact import TextStore
+
+MANIFEST = "manifest.json"
+# Directory names written by write_snapshot (source_fingerprint values)
+_FINGERPRINT_RE = re.compile(r"[0-9a-f]{16}")
+
+
+def file_sha1(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_fingerprint(paths: Iterable[str], salt: str = "") -> str:
+    """
+    Combined content hash of the source CSVs; a snapshot is valid only for this
+    value. salt covers anything else the join depends on (e.g. the gazetteer).
+    """
+    digest = hashlib.sha1(salt.encode())
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        digest.update(file_sha1(path).encode())
+    return digest.hexdigest()[:16]
+
+
+def is_snapshot(path: str) -> bool:
+    """True for a directory written by write_snapshot: a fingerprint name holding a manifest."""
+    return (_FINGERPRINT_RE.fullmatch(os.path.basename(path)) is not None
+            and not os.path.islink(path)
+            and os.path.isfile(os.path.join(path, MANIFEST)))
+
+
+def write_snapshot(master_df: pd.DataFrame, snapshot_dir: str, fingerprint: str,
+                   text: Optional[TextStore] = None) -> str:
+    """
+    Write the joined master frame as one .npy file per column under
+    snapshot_dir/<fingerprint>/. Numeric columns are stored as-is; text columns
+    are dictionary-encoded (int32 codes plus a JSON list of distinct values) so
+    the per-row data can be memory-mapped. Columns of a TextStore are saved as
+    its own arrays. The directory appears atomically.
+    """
+    final_dir = os.path.join(snapshot_dir, fingerprint)
+    if os.path.exists(os.path.join(final_dir, MANIFEST)):
+        return final_dir
+
+    tmp_dir = f"{final_dir}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    columns = []
+    for name in master_df.columns:
+        series = master_df[name]
+        if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), series.to_numpy())
+            columns.append({"name": name, "kind": "numeric"})
+        else:
+            categorical = series.astype("category")
+            np.save(os.path.join(tmp_dir, f"{name}.codes.npy"), categorical.cat.codes.to_numpy(dtype=np.int32))
+            with open(os.path.join(tmp_dir, f"{name}.values.json"), "w", encoding="utf-8") as f:
+                json.dump([str(v) for v in categorical.cat.categories], f, ensure_ascii=False)
+            columns.append({"name": name, "kind": "category"})
+
+    if text is not None:
+        text.save(tmp_dir)
+
+    with open(os.path.join(tmp_dir, MANIFEST), "w") as f:
+        json.dump({"fingerprint": fingerprint, "rows": len(master_df), "columns": columns,
+                   "text": list(text.columns) if text is not None else []}, f)
+
+    try:
+        os.rename(tmp_dir, final_dir)
+    except OSError:
+        # Another worker published the same snapshot first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    # Older snapshots are superseded; processes still mapping them keep their pages.
+    # Only our own snapshot directories are removed, since snapshot_dir may be shared.
+    for entry in os.listdir(snapshot_dir):
+        path = os.path.join(snapshot_dir, entry)
+        if entry != fingerprint and is_snapshot(path):
+            shutil.rmtree(path, ignore_errors=True)
+    return final_dir
+
+
+def load_snapshot(snapshot_dir: str, fingerprint: str) -> Optional[Tuple[pd.DataFrame, TextStore]]:
+    """
+    Memory-map the snapshot for this fingerprint as (frame, text store), or
+    return None if there is none. Numeric columns, category codes and the text
+    store stay backed by the page cache, so every worker loading the same
+    snapshot shares those pages.
+    """
+    path = os.path.join(snapshot_dir, fingerprint)
+    manifest_path = os.path.join(path, MANIFEST)
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    data: Dict[str, object] = {}
+    for column in manifest["columns"]:
+        name = column["name"]
+        if column["kind"] == "numeric":
+            data[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        else:
+            codes = np.load(os.path.join(path, f"{name}.codes.npy"), mmap_mode="r")
+            with open(os.path.join(path, f"{name}.values.json"), encoding="utf-8") as f:
+                values = json.load(f)
+            data[name] = pd.Categorical.from_codes(codes, categories=values, validate=False)
+
+    return pd.DataFrame(data, copy=False), TextStore.load(path, manifest.get("text", []))
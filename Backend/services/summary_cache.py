@@ -0,0 +1,113 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from services.filter_index import canonical_filters
+from services.formatting import to_dicts
+from services.lru_cache import LRUCache
+
+
+class SQLiteCacheBackend:
+    """
+    On-disk cache backend so entries survive restarts and are shared by every
+    uvicorn worker pointing at the same file. Same get/put/clear/stats surface
+    as LRUCache; eviction is by last access once max_size is exceeded.
+    """
+
+    def __init__(self, path: str, max_size: int = 10000, ttl: Optional[float] = None):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, created REAL, accessed REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl is not None and now - row[1] > self.ttl):
+                self.misses += 1
+                return default
+            self._conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)", (key, value, now, now))
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,)
+            )
+            if self.ttl is not None:
+                self._conn.execute("DELETE FROM cache WHERE created < ?", (now - self.ttl,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "sqlite",
+            "size": len(self),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def result_fingerprint(results: List[Any]) -> str:
+    """Hash of every field of the returned cards, in order: any of them can end up in a prompt."""
+    digest = hashlib.sha1()
+    for fields in to_dicts(results):
+        digest.update(json.dumps(fields, sort_keys=True, default=str).encode())
+        digest.update(b";")
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    Cache for LLM-generated summaries and best-match reasons, keyed on the
+    canonical filters plus a fingerprint of the result set and the DataManager
+    data version. A reload changes the version, so entries for older data are
+    never read again and age out through the backend's size limit and TTL;
+    nothing is cleared, since other workers may share the backend.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else LRUCache(max_size=1024, ttl=3600)
+
+    @staticmethod
+    def key(kind: str, filters: Dict[str, Any], results: List[Any], data_version: str = "") -> str:
+        raw = f"{kind}|{data_version}|{canonical_filters(filters)}|{result_fingerprint(results)}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self.backend.get(key)
+
+    def put(self, key: str, value: str) -> None:
+        self.backend.put(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.backend.stats()
+        stats.setdefault("backend", "memory")
+        return stats
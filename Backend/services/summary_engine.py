@@ -0,0 +1,212 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+from services.formatting import format_price, summary_stats, to_dicts
+from services.llm_nlu_agent import REASON_ERROR, SUMMARY_ERROR
+from services.llm_queue import LLMQueueFull
+from services.metrics import ERRORS
+from services.summary_cache import SummaryCache
+
+SUMMARY_MODES = ("template", "llm", "hybrid")
+
+
+def _describe_filters(filters: Dict[str, Any]) -> str:
+    parts = []
+    if filters.get("bhk"):
+        parts.append("/".join(filters["bhk"]))
+    if filters.get("project_name"):
+        parts.append(f"in {filters['project_name']}")
+    if filters.get("locality"):
+        parts.append(f"around {filters['locality']}")
+    if filters.get("city"):
+        parts.append(f"in {filters['city']}")
+    if filters.get("min_budget") and filters.get("max_budget"):
+        parts.append(f"between {format_price(filters['min_budget'])} and {format_price(filters['max_budget'])}")
+    elif filters.get("max_budget"):
+        parts.append(f"under {format_price(filters['max_budget'])}")
+    elif filters.get("min_budget"):
+        parts.append(f"above {format_price(filters['min_budget'])}")
+    if filters.get("preferences"):
+        parts.append(f"matching '{filters['preferences']}'")
+    if not parts:
+        return ""
+    return f" for {' '.join(parts)}" if filters.get("bhk") else f" {' '.join(parts)}"
+
+
+def template_summary(filters: Dict[str, Any], results: List[Any]) -> str:
+    """Five bullet points built directly from the result aggregates, no LLM involved."""
+    props = to_dicts(results)
+    if not props:
+        return f"No properties found for filters: {filters}"
+
+    stats = summary_stats(props)
+    readiness = ", ".join(f"{status}: {count}" for status, count in stats["statuses"].most_common())
+    picks = "; ".join(f"{s['project']} ({s['bhk']}, {s['price']})" for s in stats["sample"])
+    return "\n".join([
+        f"1. Found {stats['count']} properties{_describe_filters(filters)}.",
+        f"2. Prices range from {stats['min_price']} to {stats['max_price']}.",
+        f"3. Configurations available: {', '.join(stats['bhks'])}.",
+        f"4. Located in {', '.join(stats['cities'])} ({readiness}).",
+        f"5. Top picks: {picks}.",
+    ])
+
+
+def template_best_match_reason(filters: Dict[str, Any], best_match: Any) -> str:
+    """One sentence on why the top-ranked property was picked, from its own fields."""
+    prop = to_dicts([best_match])[0]
+    place = ", ".join(p for p in (prop.get("locality"), prop.get("city")) if p)
+    price = prop.get("min_price")
+    strengths = []
+    if price and (filters.get("min_budget") or filters.get("max_budget")):
+        strengths.append("priced within your budget")
+    if filters.get("bhk") and prop.get("bhk_type") in filters["bhk"]:
+        strengths.append(f"the {prop['bhk_type']} configuration you asked for")
+    if prop.get("status") == "READY_TO_MOVE":
+        strengths.append("ready to move in")
+    elif prop.get("possession_date"):
+        strengths.append(f"possession from {str(prop['possession_date']).split(' ')[0]}")
+    if price and prop.get("carpet_area"):
+        strengths.append(f"{format_price(price / prop['carpet_area'])} per sq.ft")
+    reason = f"{prop.get('project_name', 'This property')} ({prop.get('bhk_type', 'N/A')}, {format_price(price)})"
+    if place:
+        reason += f" in {place}"
+    reason += " ranks first"
+    return reason + (f": {', '.join(strengths)}." if strengths else ".")
+
+
+class SummaryEngine:
+    """
+    Produces the search summary in one of three modes:
+
+    - template: Python bullets from the aggregates, no LLM call.
+    - llm: the LLM phrases the aggregates (the original behavior).
+    - hybrid: the LLM answer if it arrives within hybrid_budget seconds and
+      succeeds, otherwise the template bullets.
+
+    When the LLM queue is full, llm mode also falls back to the template
+    rather than waiting for the model server, unless the caller asks for
+    LLMQueueFull to be raised so it can retry (summarize with
+    fallback_when_busy=False, as batch jobs do).
+
+    Successful LLM output (summaries and best-match reasons) is stored in the
+    optional SummaryCache, keyed on filters, result fingerprint and the
+    DataManager data version.
+    """
+
+    def __init__(self, llm_agent, default_mode: str = "llm", hybrid_budget: float = 2.0,
+                 cache: Optional[SummaryCache] = None, data_manager=None):
+        if default_mode not in SUMMARY_MODES:
+            raise ValueError(f"Unknown summary mode '{default_mode}', expected one of {SUMMARY_MODES}")
+        self.llm_agent = llm_agent
+        self.default_mode = default_mode
+        self.hybrid_budget = hybrid_budget
+        self.cache = cache
+        self.data_manager = data_manager
+
+    def resolve_mode(self, mode: Optional[str]) -> str:
+        return mode or self.default_mode
+
+    def _cache_key(self, kind: str, filters: Dict[str, Any], results: List[Any]) -> Optional[str]:
+        if self.cache is None:
+            return None
+        version = self.data_manager.data_version if self.data_manager is not None else ""
+        return self.cache.key(kind, filters, results, version)
+
+    async def _llm_summary(self, filters: Dict[str, Any], results: List[Any], budget: Optional[float] = None) -> str:
+        """LLM summary through the cache; raises on LLM errors and budget timeouts."""
+        key = self._cache_key("summary", filters, results)
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            return cached
+
+        call = self.llm_agent.agenerate_summary(filters, results, strict=True)
+        text = await (asyncio.wait_for(call, budget) if budget is not None else call)
+        if key:
+            self.cache.put(key, text)
+        return text
+
+    async def summarize(self, filters: Dict[str, Any], results: List[Any], mode: Optional[str] = None,
+                        fallback_when_busy: bool = True) -> str:
+        mode = self.resolve_mode(mode)
+        if mode == "template" or not results:
+            return template_summary(filters, results)
+
+        try:
+            return await self._llm_summary(filters, results, self.hybrid_budget if mode == "hybrid" else None)
+        except LLMQueueFull:
+            if not fallback_when_busy:
+                raise
+            return template_summary(filters, results)
+        except Exception as e:
+            if mode == "hybrid":
+                return template_summary(filters, results)
+            ERRORS.inc(stage="summary")
+            print(f"Summary error: {e!r}")
+            return SUMMARY_ERROR
+
+    async def stream(self, filters: Dict[str, Any], results: List[Any], mode: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield summary events for /search/stream: 'summary' events append text and a
+        'summary_replace' event swaps the hybrid template draft for the LLM text.
+        """
+        mode = self.resolve_mode(mode)
+        if mode == "template" or not results:
+            yield {"type": "summary", "delta": template_summary(filters, results)}
+            return
+
+        if mode == "hybrid":
+            yield {"type": "summary", "delta": template_summary(filters, results)}
+            try:
+                yield {"type": "summary_replace", "summary": await self._llm_summary(filters, results, self.hybrid_budget)}
+            except Exception:
+                pass
+            return
+
+        key = self._cache_key("summary", filters, results)
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            yield {"type": "summary", "delta": cached}
+            return
+
+        tokens = []
+        try:
+            async for token in self.llm_agent.astream_summary(filters, results, strict=True):
+                tokens.append(token)
+                yield {"type": "summary", "delta": token}
+        except LLMQueueFull:
+            yield {"type": "summary", "delta": template_summary(filters, results)}
+            return
+        except Exception as e:
+            ERRORS.inc(stage="summary")
+            print(f"Summary stream error: {e!r}")
+            yield {"type": "summary", "delta": SUMMARY_ERROR}
+            return
+        if key:
+            self.cache.put(key, "".join(tokens).strip())
+
+    async def best_match_reason(self, filters: Dict[str, Any], best_match: Any, mode: Optional[str] = None) -> str:
+        """Why the top-ranked result was picked, following the same modes as summarize."""
+        if not best_match:
+            return "No best match found."
+        mode = self.resolve_mode(mode)
+        if mode == "template":
+            return template_best_match_reason(filters, best_match)
+
+        key = self._cache_key("best_match", filters, [best_match])
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            return cached
+
+        try:
+            call = self.llm_agent.agenerate_best_match_reason(filters, best_match, strict=True)
+            reason = await (asyncio.wait_for(call, self.hybrid_budget) if mode == "hybrid" else call)
+        except LLMQueueFull:
+            return template_best_match_reason(filters, best_match)
+        except Exception as e:
+            if mode == "hybrid":
+                return template_best_match_reason(filters, best_match)
+            ERRORS.inc(stage="best_match")
+            print(f"Best match reason error: {e!r}")
+            return REASON_ERROR
+        if key:
+            self.cache.put(key, reason)
+        return reason
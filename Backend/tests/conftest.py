@@ -0,0 +1,14 @@
+import sys
+from pathlib import Path
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from services.data_manager import DataManager
+
+
+@pytest.fixture(scope="session")
+def data_manager():
+    """The bundled sample data, joined from the CSVs (no snapshot on disk)."""
+    return DataManager(str(BACKEND_DIR / "Data"), snapshot_dir=None)
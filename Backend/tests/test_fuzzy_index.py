@@ -0,0 +1,27 @@
+import numpy as np
+from services.fuzzy_index import FuzzyIndex
+
+
+def test_short_query_does_not_match_long_address(data_manager):
+    # 'kharadi' shares most of its trigrams with a Sewri, Mumbai address
+    assert data_manager.index.fuzzy("locality", "kharadi") == []
+    assert len(data_manager.search({"locality": "kharadi"})) == 0
+    assert data_manager.snap_filters({"locality": "kharadi"}) == {"locality": "kharadi"}
+
+
+def test_other_side_of_suburb_does_not_match(data_manager):
+    assert data_manager.index.fuzzy("locality", "mulund west") == []
+    assert data_manager.snap_filters({"locality": "mulund west"}) == {"locality": "mulund west"}
+
+
+def test_extra_word_still_finds_project(data_manager):
+    matches = data_manager.index.fuzzy("project_name", "glory towers")
+    assert matches[0].value == "Glory"
+    assert data_manager.snap_filters({"project_name": "glory towers"}) == {"project_name": "Glory"}
+    assert len(data_manager.search({"project_name": "glory towers"})) > 0
+
+
+def test_misspelling_ranks_closest_value_first():
+    index = FuzzyIndex({name: np.array([i]) for i, name in enumerate(["queens park", "queens glory", "glory"])})
+    assert [m.value for m in index.search("queens parc")][:1] == ["queens park"]
+    assert [m.value for m in index.search("glorry")][:1] == ["glory"]
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from services.nlu_cache import NLUCache
+from services.rule_parser import RuleBasedParser
+
+
+class SameVectorEncoder:
+    """Embeds every text identically: the worst case, where only the guards tell queries apart."""
+
+    name = "same-vector"
+
+    def encode(self, texts, batch_size=64):
+        return np.full((len(texts), 4), 0.5, dtype=np.float32)
+
+
+@pytest.fixture
+def parser(data_manager):
+    return RuleBasedParser.from_data_manager(data_manager)
+
+
+def cached_filters(cache, parser, query):
+    return cache.get(query, parser.entities(query))[2]
+
+
+def store(cache, parser, query, filters):
+    key, embedding, _ = cache.get(query, parser.entities(query))
+    cache.put(key, embedding, filters, parser.entities(query))
+
+
+def test_entities_lists_every_named_place_and_project(parser):
+    assert parser.entities("3 BHK in Ashwini, Pune or Mumbai") == ("city:Mumbai", "city:Pune", "project:Ashwini")
+    assert parser.entities("something sea-facing") == ()
+
+
+def test_semantic_hit_needs_the_same_entities(parser):
+    cache = NLUCache(encoder=SameVectorEncoder())
+    store(cache, parser, "3bhk in Ashwini Pune with a garden", {"project_name": "Ashwini", "city": "Pune"})
+
+    assert cached_filters(cache, parser, "3bhk in Gurukripa Pune with a garden") is None
+    assert cached_filters(cache, parser, "3bhk in Ashwini Mumbai with a garden") is None
+    assert cached_filters(cache, parser, "looking for 3bhk Ashwini Pune having a garden") == {
+        "project_name": "Ashwini", "city": "Pune",
+    }
+
+
+def test_semantic_hit_needs_the_same_numbers(parser):
+    cache = NLUCache(encoder=SameVectorEncoder())
+    store(cache, parser, "2bhk in Pune under 1 cr near a park", {"bhk": ["2BHK"], "max_budget": 10000000})
+
+    assert cached_filters(cache, parser, "3bhk in Pune under 2 cr near a park") is None
+
+
+def test_without_an_encoder_only_exact_phrasing_hits(parser):
+    cache = NLUCache()
+    store(cache, parser, "2 BHK in Pune near a park", {"bhk": ["2BHK"], "city": "Pune"})
+
+    assert cache.stats()["semantic"] == {"enabled": False}
+    assert cached_filters(cache, parser, "2bhk pune near park") == {"bhk": ["2BHK"], "city": "Pune"}
+    assert cached_filters(cache, parser, "2bhk in pune close to a park") is None
@@ -0,0 +1,36 @@
+import pytest
+from services.pagination import CursorStore
+
+
+@pytest.fixture
+def paged(data_manager):
+    store = CursorStore()
+    results = data_manager.search({"city": "Pune"})
+    cursor = store.next_cursor(results, 5)
+    token, _, _ = store.resolve(cursor)
+    return store, results, token
+
+
+def test_valid_cursor_resolves_to_its_page(paged):
+    store, results, token = paged
+    _, resolved, offset = store.resolve(CursorStore._encode(token, 5))
+    assert resolved is results and offset == 5
+    assert [c.id for c in results.page(offset, 3)] == [c.id for c in results.page(0, 8)[5:8]]
+
+
+@pytest.mark.parametrize("offset", [-1, -5])
+def test_negative_offset_is_rejected(paged, offset):
+    store, _, token = paged
+    with pytest.raises(ValueError):
+        store.resolve(CursorStore._encode(token, offset))
+
+
+def test_offset_past_the_end_is_rejected(paged):
+    store, results, token = paged
+    with pytest.raises(ValueError):
+        store.resolve(CursorStore._encode(token, len(results)))
+
+
+def test_expired_cursor_is_a_key_error():
+    with pytest.raises(KeyError):
+        CursorStore().resolve(CursorStore._encode("gone", 0))
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from services.data_manager import DataManager
+from services.lru_cache import LRUCache
+from services.summary_cache import SummaryCache
+from services.summary_engine import SummaryEngine
+
+
+@pytest.fixture(scope="module")
+def plain_frame(data_manager):
+    return DataManager.from_frame(data_manager.master_df.assign(
+        **{name: data_manager.index.text.series(name).astype(object) for name in data_manager.index.text.columns}
+    ), compact=False).master_df
+
+
+@pytest.mark.parametrize("compact", [True, False])
+@pytest.mark.parametrize("column", ["about", "fullAddress", "summary"])
+def test_text_only_edit_changes_data_version(plain_frame, compact, column):
+    edited = plain_frame.copy()
+    edited.loc[0, column] = f"{edited.loc[0, column]} (edited)"
+    before = DataManager.from_frame(plain_frame, compact=compact).data_version
+    after = DataManager.from_frame(edited, compact=compact).data_version
+    assert before != after
+
+
+def test_data_version_is_stable(plain_frame):
+    versions = {DataManager.from_frame(plain_frame.copy(), compact=True).data_version for _ in range(2)}
+    assert len(versions) == 1
+
+
+def test_card_text_changes_cache_key(data_manager):
+    card = data_manager.filter_data({"city": "Pune"})[0]
+    edited = card.model_copy(update={"summary": f"{card.summary} (edited)"})
+    assert SummaryCache.key("best_match", {}, [card], "v") != SummaryCache.key("best_match", {}, [edited], "v")
+
+
+class _Agent:
+    def __init__(self):
+        self.calls = 0
+
+    async def agenerate_summary(self, filters, results, strict=False):
+        self.calls += 1
+        return f"summary {self.calls}"
+
+
+def test_reload_keeps_shared_cache(plain_frame):
+    manager = DataManager.from_frame(plain_frame, compact=True)
+    cache = SummaryCache(LRUCache(max_size=16))
+    agent = _Agent()
+    engine = SummaryEngine(agent, cache=cache, data_manager=manager)
+    cards = manager.filter_data({"city": "Pune"})
+
+    assert asyncio.run(engine.summarize({"city": "Pune"}, cards, "llm")) == "summary 1"
+    manager._publish(plain_frame)
+    # Same data: the entry survives the reload and is served from the cache
+    assert len(cache.backend) == 1
+    assert asyncio.run(engine.summarize({"city": "Pune"}, cards, "llm")) == "summary 1"
@@ -1,9 +1,11 @@
+import json
 import streamlit as st
 import requests
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 
 # --- Configuration ---
 API_URL = "http://localhost:8000/search"
+STREAM_URL = "http://localhost:8000/search/stream"
 
 # --- Utility Functions ---
 def format_price(price: float) -> str:
@@ -16,15 +18,35 @@ def format_price(price: float) -> str:
     else:
         return f"₹{price:,.0f}"
 
-def send_search_request(query: str) -> Dict[str, Any]:
+def send_page_request(cursor: str) -> Dict[str, Any]:
+    """Fetch the next page of an earlier search; the backend keeps its ranked results."""
     try:
-        response = requests.post(API_URL, json={"user_query": query})
+        response = requests.post(API_URL, json={"user_query": "", "cursor": cursor})
         response.raise_for_status()
         return response.json()
     except Exception as e:
-        st.error(f"Error connecting to backend: {e}")
+        st.error(f"Could not load more results: {e}")
         return {}
 
+def stream_search_request(query: str, session_id: str = None) -> Iterator[Dict[str, Any]]:
+    """Yield NDJSON events from the streaming endpoint as they arrive; session_id makes the query a follow-up."""
+    try:
+        with requests.post(STREAM_URL, json={"user_query": query, "session_id": session_id}, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    yield json.loads(line)
+    except Exception as e:
+        st.error(f"Error connecting to backend: {e}")
+
+def render_results(props: list, best_match_reason: str = None):
+    if props:
+        render_best_summary(props[0], best_match_reason)
+        for idx, prop in enumerate(props):
+            render_property_card(prop, highlight_best=(idx == 0))
+    else:
+        st.warning("No matching properties found.")
+
 def normalize_property(prop: dict) -> dict:
     return {
         "project_name": prop.get("project_name") or prop.get("projectId") or "Unknown Project",
@@ -54,7 +76,7 @@ def render_property_card(property_data: dict, highlight_best=False):
     st.caption(f"**Address:** {prop['address']}")
     st.markdown("---")
 
-def render_best_summary(property_data: dict):
+def render_best_summary(property_data: dict, reason: str = None):
     prop = normalize_property(property_data)
     points = [
         f"Project: {prop['project_name']}",
@@ -66,6 +88,8 @@ def render_best_summary(property_data: dict):
     st.markdown("### 5-Point Summary (Best Match)")
     for idx, p in enumerate(points, start=1):
         st.markdown(f"{idx}. {p}")
+    if reason:
+        st.success(f"Why this is the best match: {reason}")
     st.markdown("---")
 
 # --- Streamlit UI ---
@@ -75,22 +99,34 @@ st.markdown("Ask about your Dream Property, I here to search Best value for Mone
 
 if "messages" not in st.session_state:
     st.session_state.messages = []
+# Backend conversation id: follow-ups like "only 3BHK" refine the previous search
+if "search_session" not in st.session_state:
+    st.session_state.search_session = None
+
+if st.session_state.search_session and st.button("New search"):
+    st.session_state.search_session = None
+    st.session_state.messages = []
+    st.rerun()
 
 # Display chat history
-for message in st.session_state.messages:
+for i, message in enumerate(st.session_state.messages):
     with st.chat_message(message.get("role", "assistant")):
         msg_type = message.get("type")
         if msg_type == "summary":
             st.markdown("### Assistant Summary")
             st.info(message.get("content", "No summary provided."))
         elif msg_type == "results":
-            props = message.get("properties", [])
-            if props:
-                render_best_summary(props[0])
-                for idx, prop in enumerate(props):
-                    render_property_card(prop, highlight_best=(idx == 0))
-            else:
-                st.warning("No matching properties found.")
+            render_results(message.get("properties", []), message.get("best_match_reason"))
+            if message.get("next_cursor"):
+                shown, total = len(message.get("properties", [])), message.get("total_results")
+                if st.button(f"Show more results ({shown} of {total})", key=f"more-{i}"):
+                    page = send_page_request(message["next_cursor"])
+                    if page:
+                        message["properties"].extend(page.get("properties", []))
+                        message["next_cursor"] = page.get("next_cursor")
+                    else:
+                        message["next_cursor"] = None
+                    st.rerun()
         else:
             st.markdown(message.get("content", ""))
 
@@ -100,19 +136,50 @@ if prompt := st.chat_input("What property are you looking for?"):
     with st.chat_message("user"):
         st.markdown(prompt)
 
-    with st.spinner("Searching..."):
-        response_data = send_search_request(prompt)
+    # Cards render as soon as they arrive; the summary fills in token by token
+    properties, summary, best_match_reason = None, "", None
+    next_cursor, total_results = None, 0
+    with st.chat_message("assistant"):
+        st.markdown("### Assistant Summary")
+        summary_box = st.empty()
+        best_match_box = st.empty()
+        with st.spinner("Searching..."):
+            events = stream_search_request(prompt, st.session_state.search_session)
+            for event in events:
+                if event.get("type") == "filters":
+                    st.session_state.search_session = event.get("session_id")
+                elif event.get("type") == "properties":
+                    properties = event.get("properties", [])
+                    next_cursor, total_results = event.get("next_cursor"), event.get("total_results", 0)
+                    break
+        if properties is not None:
+            render_results(properties)
+            for event in events:
+                if event.get("type") == "summary":
+                    summary += event.get("delta", "")
+                elif event.get("type") == "summary_replace":
+                    summary = event.get("summary", "")
+                elif event.get("type") == "best_match":
+                    best_match_reason = event.get("reason")
+                    best_match_box.success(f"Why this is the best match: {best_match_reason}")
+                    continue
+                else:
+                    continue
+                summary_box.info(summary)
 
-    if response_data:
+    if properties is not None:
         st.session_state.messages.append({
             "role": "assistant",
             "type": "summary",
-            "content": response_data.get("summary", "No summary provided.")
+            "content": summary.strip() or "No summary provided."
         })
         st.session_state.messages.append({
             "role": "assistant",
             "type": "results",
-            "properties": response_data.get("properties", [])
+            "properties": properties,
+            "best_match_reason": best_match_reason,
+            "next_cursor": next_cursor,
+            "total_results": total_results
         })
 
     st.rerun()
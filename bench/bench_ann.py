@@ -0,0 +1,139 @@
+"""
+Recall and latency of the IVF index behind semantic search, against exact
+brute-force search over the same vectors:
+
+- unfiltered top-k for a range of nprobe values;
+- hybrid top-k restricted to a random subset of rows (structured filter
+  selectivity 1%, 10%, 50%), the way DataManager combines both;
+- optionally (--pipeline) DataManager.search with a 'preferences' filter
+  over a synthetic master frame, embedded with the hashing encoder.
+
+Vectors are random low-rank projections plus noise, unit-normalized: like
+sentence embeddings they live in `dim` dimensions but vary along far fewer
+(--latent), which is what makes inverted lists work at all.
+
+    python bench/bench_ann.py --rows 100000 1000000 --dim 384 --k 10
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from synthetic import make_master_frame
+from services.ann_index import IVFIndex
+from services.data_manager import DataManager
+from services.embeddings import EmbeddingStore, HashingEncoder
+
+
+def embedding_like(rows: int, projection: np.ndarray, seed: int = 0, noise: float = 0.05) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    latent, dim = projection.shape
+    vectors = np.empty((rows, dim), dtype=np.float32)
+    for start in range(0, rows, 100_000):
+        end = min(start + 100_000, rows)
+        vectors[start:end] = rng.standard_normal((end - start, latent), dtype=np.float32) @ projection
+        vectors[start:end] += noise * rng.standard_normal((end - start, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def summarize(samples: list) -> dict:
+    ms = np.array(samples) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 3), "p95_ms": round(float(np.percentile(ms, 95)), 3)}
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return len(np.intersect1d(found, truth)) / max(len(truth), 1)
+
+
+def bench_vectors(rows: int, dim: int, latent: int, k: int, queries: int) -> dict:
+    projection = np.random.default_rng(0).standard_normal((latent, dim), dtype=np.float32) / np.sqrt(latent)
+    vectors = embedding_like(rows, projection)
+    start = time.perf_counter()
+    index = IVFIndex(vectors)
+    build_s = time.perf_counter() - start
+    del vectors
+
+    # Fresh draws from the same distribution, not copies of indexed vectors
+    picks = embedding_like(queries, projection, seed=1)
+    rng = np.random.default_rng(1)
+
+    exact_times, truth = [], []
+    for q in picks:
+        start = time.perf_counter()
+        ids, _ = index.exact(q, k)
+        exact_times.append(time.perf_counter() - start)
+        truth.append(ids)
+
+    result = {"rows": rows, "dim": dim, "latent": latent, "nlist": index.nlist, "default_nprobe": index.nprobe, "build_s": round(build_s, 2),
+              "exact": summarize(exact_times), "ivf": [], "hybrid": []}
+    for nprobe in sorted({1, index.nprobe // 2 or 1, index.nprobe, index.nprobe * 2, index.nprobe * 4}):
+        times, recalls = [], []
+        for q, t in zip(picks, truth):
+            start = time.perf_counter()
+            ids, _ = index.search(q, k, nprobe=nprobe)
+            times.append(time.perf_counter() - start)
+            recalls.append(recall(ids, t))
+        result["ivf"].append({"nprobe": nprobe, f"recall@{k}": round(float(np.mean(recalls)), 4), **summarize(times)})
+
+    for selectivity in (0.01, 0.1, 0.5):
+        allowed = rng.random(rows) < selectivity
+        candidates = np.flatnonzero(allowed)
+        times, exact_times, recalls = [], [], []
+        for q in picks:
+            start = time.perf_counter()
+            truth_ids, _ = index.exact(q, k, candidates)
+            exact_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            ids, _ = index.search(q, k, allowed=allowed)
+            times.append(time.perf_counter() - start)
+            recalls.append(recall(ids, truth_ids))
+        result["hybrid"].append({
+            "selectivity": selectivity, "candidates": len(candidates),
+            f"recall@{k}": round(float(np.mean(recalls)), 4),
+            "ivf": summarize(times), "exact_subset": summarize(exact_times),
+        })
+    return result
+
+
+def bench_pipeline(rows: int, k: int) -> dict:
+    df = make_master_frame(rows)
+    start = time.perf_counter()
+    dm = DataManager.from_frame(df, embeddings=EmbeddingStore(None, HashingEncoder()))
+    load_s = time.perf_counter() - start
+
+    queries = [
+        {"preferences": "sea facing near good schools"},
+        {"city": "Pune", "preferences": "metro station and gym"},
+        {"city": "Mumbai", "bhk": ["2BHK"], "max_budget": 20_000_000, "preferences": "lake view, pet friendly"},
+    ]
+    timings = {}
+    for filters in queries:
+        samples = []
+        for _ in range(20):
+            start = time.perf_counter()
+            dm.search(filters, max_results=k)
+            samples.append(time.perf_counter() - start)
+        timings[json.dumps(filters)] = summarize(samples)
+    return {"rows": rows, "documents": dm.index.semantic.size, "load_s": round(load_s, 2), "search": timings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--latent", type=int, default=24)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--pipeline", action="store_true", help="also time DataManager.search with preferences")
+    args = parser.parse_args()
+
+    results = {"k": args.k, "vectors": [bench_vectors(rows, args.dim, args.latent, args.k, args.queries) for rows in args.rows]}
+    if args.pipeline:
+        results["pipeline"] = [bench_pipeline(rows, args.k) for rows in args.rows]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
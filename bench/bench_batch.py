@@ -0,0 +1,69 @@
+"""
+Saved-query workloads: DataManager.search called once per filter set vs
+DataManager.search_batch over the whole set. The filter sets mimic saved
+buyer queries: a few cities and BHK mixes, many budgets, some duplicates.
+
+    python bench/bench_batch.py --rows 1000000 --queries 5000
+"""
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from synthetic import make_master_frame
+from services.data_manager import DataManager
+
+
+def saved_queries(count: int, seed: int = 0) -> list:
+    rnd = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        filters = {}
+        if rnd.random() < 0.8:
+            filters["city"] = rnd.choice(["Pune", "Mumbai", "Dombivli"])
+        if rnd.random() < 0.7:
+            filters["bhk"] = rnd.sample(["1BHK", "2BHK", "3BHK", "4BHK"], rnd.randint(1, 2))
+        if rnd.random() < 0.2:
+            filters["locality"] = rnd.choice(["chembur", "mundhwa", "andheri"])
+        if rnd.random() < 0.7:
+            filters["max_budget"] = rnd.randrange(5_000_000, 30_000_001, 500_000)
+        if rnd.random() < 0.3:
+            filters["min_budget"] = rnd.randrange(2_000_000, 10_000_001, 500_000)
+        queries.append(filters)
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    dm = DataManager.from_frame(make_master_frame(args.rows))
+    queries = saved_queries(args.queries)
+
+    start = time.perf_counter()
+    single = [dm.search(filters, max_results=args.k) for filters in queries]
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = dm.search_batch(queries, max_results=args.k)
+    batch_s = time.perf_counter() - start
+
+    same = all(a.total == b.total and np.array_equal(a.positions, b.positions) for a, b in zip(single, batch))
+    print(json.dumps({
+        "rows": args.rows,
+        "queries": args.queries,
+        "distinct_filter_sets": len({id(r) for r in batch}),
+        "one_by_one_s": round(single_s, 2),
+        "batch_s": round(batch_s, 2),
+        "speedup": round(single_s / batch_s, 2),
+        "identical_results": same,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
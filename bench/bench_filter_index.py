@@ -0,0 +1,81 @@
+"""
+Compare the legacy per-request mask path of DataManager.filter_data with the
+precomputed FilterIndex lookup.
+
+    python bench/bench_filter_index.py --rows 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from synthetic import make_master_frame
+from services.data_manager import DataManager
+
+QUERIES = [
+    {"city": "Pune"},
+    {"city": "Mumbai", "bhk": ["2BHK"]},
+    {"city": "Pune", "bhk": ["2BHK", "3BHK"], "max_budget": 15000000},
+    {"min_budget": 5000000, "max_budget": 8000000},
+    {"locality": "chembur", "bhk": ["1BHK"]},
+    {"project_name": "project 42"},
+]
+
+
+def legacy_select(df, filters):
+    """The pre-index selection logic: full-frame copy plus string ops on every call."""
+    df = df.copy()
+    conditions = []
+    if filters.get("city"):
+        conditions.append(df['city'].str.lower() == filters["city"].strip().lower())
+    if filters.get("bhk"):
+        bhk_list = [b.lower().replace('bhk', '').strip() for b in filters["bhk"]]
+        conditions.append(df['bhk_type'].str.lower().str.replace('bhk', '').isin(bhk_list))
+    if filters.get("min_budget"):
+        conditions.append(df['min_price'] >= filters["min_budget"])
+    if filters.get("max_budget"):
+        conditions.append(df['min_price'] <= filters["max_budget"])
+    if filters.get("project_name"):
+        conditions.append(df['project_name'].str.lower().str.contains(filters["project_name"].strip().lower(), na=False))
+    if filters.get("locality"):
+        conditions.append(df['locality'].str.lower().str.contains(filters["locality"].strip().lower(), na=False))
+    mask = conditions[0]
+    for cond in conditions[1:]:
+        mask &= cond
+    return np.flatnonzero(mask.to_numpy())
+
+
+def measure(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        for q in QUERIES:
+            start = time.perf_counter()
+            fn(q)
+            samples.append((time.perf_counter() - start) * 1000)
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        df = make_master_frame(rows)
+        start = time.perf_counter()
+        manager = DataManager.from_frame(df)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        for q in QUERIES:
+            assert np.array_equal(legacy_select(manager.master_df, q), manager.index.lookup(q)), q
+
+        legacy = measure(lambda q: legacy_select(manager.master_df, q), args.repeats)
+        indexed = measure(manager.index.lookup, args.repeats)
+        print(f"rows={rows:>9,}  index build {build_ms:8.1f} ms")
+        print(f"  legacy   p50={legacy[0]:8.2f} ms  p99={legacy[1]:8.2f} ms")
+        print(f"  indexed  p50={indexed[0]:8.2f} ms  p99={indexed[1]:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
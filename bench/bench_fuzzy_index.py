@@ -0,0 +1,91 @@
+"""
+Project-name lookup: per-request str.contains (the original filter_data path)
+vs the trigram FuzzyIndex, on exact names and on misspelt ones.
+
+    python bench/bench_fuzzy_index.py --rows 1000000 --queries 300
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from synthetic import make_master_frame
+from services.filter_index import FilterIndex
+
+SYLLABLES = ["ka", "ri", "sha", "vi", "mo", "ne", "ta", "lu", "dra", "pa", "go", "an", "sun", "mi", "ro"]
+SUFFIXES = ["Heights", "Residency", "Towers", "Park", "Avenue", "Enclave", "Greens"]
+
+
+def project_names(count: int, rng) -> np.ndarray:
+    names = {
+        "".join(rng.choice(SYLLABLES, 3)).title() + " " + rng.choice(SUFFIXES)
+        for _ in range(count * 2)
+    }
+    return np.array(sorted(names)[:count])
+
+
+def misspell(name: str, rng) -> str:
+    """Drop, double or swap one letter inside the first word."""
+    word, rest = name.split(" ", 1)
+    i = int(rng.integers(1, len(word) - 1))
+    edit = rng.integers(0, 3)
+    if edit == 0:
+        word = word[:i] + word[i + 1:]
+    elif edit == 1:
+        word = word[:i] + word[i] + word[i:]
+    else:
+        word = word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+    return f"{word} {rest}"
+
+
+def percentiles(samples):
+    ms = np.array(samples) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 3), "p99_ms": round(float(np.percentile(ms, 99)), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    df = make_master_frame(args.rows)
+    names = project_names(max(args.rows // 20, 1), rng)
+    df["project_name"] = names[rng.integers(0, len(names), args.rows)]
+
+    index = FilterIndex(df)
+    start = time.perf_counter()
+    index.project_fuzzy
+    build_s = time.perf_counter() - start
+
+    targets = rng.choice(df["project_name"].unique(), args.queries)
+    typos = [misspell(t, rng) for t in targets]
+    lowered = df["project_name"].str.lower()
+
+    results = {"rows": args.rows, "distinct_projects": len(names), "fuzzy_build_s": round(build_s, 3)}
+    for label, queries in (("exact", targets), ("misspelt", typos)):
+        legacy, fuzzy, legacy_hits, fuzzy_hits, fuzzy_top5 = [], [], 0, 0, 0
+        for query, target in zip(queries, targets):
+            t0 = time.perf_counter()
+            hit = lowered.str.contains(query.lower(), na=False, regex=False)
+            legacy.append(time.perf_counter() - t0)
+            legacy_hits += bool(hit.any())
+
+            t0 = time.perf_counter()
+            matches = index.fuzzy("project_name", query, k=5)
+            fuzzy.append(time.perf_counter() - t0)
+            fuzzy_hits += bool(matches) and matches[0].value == target
+            fuzzy_top5 += any(m.value == target for m in matches)
+
+        results[label] = {
+            "str_contains": {**percentiles(legacy), "found": legacy_hits},
+            "fuzzy_top5": {**percentiles(fuzzy), "top1_correct": fuzzy_hits, "top5_contains": fuzzy_top5},
+            "queries": len(queries),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
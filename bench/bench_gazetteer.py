@@ -0,0 +1,74 @@
+"""
+Address resolution at load time: the old per-row keyword loop vs the Gazetteer.
+
+The gazetteer is padded with synthetic locality keywords to show how each
+approach scales as cities and localities are added.
+
+    python bench/bench_gazetteer.py --rows 200000 --keywords 20 200 1000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from synthetic import make_master_frame
+from services.data_manager import DataManager
+from services.gazetteer import Gazetteer
+
+
+def legacy_city(addresses: pd.Series, city_mapping) -> pd.Series:
+    def map_city(address: str) -> str:
+        if not isinstance(address, str):
+            return "Unknown City"
+        address_lower = address.lower()
+        for city, keywords in city_mapping.items():
+            for kw in keywords:
+                if kw.lower() in address_lower:
+                    return city
+        return "Unknown City"
+    return addresses.apply(map_city)
+
+
+def padded_mapping(extra: int):
+    """CITY_MAPPING plus `extra` made-up keywords, placed ahead of the real ones (worst case for the loop)."""
+    mapping = {"Elsewhere": [f"Nowhere Nagar {n}" for n in range(extra)]}
+    mapping.update(DataManager.CITY_MAPPING)
+    return mapping
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, round(time.perf_counter() - start, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--keywords", type=int, nargs="+", default=[0, 200, 1000])
+    parser.add_argument("--unique", action="store_true", help="make every address distinct (no dedupe benefit)")
+    args = parser.parse_args()
+
+    addresses = make_master_frame(args.rows)["fullAddress"]
+    if args.unique:
+        addresses = "Plot " + pd.Series(np.arange(args.rows)).astype(str) + ", " + addresses
+    results = []
+    for extra in args.keywords:
+        mapping = padded_mapping(extra)
+        legacy, legacy_s = timed(lambda: legacy_city(addresses, mapping))
+        gazetteer, build_s = timed(lambda: Gazetteer(mapping, DataManager.PINCODE_REGIONS))
+        resolved, resolve_s = timed(lambda: gazetteer.resolve_addresses(addresses))
+        assert np.array_equal(legacy.to_numpy(), resolved["city"].to_numpy())
+        results.append({
+            "extra_keywords": extra,
+            "legacy_s": legacy_s,
+            "gazetteer_build_s": build_s,
+            "gazetteer_resolve_s": resolve_s,
+        })
+    print(json.dumps({"rows": args.rows, "unique": args.unique, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
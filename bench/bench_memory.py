@@ -0,0 +1,81 @@
+"""
+Memory layout of the master frame: plain object columns (DATA_COMPACT=0)
+vs the compact layout (categoricals, downcast numbers, text side store).
+
+For each layout, a fresh interpreter loads the same CSVs, then the snapshot
+written by that load, and reports RSS after loading, peak RSS, the in-frame
+and text store bytes, and the latency of search (matching and ranking only)
+and filter_data (including card materialization) over the run_suite query mix.
+
+    python bench/bench_memory.py --rows 1000000
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from synthetic import BACKEND_DIR, write_source_csvs
+
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {backend!r})
+sys.path.insert(0, {bench!r})
+from run_suite import FILTER_QUERIES, percentiles
+from services.data_manager import DataManager
+
+def status_mb(field):
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field + ":")) / 1024
+
+start = time.perf_counter()
+dm = DataManager({data_dir!r}, snapshot_dir={snapshot_dir!r}, compact={compact!r})
+result = {{
+    "load_s": round(time.perf_counter() - start, 3),
+    "rss_after_load_mb": round(status_mb("VmRSS"), 1),
+    "frame_mb": round(dm.master_df.memory_usage(deep=True).sum() / 2**20, 1),
+    "text_store_mb": round(dm.index.text.nbytes / 2**20, 1),
+}}
+for name, call in (("search", lambda q: dm.search(q)), ("filter_data", lambda q: dm.filter_data(q))):
+    samples = []
+    for filters in FILTER_QUERIES:
+        call(filters)
+        for _ in range({repeats}):
+            t = time.perf_counter()
+            call(filters)
+            samples.append(time.perf_counter() - t)
+    result[name] = percentiles(samples)
+# VmHWM starts afresh at exec, unlike ru_maxrss, which a child inherits from its parent
+result["peak_rss_mb"] = round(status_mb("VmHWM"), 1)
+print("RESULT", json.dumps(result))
+"""
+
+
+def run(data_dir: str, snapshot_dir: str, compact: bool, repeats: int) -> dict:
+    code = CHILD.format(backend=str(BACKEND_DIR), bench=str(Path(__file__).resolve().parent),
+                        data_dir=data_dir, snapshot_dir=snapshot_dir, compact=compact, repeats=repeats)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(next(line for line in out.splitlines() if line.startswith("RESULT"))[len("RESULT "):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    results = {"rows": args.rows}
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = str(write_source_csvs(Path(tmp) / "data", args.rows))
+        for layout, compact in (("plain", False), ("compact", True)):
+            snapshot_dir = str(Path(tmp) / f"snapshot-{layout}")
+            results[layout] = {
+                "csv": run(data_dir, snapshot_dir, compact, args.repeats),
+                "snapshot": run(data_dir, snapshot_dir, compact, args.repeats),
+            }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
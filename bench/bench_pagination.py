@@ -0,0 +1,55 @@
+"""
+First page (filter + rank) vs later pages (slice of the cached ranking),
+at increasing depth, through DataManager.search and RankedResults.page.
+
+    python bench/bench_pagination.py --rows 1000000 --page-size 20
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from synthetic import make_master_frame
+from services.data_manager import DataManager
+
+FILTERS = {"city": "Pune", "bhk": ["2BHK"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--max-results", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+
+    dm = DataManager.from_frame(make_master_frame(args.rows))
+
+    first = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        results = dm.search(FILTERS, max_results=args.max_results)
+        results.page(0, args.page_size)
+        first.append(time.perf_counter() - start)
+
+    depths = {}
+    for offset in (args.page_size, args.max_results // 2, args.max_results - args.page_size):
+        samples = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            results.page(offset, args.page_size)
+            samples.append(time.perf_counter() - start)
+        depths[offset] = round(float(np.percentile(samples, 50)) * 1000, 3)
+
+    print(json.dumps({
+        "rows": args.rows,
+        "matches": results.total,
+        "page_size": args.page_size,
+        "first_page_p50_ms": round(float(np.percentile(first, 50)) * 1000, 3),
+        "later_page_p50_ms_by_offset": depths,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Cost of relevance ranking: Ranker.top_k (argpartition) vs scoring plus a full
+argsort, over candidate sets of increasing size.
+
+    python bench/bench_ranking.py --rows 1000000 --k 50
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from synthetic import make_master_frame
+from services.ranking import Ranker, RankFeatures
+
+FILTERS = {"bhk": ["2BHK", "3BHK"], "min_budget": 5_000_000, "max_budget": 20_000_000}
+
+
+def timed(fn, repeats: int) -> dict:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    ms = np.array(samples) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 3), "p99_ms": round(float(np.percentile(ms, 99)), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+
+    df = make_master_frame(args.rows)
+    start = time.perf_counter()
+    features = RankFeatures(df)
+    build_s = time.perf_counter() - start
+    ranker = Ranker()
+
+    results = {"rows": args.rows, "k": args.k, "features_build_s": round(build_s, 3), "candidates": []}
+    rng = np.random.default_rng(3)
+    for size in (1_000, 100_000, args.rows):
+        positions = np.sort(rng.choice(args.rows, size=min(size, args.rows), replace=False))
+        top = ranker.top_k(features, positions, FILTERS, args.k)
+        full = positions[np.argsort(-ranker.score(features, positions, FILTERS), kind="stable")][:args.k]
+        assert np.array_equal(top, full)
+        results["candidates"].append({
+            "size": len(positions),
+            "top_k": timed(lambda: ranker.top_k(features, positions, FILTERS, args.k), args.repeats),
+            "full_sort": timed(lambda: positions[np.argsort(-ranker.score(features, positions, FILTERS))][:args.k], args.repeats),
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Accuracy and latency of the rule-based NLU fast path over a labelled corpus.
+
+Each line of nlu_corpus.jsonl holds a query and the filters it should produce,
+or "expected": null when the query needs the LLM. Reports how many queries the
+fast path answers, how many of those answers are exactly right, how many
+should have fallen back, and parse latency.
+
+    python bench/bench_rule_parser.py --threshold 0.8
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from synthetic import BACKEND_DIR
+from services.data_manager import DataManager
+from services.rule_parser import RuleBasedParser
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=str(Path(__file__).with_name("nlu_corpus.jsonl")))
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    rules = RuleBasedParser.from_data_manager(DataManager(data_dir=str(BACKEND_DIR / "Data")))
+    corpus = [json.loads(line) for line in open(args.corpus) if line.strip()]
+
+    answered = correct = false_confident = 0
+    for case in corpus:
+        parsed = rules.parse(case["query"])
+        fast = parsed.confidence >= args.threshold
+        answered += fast
+        if fast and case["expected"] is None:
+            false_confident += 1
+        elif fast and parsed.filters == case["expected"]:
+            correct += 1
+        if args.verbose or (fast and parsed.filters != case["expected"]):
+            print(f"  {'FAST' if fast else 'LLM '} {parsed.confidence:.2f} {case['query']!r} -> {parsed.filters}")
+
+    samples = []
+    for _ in range(args.repeats):
+        for case in corpus:
+            start = time.perf_counter()
+            rules.parse(case["query"])
+            samples.append((time.perf_counter() - start) * 1000)
+
+    expected_fast = sum(case["expected"] is not None for case in corpus)
+    print(f"corpus={len(corpus)} threshold={args.threshold}")
+    print(f"  fast-path answered {answered}/{len(corpus)} (labelled answerable: {expected_fast})")
+    print(f"  exact-match accuracy on answered: {correct}/{answered}")
+    print(f"  answered but needed LLM: {false_confident}")
+    print(f"  parse latency p50={np.percentile(samples, 50):.3f} ms  p99={np.percentile(samples, 99):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Startup time and memory: joining the source CSVs vs loading the mmap snapshot.
+
+Each measurement runs in a fresh interpreter so peak RSS is per startup.
+
+    python bench/bench_snapshot.py --rows 1000000
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from synthetic import BACKEND_DIR, write_source_csvs
+
+CHILD = """
+import resource, sys, time
+sys.path.insert(0, {backend!r})
+start = time.perf_counter()
+from services.data_manager import DataManager
+dm = DataManager({data_dir!r}, snapshot_dir={snapshot_dir!r})
+dm.filter_data({{"city": "Pune", "bhk": ["2BHK"], "max_budget": 20000000}})
+elapsed = time.perf_counter() - start
+print("RESULT", elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def run(data_dir: str, snapshot_dir) -> dict:
+    code = CHILD.format(backend=str(BACKEND_DIR), data_dir=data_dir, snapshot_dir=snapshot_dir)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    _, elapsed, maxrss = next(line for line in out.splitlines() if line.startswith("RESULT")).split()
+    return {"startup_s": round(float(elapsed), 3), "peak_rss_mb": round(int(maxrss) / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = str(write_source_csvs(Path(tmp) / "data", args.rows))
+        snapshot_dir = str(Path(tmp) / "snapshot")
+
+        results = {
+            "rows": args.rows,
+            "csv": run(data_dir, None),
+            "csv_and_write_snapshot": run(data_dir, snapshot_dir),
+            "snapshot": run(data_dir, snapshot_dir),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
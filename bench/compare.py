@@ -0,0 +1,84 @@
+"""
+Compare two bench/run_suite.py result files and flag regressions: latencies
+and durations (*_ms, *_s) that grew, or throughput (*_rps) that dropped, by
+more than --threshold. Exits with status 1 when any regression is found.
+
+    python bench/compare.py results/baseline.json results/new.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+
+
+def flatten(value, prefix: str = "") -> dict:
+    """{'a.b.c': number} for every number; datasets are keyed by row count, search levels by concurrency."""
+    if isinstance(value, dict):
+        out = {}
+        for key, item in value.items():
+            out.update(flatten(item, f"{prefix}{key}."))
+        return out
+    if isinstance(value, list):
+        out = {}
+        for i, item in enumerate(value):
+            if isinstance(item, dict) and "concurrency" in item:
+                key = f"c{item['concurrency']}"
+            elif isinstance(item, dict) and "rows" in item:
+                key = f"rows={item['rows']}"
+            else:
+                key = str(i)
+            out.update(flatten(item, f"{prefix}{key}."))
+        return out
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix.rstrip("."): float(value)}
+    return {}
+
+
+def direction(name: str) -> int:
+    """+1 when higher is worse, -1 when lower is worse, 0 when not compared."""
+    metric = name.rsplit(".", 1)[-1]
+    if metric.endswith("_rps"):
+        return -1
+    if metric.endswith("_ms") or metric.endswith("_s") or metric == "peak_rss_mb":
+        return 1
+    return 0
+
+
+def compare(old: dict, new: dict, threshold: float) -> list:
+    rows = []
+    for name, before in old.items():
+        after = new.get(name)
+        sign = direction(name)
+        if after is None or sign == 0 or before == 0:
+            continue
+        change = (after - before) / before
+        rows.append((name, before, after, change, sign * change > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change counted as a regression.")
+    parser.add_argument("--all", action="store_true", help="Print every compared metric, not just regressions.")
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = flatten(json.load(f).get("datasets", []))
+    with open(args.new) as f:
+        new = flatten(json.load(f).get("datasets", []))
+
+    rows = compare(old, new, args.threshold)
+    regressions = [row for row in rows if row[4]]
+    for name, before, after, change, regressed in (rows if args.all else regressions):
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:70s} {before:12.3f} -> {after:12.3f}  {change:+7.1%}  {flag}")
+    missing = sorted(set(old) - set(new))
+    if missing:
+        print(f"{len(missing)} metrics missing from {args.new}, e.g. {missing[0]}")
+    print(f"{len(rows)} metrics compared, {len(regressions)} regressions over {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
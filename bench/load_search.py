@@ -0,0 +1,59 @@
+"""
+Concurrent /search throughput against the stub Ollama server, comparing the
+old blocking pipeline (sync LLM calls inside the async handler) with the
+awaited async pipeline.
+
+    python bench/load_search.py --requests 32 --latency 0.5
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from synthetic import BACKEND_DIR
+from stub_ollama import start_in_thread
+
+
+async def blocking_search(main, query):
+    """The pre-async handler body: ollama calls block the event loop."""
+    filters = main.llm_agent.extract_filters(query)
+    properties = main.data_manager.filter_data(filters)
+    return main.llm_agent.generate_summary(filters, properties)
+
+
+async def run(handler, requests):
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(f"2bhk in pune under 2 cr #{i}") for i in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=16, help="LLM_MAX_CONCURRENCY for the agent.")
+    parser.add_argument("--port", type=int, default=11500)
+    args = parser.parse_args()
+
+    start_in_thread(args.port, args.latency)
+    os.environ["OLLAMA_HOST"] = f"http://127.0.0.1:{args.port}"
+    os.environ["LLM_MAX_CONCURRENCY"] = str(args.concurrency)
+    # Measure the LLM pipeline itself: no rule-based fast path, no semantic cache
+    os.environ["NLU_FAST_PATH_THRESHOLD"] = "2"
+    os.environ["NLU_SEMANTIC_CACHE"] = "0"
+
+    import main as backend
+    from models.request_models import ChatRequest
+    from services.data_manager import DataManager
+    if backend.data_manager is None:
+        backend.data_manager = DataManager(data_dir=str(BACKEND_DIR / "Data"))
+
+    before = asyncio.run(run(lambda q: blocking_search(backend, q), args.requests))
+    after = asyncio.run(run(lambda q: backend.chat_search(ChatRequest(user_query=q)), args.requests))
+    print(f"{args.requests} requests, stub latency {args.latency}s per LLM call")
+    print(f"  blocking  {before:7.2f} req/s")
+    print(f"  async     {after:7.2f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Benchmark suite with machine-readable results, for comparing runs with
+bench/compare.py. For each dataset size it measures:
+
+- load_join: startup of a fresh interpreter joining the four CSVs, writing
+  the mmap snapshot, and loading that snapshot (time and peak RSS);
+- filter_data: p50/p95/p99 of DataManager.filter_data over a query mix;
+- generate_summary: template summaries, and LLM summaries (blocking, async,
+  and streamed time to first token) against the stub Ollama server;
+- search: end-to-end /search load at several concurrency levels, reporting
+  throughput and p50/p95/p99 latency.
+
+Datasets are generated with bench/synthetic.py unless --data-dir points at
+existing CSVs (e.g. from bench/generate_data.py). The LLM is the stub server
+from bench/stub_ollama.py with the given --latency and --token-rate.
+
+    python bench/run_suite.py --rows 10000 100000 --output results/baseline.json
+    python bench/run_suite.py --rows 10000 100000 --output results/new.json
+    python bench/compare.py results/baseline.json results/new.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from synthetic import BACKEND_DIR, write_source_csvs
+from stub_ollama import start_in_thread
+import bench_snapshot
+
+FILTER_QUERIES = [
+    {"city": "Pune"},
+    {"city": "Mumbai", "bhk": ["2BHK"]},
+    {"city": "Pune", "bhk": ["2BHK", "3BHK"], "max_budget": 15000000},
+    {"min_budget": 5000000, "max_budget": 8000000},
+    {"locality": "chembur", "bhk": ["1BHK"]},
+    {"project_name": "project 42"},
+]
+# /search query templates; the budget varies so requests are not all summary-cache hits
+SEARCH_QUERIES = [
+    "2bhk in pune under {budget} lakh",
+    "3 bhk flats in mumbai under {budget} lakh",
+    "ready to move 1bhk in chembur under {budget} lakh",
+    "properties in dombivli under {budget} lakh",
+    "4bhk in pune under {budget} lakh",
+    "2bhk near andheri under {budget} lakh",
+]
+
+
+def percentiles(samples) -> dict:
+    ms = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+    }
+
+
+def metadata(args) -> dict:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=BACKEND_DIR.parent).stdout.strip()
+    except OSError:
+        rev = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_rev": rev,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "args": vars(args),
+    }
+
+
+def bench_load_join(data_dir: str) -> dict:
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        return {
+            "csv": bench_snapshot.run(data_dir, None),
+            "csv_and_write_snapshot": bench_snapshot.run(data_dir, snapshot_dir),
+            "snapshot": bench_snapshot.run(data_dir, snapshot_dir),
+        }
+
+
+def bench_filter(dm, repeats: int) -> dict:
+    results, everything = {}, []
+    for filters in FILTER_QUERIES:
+        dm.filter_data(filters)  # warm-up
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            dm.filter_data(filters)
+            samples.append(time.perf_counter() - start)
+        results[json.dumps(filters, sort_keys=True)] = percentiles(samples)
+        everything += samples
+    return {"all": percentiles(everything), "queries": results}
+
+
+async def bench_summary(agent, dm, repeats: int) -> dict:
+    from services.summary_engine import template_summary
+
+    filters = {"city": "Pune", "bhk": ["2BHK"]}
+    properties = dm.filter_data(filters, limit=10)
+
+    def timed(fn):
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+        return percentiles(samples)
+
+    async def first_token():
+        start = time.perf_counter()
+        async for _ in agent.astream_summary(filters, properties, strict=True):
+            return time.perf_counter() - start
+
+    awaited = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await agent.agenerate_summary(filters, properties, strict=True)
+        awaited.append(time.perf_counter() - start)
+
+    return {
+        "template": timed(lambda: template_summary(filters, properties)),
+        "llm_sync": timed(lambda: agent.generate_summary(filters, properties)),
+        "llm_async": percentiles(awaited),
+        "llm_stream_first_token": percentiles([await first_token() for _ in range(repeats)]),
+    }
+
+
+def search_query(i: int, distinct: int, batch: int) -> str:
+    """Query i of load-test batch: distinct budgets per template, new ones every batch."""
+    template = SEARCH_QUERIES[i % len(SEARCH_QUERIES)]
+    return template.format(budget=50 + 5 * (batch * distinct + (i // len(SEARCH_QUERIES)) % distinct))
+
+
+async def load_test(client, requests: int, concurrency: int, summary_mode: str, distinct: int, batch: int = 0) -> dict:
+    """
+    requests /search calls with at most concurrency in flight. Each template is
+    asked with `distinct` budgets, so the first len(SEARCH_QUERIES) * distinct
+    requests miss the summary cache and the rest hit it.
+    """
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+    samples, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            body = {"user_query": search_query(i, distinct, batch), "summary_mode": summary_mode}
+            start = time.perf_counter()
+            try:
+                response = await client.post("/search", json=body)
+                response.raise_for_status()
+            except Exception:
+                errors += 1
+                continue
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    result = {"concurrency": concurrency, "requests": requests, "errors": errors,
+              "throughput_rps": round(len(samples) / wall, 2)}
+    if samples:
+        result.update(percentiles(samples))
+    return result
+
+
+async def bench_search(backend, url, requests: int, levels, summary_mode: str, distinct: int) -> list:
+    import httpx
+
+    if url:
+        client = httpx.AsyncClient(base_url=url, timeout=120)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=backend.app), base_url="http://bench", timeout=120)
+    async with client:
+        # Warm up connections and the NLU path, then give every level its own fresh queries
+        await load_test(client, len(SEARCH_QUERIES), 1, summary_mode, 1, batch=len(levels))
+        return [await load_test(client, requests, level, summary_mode, distinct, batch)
+                for batch, level in enumerate(levels)]
+
+
+def import_backend(args):
+    """Import the FastAPI app configured for benchmarking (stub LLM, no snapshot, no polling)."""
+    os.environ["OLLAMA_HOST"] = f"http://127.0.0.1:{args.port}"
+    os.environ["DATA_SNAPSHOT_DIR"] = ""
+    os.environ["DATA_REFRESH_INTERVAL"] = "0"
+    os.environ.setdefault("SEMANTIC_SEARCH", "0")
+    import main as backend
+    return backend
+
+
+async def bench_dataset(backend, data_dir: str, rows, args) -> dict:
+    from services.data_manager import DataManager
+    from services.rule_parser import RuleBasedParser
+
+    result = {"rows": rows}
+    if not args.skip_load:
+        result["load_join"] = bench_load_join(data_dir)
+
+    dm = DataManager(data_dir=data_dir)
+    result["rows"] = len(dm.master_df)
+    result["filter_data"] = bench_filter(dm, args.repeats)
+    result["generate_summary"] = await bench_summary(backend.llm_agent, dm, args.summary_repeats)
+
+    if not args.url:
+        # Serve this dataset from the in-process app
+        backend.data_manager = dm
+        backend.summary_engine.data_manager = dm
+        backend.llm_agent.parser = RuleBasedParser.from_data_manager(dm)
+        dm.ranker = backend.Ranker(backend.RankingWeights.from_string(os.getenv("RANKING_WEIGHTS", "")))
+    result["search"] = await bench_search(backend, args.url, args.requests, args.concurrency, args.summary_mode, args.distinct)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--data-dir", help="Benchmark existing CSVs instead of generating --rows.")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--repeats", type=int, default=50, help="filter_data calls per query.")
+    parser.add_argument("--summary-repeats", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200, help="/search calls per concurrency level.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--distinct", type=int, default=5, help="Budgets per query template (cache-miss share).")
+    parser.add_argument("--summary-mode", default="llm", choices=["template", "llm", "hybrid"])
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub LLM seconds per call.")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="Stub LLM streamed words per second.")
+    parser.add_argument("--port", type=int, default=11510)
+    parser.add_argument("--url", help="Load-test a running server instead of the in-process app.")
+    parser.add_argument("--skip-load", action="store_true", help="Skip the subprocess load/join timings.")
+    args = parser.parse_args()
+
+    start_in_thread(args.port, args.latency, args.token_rate)
+    backend = import_backend(args)
+
+    # One event loop for the whole run: the agent's AsyncClient keeps connections bound to it
+    async def run_all():
+        if args.data_dir:
+            return [await bench_dataset(backend, args.data_dir, None, args)]
+        datasets = []
+        for rows in args.rows:
+            with tempfile.TemporaryDirectory() as tmp:
+                data_dir = str(write_source_csvs(Path(tmp) / "data", rows))
+                datasets.append(await bench_dataset(backend, data_dir, rows, args))
+        return datasets
+
+    results = {"meta": metadata(args), "datasets": asyncio.run(run_all())}
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
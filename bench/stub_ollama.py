@@ -0,0 +1,84 @@
+"""
+Minimal stand-in for the Ollama HTTP API, for load tests without a real model.
+
+Answers POST /api/chat after a fixed latency: NLU prompts get a small filter
+JSON, everything else gets a canned summary. With "stream": true the reply is
+sent as NDJSON chunks, one word every 1/token_rate seconds.
+
+    python bench/stub_ollama.py --port 11500 --latency 1.0 --token-rate 40
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+FILTER_REPLY = {"city": "Pune", "bhk": ["2BHK"], "max_budget": 20000000}
+SUMMARY_REPLY = (
+    "1. Several 2BHK options are available.\n2. Prices fit the stated budget.\n"
+    "3. Most projects are in Pune.\n4. Ready-to-move and under-construction units exist.\n"
+    "5. Compare carpet areas before deciding."
+)
+
+
+def _message(model: str, content: str, done: bool, prompt_tokens: int = 0, completion_tokens: int = 0) -> dict:
+    message = {
+        "model": model,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "message": {"role": "assistant", "content": content},
+        "done": done,
+    }
+    if done:
+        # Ollama reports token counts on the final message; words stand in for tokens here
+        message.update(prompt_eval_count=prompt_tokens, eval_count=completion_tokens)
+    return message
+
+
+def create_app(latency: float, token_rate: float = 40.0) -> FastAPI:
+    app = FastAPI(title="Stub Ollama")
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        await asyncio.sleep(latency)
+        system = body.get("messages", [{}])[0].get("content", "")
+        content = json.dumps(FILTER_REPLY) if "NLU agent" in system else SUMMARY_REPLY
+        prompt_tokens = sum(len(m.get("content", "").split()) for m in body.get("messages", []))
+        completion_tokens = len(content.split(" "))
+        if not body.get("stream"):
+            return _message(model, content, True, prompt_tokens, completion_tokens)
+
+        async def chunks():
+            for word in content.split(" "):
+                yield json.dumps(_message(model, word + " ", False)) + "\n"
+                await asyncio.sleep(1 / token_rate)
+            yield json.dumps(_message(model, "", True, prompt_tokens, completion_tokens)) + "\n"
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    return app
+
+
+def start_in_thread(port: int, latency: float, token_rate: float = 40.0) -> uvicorn.Server:
+    """Run the stub on its own event loop in a daemon thread and wait until it is up."""
+    app = create_app(latency, token_rate)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds to wait before each reply.")
+    parser.add_argument("--token-rate", type=float, default=40.0, help="Streamed words per second.")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency, args.token_rate), host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,181 @@
+"""Synthetic data helpers shared by the benchmark scripts."""
+import csv
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "Backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+LOCALITIES = {
+    "Pune": ["Shivajinagar", "Mundhwa", "Mamurdi", "Model Colony", "Punawale", "Somwar Peth", "Sai Nagar"],
+    "Mumbai": ["Chembur", "Mulund", "Ghatkopar", "Andheri", "Sewri", "Pant Nagar"],
+    "Dombivli": ["Dombivli East", "Dombivli West"],
+}
+STATUSES = ["READY_TO_MOVE", "UNDER_CONSTRUCTION"]
+BHK_TYPES = ["1BHK", "2BHK", "3BHK", "4BHK"]
+FEATURES = [
+    "sea-facing balconies", "close to good schools", "metro station nearby", "large clubhouse and gym",
+    "quiet green neighbourhood", "walking distance to IT park", "swimming pool on the terrace",
+    "hospital within a kilometre", "lake view from the living room", "24x7 security and gated campus",
+    "kids play area and jogging track", "vastu compliant layout", "covered parking for two cars",
+    "near the highway", "shopping mall across the road", "pet friendly society",
+]
+
+
+def describe(rng: np.random.Generator, count: int, per_text: int = 2) -> np.ndarray:
+    """Free-text listing descriptions made of a few random FEATURES."""
+    picks = np.array(FEATURES)[rng.integers(0, len(FEATURES), (count, per_text))]
+    return np.array([", ".join(row).capitalize() + "." for row in picks], dtype=object)
+
+
+def make_master_frame(rows: int, seed: int = 7) -> pd.DataFrame:
+    """Build a master DataFrame with the same columns DataManager produces after joining."""
+    rng = np.random.default_rng(seed)
+    cities = np.array(list(LOCALITIES))
+    city = cities[rng.integers(0, len(cities), rows)]
+    locality = np.array([LOCALITIES[c][i % len(LOCALITIES[c])] for c, i in zip(city, rng.integers(0, 100, rows))])
+    projects = max(rows // 20, 1)
+    project_no = rng.integers(0, projects, rows)
+    bhk = np.array(BHK_TYPES)[rng.integers(0, len(BHK_TYPES), rows)]
+    price = rng.integers(20, 500, rows) * 1e5
+
+    df = pd.DataFrame({
+        "id": [f"proj{n:08d}" for n in project_no],
+        "project_name": [f"Project {n}" for n in project_no],
+        "status": np.array(STATUSES)[rng.integers(0, 2, rows)],
+        "possession_date": "2026-12-31 00:00:00",
+        "summary": "",
+        "about": "",
+        "bhk_type": bhk,
+        "min_price": price,
+        "carpet_area": rng.integers(300, 2500, rows).astype(float),
+        "bathrooms": rng.integers(1, 5, rows),
+        "image_url": "https://example.com/image.jpg",
+        "fullAddress": [f"{loc}, {c}" for loc, c in zip(locality, city)],
+        "city": city,
+        "locality": locality,
+    })
+    df["summary"] = describe(rng, projects)[project_no]
+    df["about"] = describe(rng, rows, per_text=1)
+    return df
+
+
+# Pincode prefix per city, matching DataManager.PINCODE_REGIONS
+PINCODE_PREFIX = {"Pune": 411, "Mumbai": 400, "Dombivli": 421}
+LANDMARKS = ["Metro Station", "City Mall", "Public School", "Railway Station", "Lake Garden", "IT Park"]
+IMAGE = "https://example.com/{}.jpg"
+
+
+def _project_frames(projects: int, rng: np.random.Generator) -> tuple:
+    """project.csv and ProjectAddress.csv rows, with every column of the real files."""
+    project_ids = np.array([f"proj{n:08d}" for n in range(projects)], dtype=object)
+    cities = np.array(list(LOCALITIES))
+    city = cities[rng.integers(0, len(cities), projects)]
+    locality = [LOCALITIES[c][i % len(LOCALITIES[c])] for c, i in zip(city, rng.integers(0, 100, projects))]
+    status = np.array(STATUSES)[rng.integers(0, 2, projects)]
+    landmark = np.array(LANDMARKS)[rng.integers(0, len(LANDMARKS), projects)]
+    pincode = np.array([PINCODE_PREFIX[c] for c in city]) * 1000 + rng.integers(1, 100, projects)
+    names = [f"Project {n}" for n in range(projects)]
+
+    project = pd.DataFrame({
+        "id": project_ids,
+        "projectType": "RESIDENTIAL",
+        "projectName": names,
+        "projectCategory": np.array(["STANDALONE", "COMPLEX"])[rng.integers(0, 2, projects)],
+        "slug": [f"{n.lower().replace(' ', '-')}-{loc.lower().replace(' ', '')}-{c.lower()}" for n, loc, c in zip(names, locality, city)],
+        "slugId": np.nan,
+        "status": status,
+        "projectAge": np.where(status == "READY_TO_MOVE", rng.integers(0, 10, projects), np.nan),
+        "reraId": [f'["P5{n:010d}"]' for n in range(projects)],
+        "countryId": "country0001",
+        "stateId": "state0001",
+        "cityId": [f"city-{c.lower()}" for c in city],
+        "localityId": [f"loc-{loc.lower().replace(' ', '')}" for loc in locality],
+        "subLocalityId": np.nan,
+        "projectSummary": describe(rng, projects),
+        "possessionDate": (pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 6 * 365, projects), unit="D")).strftime("%Y-%m-%d %H:%M:%S"),
+    })
+    address = pd.DataFrame({
+        "id": [f"addr{n:08d}" for n in range(projects)],
+        "projectId": project_ids,
+        "landmark": landmark,
+        "fullAddress": [f"{loc}, Near {lm}, {c}, Maharashtra {pin}" for lm, loc, c, pin in zip(landmark, locality, city, pincode)],
+        "pincode": pincode,
+    })
+    return project, address
+
+
+def _configuration_frames(start: int, count: int, project_ids: np.ndarray, rng: np.random.Generator) -> tuple:
+    """ProjectConfiguration.csv and ProjectConfigurationVariant.csv rows start..start+count (one variant each)."""
+    numbers = np.arange(start, start + count)
+    bhk = np.array(BHK_TYPES)[rng.integers(0, len(BHK_TYPES), count)]
+    config_ids = np.array([f"conf{n:09d}" for n in numbers], dtype=object)
+    config = pd.DataFrame({
+        "id": config_ids,
+        "projectId": project_ids[rng.integers(0, len(project_ids), count)],
+        "propertyCategory": "RESIDENTIAL",
+        "type": bhk,
+        "customBHK": np.where(rng.random(count) < 0.5, bhk, ""),
+    })
+    created = pd.Timestamp("2025-09-01") + pd.to_timedelta(rng.integers(0, 86_400 * 60, count), unit="s")
+    variant = pd.DataFrame({
+        "id": [f"var{n:09d}" for n in numbers],
+        "configurationId": config_ids,
+        "bathrooms": rng.integers(1, 5, count),
+        "privateBathrooms": np.nan,
+        "publicBathrooms": np.nan,
+        "balcony": rng.integers(0, 4, count).astype(float),
+        "furnishedType": np.array(["UNFURNISHED", "SEMI_FURNISHED", "FURNISHED"])[rng.integers(0, 3, count)],
+        "furnishingType": "[]",
+        "lift": rng.random(count) < 0.8,
+        "ageOfProperty": np.nan,
+        "parkingType": np.nan,
+        "listingType": "Sell",
+        "floorPlanImage": [IMAGE.format(f"plan{n}") for n in numbers],
+        "carpetArea": np.round(rng.uniform(300, 2500, count), 2),
+        "price": rng.integers(20, 500, count) * 100000,
+        "propertyImages": [f'["{IMAGE.format(n)}"]' for n in numbers],
+        "maintenanceCharges": np.nan,
+        "aboutProperty": describe(rng, count, per_text=1),
+        "createdAt": created.strftime("%Y-%m-%d %H:%M:%S.000"),
+        "updatedAt": created.strftime("%Y-%m-%d %H:%M:%S.000"),
+    })
+    return config, variant
+
+
+def make_source_frames(rows: int, seed: int = 7) -> dict:
+    """Build the four raw source tables (one configuration and variant per row) that join to `rows` rows."""
+    rng = np.random.default_rng(seed)
+    project, address = _project_frames(max(rows // 20, 1), rng)
+    config, variant = _configuration_frames(0, rows, project["id"].to_numpy(), rng)
+    return {"project": project, "address": address, "config": config, "variant": variant}
+
+
+def write_source_csvs(data_dir, rows: int, seed: int = 7, chunk_rows: int = 500_000) -> Path:
+    """
+    Write a synthetic dataset in the same CSV layout (and quoting) DataManager
+    reads. Configurations and variants are generated and appended chunk by
+    chunk, so memory stays flat up to 10M+ rows.
+    """
+    from services.data_manager import DataManager
+
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    project, address = _project_frames(max(rows // 20, 1), rng)
+    project.to_csv(data_dir / DataManager.COLUMNS["project"], index=False)
+    address.to_csv(data_dir / DataManager.COLUMNS["address"], index=False)
+
+    project_ids = project["id"].to_numpy()
+    for start in range(0, rows, chunk_rows):
+        config, variant = _configuration_frames(start, min(chunk_rows, rows - start), project_ids, rng)
+        first = start == 0
+        config.to_csv(data_dir / DataManager.COLUMNS["config"], index=False, mode="w" if first else "a", header=first)
+        # The real variant export quotes every field
+        variant.to_csv(data_dir / DataManager.COLUMNS["variant"], index=False, mode="w" if first else "a",
+                       header=first, quoting=csv.QUOTE_ALL)
+    return data_dir